@@ -0,0 +1,23 @@
+"""Reproducible load tests for the noblepaints application.
+
+The package seeds a scratch database with a synthetic, bilingual catalogue
+(:mod:`benchmarks.datagen`).  It then replays a weighted mix of public page
+views and cpanel CRUD calls (:mod:`benchmarks.scenarios`), either in-process
+through the Flask test client or over HTTP against a running server
+(:mod:`benchmarks.runner`).  Every run reports p50/p95/p99 latency,
+throughput and response bytes per route.  Runs are written as JSON so they can
+be compared later::
+
+    python -m benchmarks seed --scale small
+    python -m benchmarks run --duration 30 --concurrency 8 --out before.json
+    # ... change something ...
+    python -m benchmarks run --duration 30 --concurrency 8 --out after.json
+    python -m benchmarks compare before.json after.json
+
+    # Against a server started with the same DATABASE_URL/MEDIA_ROOT:
+    python -m benchmarks run --target http://127.0.0.1:5000
+
+The seeded data lives under ``instance/bench`` (``--workdir``) and never
+touches the real database: the CLI points ``DATABASE_URL``, ``MEDIA_ROOT``
+and the cache paths there before the application is imported.
+"""
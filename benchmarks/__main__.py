@@ -0,0 +1,98 @@
+"""Command line entry point: ``python -m benchmarks seed|run|compare``."""
+
+from __future__ import annotations
+
+import json
+import os
+
+import click
+
+DEFAULT_WORKDIR = os.path.join("instance", "bench")
+
+
+def _isolate(workdir: str) -> None:
+    """Point the application at the scratch data before it is imported."""
+    workdir = os.path.abspath(workdir)
+    os.makedirs(workdir, exist_ok=True)
+    os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(workdir, "bench.db"))
+    os.environ.setdefault("MEDIA_ROOT", os.path.join(workdir, "media"))
+    os.environ.setdefault("CACHE_SQLITE_PATH", os.path.join(workdir, "cache.sqlite3"))
+    os.environ.setdefault("CACHE_DIR", os.path.join(workdir, "cache"))
+    # No network calls or mail from benchmark traffic.
+    os.environ.setdefault("TRANSLATION_BACKEND", "none")
+    os.environ.setdefault("OUTBOX_SENDER", "none")
+    os.environ.setdefault("ADMIN_INITIAL_USERNAME", "admin")
+    os.environ.setdefault("ADMIN_INITIAL_PASSWORD", "bench-admin")
+
+
+@click.group()
+@click.option("--workdir", default=DEFAULT_WORKDIR, show_default=True, help="Scratch database and media directory.")
+def cli(workdir):
+    """Seed synthetic data and load-test the noblepaints app."""
+    _isolate(workdir)
+
+
+@cli.command()
+@click.option("--scale", type=click.Choice(["tiny", "small", "large"]), default="small", show_default=True)
+@click.option("--seed", default=1234, show_default=True, help="Random seed; equal seeds give identical data.")
+def seed(scale, seed):
+    """(Re)create the scratch database with synthetic bilingual content."""
+    from benchmarks.datagen import seed_database
+    from noblepaints import app
+
+    with app.app_context():
+        summary = seed_database(scale, seed)
+    click.echo(json.dumps(summary.as_dict(), indent=2))
+
+
+@cli.command()
+@click.option("--scenario", type=click.Choice(["public", "cpanel", "mixed"]), default="mixed", show_default=True)
+@click.option("--target", default="in-process", show_default=True, help="'in-process' or a base URL such as http://127.0.0.1:5000.")
+@click.option("--duration", default=20.0, show_default=True, help="Measured seconds.")
+@click.option("--warmup", default=2.0, show_default=True, help="Seconds run before measuring.")
+@click.option("--concurrency", default=4, show_default=True, help="Concurrent client threads.")
+@click.option("--seed", default=1, show_default=True, help="Seed for the request sequence.")
+@click.option("--out", type=click.Path(dir_okay=False), help="Write the JSON summary to this file.")
+def run(scenario, target, duration, warmup, concurrency, seed, out):
+    """Replay a request mix and report p50/p95/p99, throughput and bytes per route."""
+    from benchmarks.runner import HttpTarget, InProcessTarget, format_summary, run_scenario
+    from benchmarks.scenarios import SCENARIOS, load_context
+    from noblepaints import app
+
+    with app.app_context():
+        context = load_context(seed)
+    if not context.products:
+        raise click.ClickException("The scratch database is empty; run `python -m benchmarks seed` first.")
+    if target == "in-process":
+        runner_target = InProcessTarget(app)
+    else:
+        runner_target = HttpTarget(target, os.environ["ADMIN_INITIAL_USERNAME"], os.environ["ADMIN_INITIAL_PASSWORD"])
+    result = run_scenario(
+        runner_target,
+        SCENARIOS[scenario],
+        context,
+        duration=duration,
+        concurrency=concurrency,
+        warmup=warmup,
+        seed=seed,
+    )
+    result["meta"]["scenario"] = scenario
+    click.echo(format_summary(result))
+    if out:
+        with open(out, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2, sort_keys=True)
+        click.echo(f"Saved {out}")
+
+
+@cli.command()
+@click.argument("before", type=click.File("r"))
+@click.argument("after", type=click.File("r"))
+def compare(before, after):
+    """Compare two saved runs route by route."""
+    from benchmarks.runner import compare as compare_runs
+
+    click.echo(compare_runs(json.load(before), json.load(after)))
+
+
+if __name__ == "__main__":
+    cli()
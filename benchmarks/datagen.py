@@ -0,0 +1,199 @@
+"""Seeded generator for a synthetic, bilingual catalogue.
+
+The same ``seed`` and ``scale`` always produce the same rows, images and
+files, so two benchmark runs seeded alike measure the same data.  Images
+are JPEG noise at typical product-photo sizes (Pillow when available,
+otherwise random bytes behind a JPEG header).  Catalog and datasheet uploads
+are PDF-like blobs with a log-normal size distribution around a few hundred
+KiB.  Both are drawn from fixed-size pools so the scratch database stays
+small enough to rebuild quickly.
+"""
+
+from __future__ import annotations
+
+import io
+import random
+from dataclasses import dataclass
+from typing import Dict, List
+
+SCALES: Dict[str, Dict[str, int]] = {
+    "tiny": {"categories": 8, "products": 200, "catalogs": 40, "datasheets": 120, "posts": 60},
+    "small": {"categories": 20, "products": 2000, "catalogs": 300, "datasheets": 1000, "posts": 500},
+    "large": {"categories": 40, "products": 10000, "catalogs": 1500, "datasheets": 5000, "posts": 2500},
+}
+
+IMAGE_POOL_SIZE = 40
+FILE_POOL_SIZE = 60
+COUNTRIES = ("Saudi Arabia", "United Arab Emirates", "Kuwait", "Qatar", "Bahrain", "Oman", "Jordan", "Egypt")
+
+_EN_WORDS = (
+    "acrylic", "alkyd", "anti-corrosive", "coating", "decorative", "durable", "emulsion", "enamel",
+    "epoxy", "exterior", "finish", "floor", "gloss", "heat-resistant", "industrial", "interior",
+    "marine", "matt", "polyurethane", "primer", "protective", "road-marking", "satin", "sealer",
+    "silk", "texture", "thinner", "varnish", "waterproof", "wood",
+)
+_AR_WORDS = (
+    "أكريليك", "ألكيد", "مقاوم", "للصدأ", "طلاء", "ديكوري", "متين", "مستحلب", "مينا", "إيبوكسي",
+    "خارجي", "لمسة", "أرضيات", "لامع", "حراري", "صناعي", "داخلي", "بحري", "مطفي", "بولي",
+    "يوريثان", "أساس", "واقي", "طرق", "ساتان", "عازل", "حريري", "ملمس", "مخفف", "ورنيش",
+)
+
+
+@dataclass
+class SeedSummary:
+    categories: int
+    products: int
+    catalogs: int
+    datasheets: int
+    posts: int
+    images: int
+    files: int
+    file_bytes: int
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+def _words(rng: random.Random, lang: str, count: int) -> str:
+    vocabulary = _AR_WORDS if lang == "ar" else _EN_WORDS
+    return " ".join(rng.choice(vocabulary) for _ in range(count))
+
+
+def _sentence(rng: random.Random, lang: str, low: int, high: int) -> str:
+    text = _words(rng, lang, rng.randint(low, high))
+    return text[:1].upper() + text[1:] + "."
+
+
+def make_image(rng: random.Random, width: int, height: int) -> bytes:
+    """Return JPEG bytes of a noisy *width* x *height* picture."""
+    try:
+        from PIL import Image
+    except ImportError:
+        # Roughly what a q85 photo of this size weighs.
+        return b"\xff\xd8\xff\xe0" + rng.randbytes(width * height // 6) + b"\xff\xd9"
+    base = Image.new("RGB", (width // 8, height // 8), tuple(rng.randrange(256) for _ in range(3)))
+    base.putdata([tuple(rng.randrange(256) for _ in range(3)) for _ in range(base.width * base.height)])
+    image = base.resize((width, height), Image.BILINEAR)
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def make_pdf(rng: random.Random) -> bytes:
+    """Return a PDF-like blob whose size follows typical datasheet sizes."""
+    size = int(min(max(rng.lognormvariate(12.5, 0.8), 40_000), 6_000_000))  # median ~270 KiB
+    header = b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n"
+    trailer = b"\n%%EOF\n"
+    return header + rng.randbytes(max(size - len(header) - len(trailer), 0)) + trailer
+
+
+def seed_database(scale: str = "small", seed: int = 1234) -> SeedSummary:
+    """Replace the contents of the configured database with synthetic data.
+
+    Must run inside an application context.  Rows are inserted with the ORM,
+    so the category foreign keys, the search index and the cache versions
+    end up exactly as the cpanel would leave them.
+    """
+    from noblepaints import db
+    from noblepaints.bootstrap import ensure_admin_user, migrate_database
+    from noblepaints.media import store_bytes
+    from noblepaints.models import Catalog, Category, Post, Product, TechnicalDatasheet, Upload
+    from noblepaints.search import rebuild_search_index
+
+    counts = SCALES[scale]
+    rng = random.Random(seed)
+    db.drop_all()
+    migrate_database()
+    ensure_admin_user()
+
+    images: List[str] = []
+    for _ in range(IMAGE_POOL_SIZE):
+        width = rng.choice((640, 800, 1024, 1280))
+        images.append(store_bytes(make_image(rng, width, width * 3 // 4), "image/jpeg"))
+
+    uploads: List[Upload] = []
+    file_bytes = 0
+    for index in range(FILE_POOL_SIZE):
+        payload = make_pdf(rng)
+        file_bytes += len(payload)
+        upload = Upload()
+        upload.set_data(f"datasheet-{index:03d}.pdf", payload)
+        db.session.add(upload)
+        uploads.append(upload)
+    db.session.flush()
+
+    categories = []
+    for index in range(counts["categories"]):
+        category = Category(
+            name=_words(rng, "en", 2).title(),
+            nameArabic=_words(rng, "ar", 2),
+            desc=_sentence(rng, "en", 12, 30),
+            img=rng.choice(images),
+        )
+        db.session.add(category)
+        categories.append(category)
+    db.session.flush()
+
+    def pick_category():
+        category = rng.choice(categories)
+        # Mirror the legacy data: ids, English and Arabic names all occur.
+        return category, rng.choice((str(category.id), category.name, category.nameArabic))
+
+    for index in range(counts["products"]):
+        lang = rng.choice(("en", "ar"))
+        category, raw = pick_category()
+        db.session.add(Product(
+            name=_words(rng, lang, rng.randint(2, 4)),
+            desc="<p>" + "</p><p>".join(_sentence(rng, lang, 20, 60) for _ in range(rng.randint(1, 4))) + "</p>",
+            img=rng.choice(images),
+            category=raw,
+            category_id=category.id,
+            country=rng.choice(COUNTRIES),
+            lang=lang,
+            datasheet=str(rng.choice(uploads).id),
+        ))
+    for index in range(counts["catalogs"]):
+        category, raw = pick_category()
+        db.session.add(Catalog(
+            name=_words(rng, rng.choice(("en", "ar")), 3),
+            img=rng.choice(images),
+            link=str(rng.choice(uploads).id),
+            category=raw,
+            category_id=category.id,
+            country=rng.choice(COUNTRIES),
+            lang=rng.choice(("", "en", "ar")) or None,
+        ))
+    for index in range(counts["datasheets"]):
+        lang = rng.choice(("en", "ar"))
+        category, raw = pick_category()
+        db.session.add(TechnicalDatasheet(
+            name=_words(rng, lang, 3),
+            link=f"/download/{rng.choice(uploads).id}",
+            category=raw,
+            category_id=category.id,
+            country=rng.choice(COUNTRIES),
+            lang=lang,
+        ))
+    for index in range(counts["posts"]):
+        lang = rng.choice(("en", "ar"))
+        db.session.add(Post(
+            title=_sentence(rng, lang, 4, 9),
+            description="<p>" + "</p><p>".join(_sentence(rng, lang, 30, 90) for _ in range(rng.randint(2, 6))) + "</p>",
+            date=f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            lang=lang,
+            img=rng.choice(images),
+            category=_words(rng, "en", 1),
+            views=rng.randint(0, 5000),
+        ))
+    db.session.commit()
+    rebuild_search_index()
+    return SeedSummary(
+        categories=counts["categories"],
+        products=counts["products"],
+        catalogs=counts["catalogs"],
+        datasheets=counts["datasheets"],
+        posts=counts["posts"],
+        images=len(images),
+        files=len(uploads),
+        file_bytes=file_bytes,
+    )
@@ -0,0 +1,236 @@
+"""Drive a scenario against the app and summarise latency per route.
+
+:class:`InProcessTarget` calls the WSGI app through Flask's test client (no
+network, so it isolates application cost).  :class:`HttpTarget` talks to a
+running server with ``requests`` and logs into the cpanel with the real login
+form.  Both return ``(status, body)`` for a :class:`~benchmarks.scenarios.Request`.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import platform
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.scenarios import Context, Request, Step
+
+
+class InProcessTarget:
+    name = "in-process"
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def _client(self, admin: bool):
+        attr = "admin" if admin else "anonymous"
+        client = getattr(self._local, attr, None)
+        if client is None:
+            client = self.app.test_client()
+            if admin:
+                from noblepaints import db
+                from noblepaints.models import User
+
+                with self.app.app_context():
+                    user_id = db.session.query(User.id).order_by(User.id).scalar()
+                with client.session_transaction() as session:
+                    session["_user_id"] = str(user_id)
+                    session["_fresh"] = True
+            setattr(self._local, attr, client)
+        return client
+
+    def send(self, request: Request) -> Tuple[int, bytes]:
+        client = self._client(request.admin)
+        data = dict(request.data or {})
+        for key, (filename, payload) in (request.files or {}).items():
+            data[key] = (BytesIO(payload), filename)
+        response = client.open(
+            request.path,
+            method=request.method,
+            data=data or None,
+            json=request.json,
+            content_type="multipart/form-data" if request.files else None,
+        )
+        return response.status_code, response.get_data()
+
+
+class HttpTarget:
+    def __init__(self, base_url: str, username: str, password: str):
+        import requests
+
+        self.name = base_url
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self._requests = requests
+        self._local = threading.local()
+
+    def _session(self, admin: bool):
+        attr = "admin" if admin else "anonymous"
+        session = getattr(self._local, attr, None)
+        if session is None:
+            session = self._requests.Session()
+            if admin:
+                page = session.get(f"{self.base_url}/login/").text
+                token = re.search(r'name="csrf_token"[^>]*value="([^"]+)"', page)
+                session.post(f"{self.base_url}/login/", data={
+                    "csrf_token": token.group(1) if token else "",
+                    "username": self.username,
+                    "password": self.password,
+                })
+            setattr(self._local, attr, session)
+        return session
+
+    def send(self, request: Request) -> Tuple[int, bytes]:
+        response = self._session(request.admin).request(
+            request.method,
+            self.base_url + request.path,
+            data=request.data,
+            json=request.json,
+            files=request.files,
+            allow_redirects=False,
+        )
+        return response.status_code, response.content
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+class _Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes: Dict[str, Dict[str, list]] = {}
+
+    def add(self, name: str, seconds: float, status: int, size: int) -> None:
+        with self.lock:
+            route = self.routes.setdefault(name, {"latencies": [], "bytes": [], "statuses": []})
+            route["latencies"].append(seconds)
+            route["bytes"].append(size)
+            route["statuses"].append(status)
+
+
+def run_scenario(
+    target,
+    steps: List[Step],
+    context: Context,
+    duration: float = 30.0,
+    concurrency: int = 4,
+    warmup: float = 2.0,
+    seed: int = 1,
+) -> Dict[str, object]:
+    """Replay *steps* from *concurrency* threads and return the summary."""
+    recorder = _Recorder()
+    weights = [step.weight for step in steps]
+    stop_at = [0.0]
+    measure_from = [0.0]
+
+    def worker(index: int) -> None:
+        ctx = context.fork(seed * 1000 + index)
+        while time.perf_counter() < stop_at[0]:
+            step = ctx.rng.choices(steps, weights)[0]
+            request = step.build(ctx)
+            if request is None:
+                continue
+            started = time.perf_counter()
+            try:
+                status, body = target.send(request)
+            except Exception:
+                status, body = 599, b""
+            elapsed = time.perf_counter() - started
+            if request.on_success and 200 <= status < 300:
+                try:
+                    request.on_success(json.loads(body))
+                except ValueError:
+                    pass
+            if started >= measure_from[0]:
+                recorder.add(step.name, elapsed, status, len(body))
+
+    begin = time.perf_counter()
+    measure_from[0] = begin + warmup
+    stop_at[0] = begin + warmup + duration
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - measure_from[0]
+    return summarise(recorder.routes, elapsed, {
+        "target": target.name,
+        "duration": duration,
+        "concurrency": concurrency,
+        "warmup": warmup,
+        "seed": seed,
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    })
+
+
+def summarise(routes: Dict[str, Dict[str, list]], elapsed: float, meta: Dict[str, object]) -> Dict[str, object]:
+    summary = {}
+    total = 0
+    for name, data in sorted(routes.items()):
+        latencies = sorted(data["latencies"])
+        statuses: Dict[str, int] = {}
+        for status in data["statuses"]:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        total += len(latencies)
+        summary[name] = {
+            "requests": len(latencies),
+            "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            "bytes_mean": sum(data["bytes"]) / len(data["bytes"]) if data["bytes"] else 0,
+            "bytes_total": sum(data["bytes"]),
+            "statuses": statuses,
+            "errors": sum(count for status, count in statuses.items() if int(status) >= 500),
+        }
+    return {
+        "meta": dict(meta, elapsed=elapsed),
+        "total": {"requests": total, "throughput_rps": total / elapsed if elapsed else 0.0},
+        "routes": summary,
+    }
+
+
+def format_summary(result: Dict[str, object]) -> str:
+    lines = [f"{'route':<28}{'req':>7}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'KiB':>9}{'err':>5}"]
+    for name, route in result["routes"].items():
+        lines.append(
+            f"{name:<28}{route['requests']:>7}{route['throughput_rps']:>9.1f}"
+            f"{route['p50_ms']:>9.1f}{route['p95_ms']:>9.1f}{route['p99_ms']:>9.1f}"
+            f"{route['bytes_mean'] / 1024:>9.1f}{route['errors']:>5}"
+        )
+    total = result["total"]
+    lines.append(f"{'TOTAL':<28}{total['requests']:>7}{total['throughput_rps']:>9.1f}")
+    return "\n".join(lines)
+
+
+def compare(before: Dict[str, object], after: Dict[str, object]) -> str:
+    """Side-by-side p50/p95/throughput changes between two saved runs."""
+    lines = [f"{'route':<28}{'p50 before':>11}{'after':>9}{'p95 before':>12}{'after':>9}{'rps Δ':>9}"]
+    names = sorted(set(before["routes"]) | set(after["routes"]))
+    for name in names:
+        old: Optional[dict] = before["routes"].get(name)
+        new: Optional[dict] = after["routes"].get(name)
+        if not old or not new:
+            lines.append(f"{name:<28}{'(only in ' + ('after' if new else 'before') + ')':>50}")
+            continue
+        change = (new["throughput_rps"] / old["throughput_rps"] - 1) * 100 if old["throughput_rps"] else 0.0
+        lines.append(
+            f"{name:<28}{old['p50_ms']:>11.1f}{new['p50_ms']:>9.1f}"
+            f"{old['p95_ms']:>12.1f}{new['p95_ms']:>9.1f}{change:>+8.0f}%"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,175 @@
+"""Request mixes replayed by the benchmark runner.
+
+A scenario is a list of weighted :class:`Step` objects.  Each step builds
+one request from a :class:`Context` (ids of the seeded rows and a private
+random generator), so every worker thread draws its own reproducible
+sequence.  ``public`` mirrors anonymous browsing, ``cpanel`` exercises the
+control panel CRUD APIs and ``mixed`` interleaves both at roughly one write
+per twenty reads.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class Context:
+    """Seeded ids the steps draw from; filled by :func:`load_context`."""
+
+    rng: random.Random
+    products: List[int]
+    categories: List[int]
+    catalogs: List[int]
+    posts: List[int]
+    search_terms: List[str]
+    created: Dict[str, List[int]] = field(default_factory=dict)
+
+    def fork(self, seed: int) -> "Context":
+        return Context(
+            random.Random(seed), self.products, self.categories, self.catalogs, self.posts, self.search_terms, {}
+        )
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    data: Optional[dict] = None
+    json: Optional[dict] = None
+    files: Optional[Dict[str, Tuple[str, bytes]]] = None
+    admin: bool = False
+    # Called with the parsed JSON body of a successful response.
+    on_success: Optional[Callable[[dict], None]] = None
+
+
+@dataclass
+class Step:
+    name: str
+    weight: int
+    build: Callable[[Context], Optional[Request]]
+
+
+def load_context(seed: int = 1) -> Context:
+    """Collect the seeded ids; must run inside an application context."""
+    from noblepaints import db
+    from noblepaints.models import Catalog, Category, Post, Product
+
+    def ids(column):
+        return [row[0] for row in db.session.query(column).order_by(column)]
+
+    names = [row[0] for row in db.session.query(Product.name).limit(200)]
+    terms = sorted({word for name in names for word in (name or "").split() if len(word) > 3})
+    return Context(
+        rng=random.Random(seed),
+        products=ids(Product.id),
+        categories=ids(Category.id),
+        catalogs=ids(Catalog.id),
+        posts=ids(Post.id),
+        search_terms=terms or ["paint"],
+    )
+
+
+def _lang(ctx: Context) -> str:
+    return ctx.rng.choice(("en", "ar"))
+
+
+PUBLIC: List[Step] = [
+    Step("home", 12, lambda ctx: Request("GET", f"/{_lang(ctx)}/")),
+    Step("categories", 5, lambda ctx: Request("GET", f"/{_lang(ctx)}/categories/")),
+    Step("api_categories", 3, lambda ctx: Request("GET", "/api/categories/")),
+    Step("products_search_page", 10, lambda ctx: Request(
+        "GET", f"/{_lang(ctx)}/productsSearch/?page={ctx.rng.randint(1, 20)}")),
+    Step("products_search_category", 6, lambda ctx: Request(
+        "GET", f"/{_lang(ctx)}/productsSearch/?category={ctx.rng.choice(ctx.categories)}&page=1")),
+    Step("products_search_text", 6, lambda ctx: Request(
+        "GET", f"/{_lang(ctx)}/productsSearch/?search={ctx.rng.choice(ctx.search_terms)}")),
+    Step("product", 14, lambda ctx: Request("GET", f"/{_lang(ctx)}/product/?id={ctx.rng.choice(ctx.products)}")),
+    Step("products_cat", 4, lambda ctx: Request(
+        "GET", f"/{_lang(ctx)}/products/{ctx.rng.choice(ctx.categories)}/")),
+    Step("catalogs", 5, lambda ctx: Request("GET", f"/{_lang(ctx)}/catalogs/?page={ctx.rng.randint(1, 5)}")),
+    Step("catalogs_filtered", 3, lambda ctx: Request(
+        "GET", f"/{_lang(ctx)}/catalogs/?category={ctx.rng.choice(ctx.categories)}")),
+    Step("datasheets", 4, lambda ctx: Request("GET", f"/{_lang(ctx)}/TechnicalDatasheets/")),
+    Step("news", 4, lambda ctx: Request("GET", f"/{_lang(ctx)}/news/")),
+    Step("news_details", 6, lambda ctx: Request("GET", f"/{_lang(ctx)}/news/{ctx.rng.choice(ctx.posts)}/")),
+    Step("get_products", 3, lambda ctx: Request("GET", f"/getProducts/?lang={_lang(ctx)}&limit=12")),
+    Step("catalog_download", 2, lambda ctx: Request("GET", f"/download/{ctx.rng.randint(1, 20)}")),
+    Step("colors", 2, lambda ctx: Request("GET", f"/{_lang(ctx)}/colors/")),
+    Step("api_colors", 2, lambda ctx: Request("GET", "/api/colors/")),
+    Step("stores", 2, lambda ctx: Request("GET", f"/{_lang(ctx)}/FindStore/")),
+    Step("api_stores", 2, lambda ctx: Request("GET", "/api/stores/")),
+]
+
+
+def _remember(ctx: Context, kind: str) -> Callable[[dict], None]:
+    def store(body: dict) -> None:
+        if body.get("id"):
+            ctx.created.setdefault(kind, []).append(body["id"])
+    return store
+
+
+def _take(ctx: Context, kind: str) -> Optional[int]:
+    created = ctx.created.get(kind)
+    return created.pop(ctx.rng.randrange(len(created))) if created else None
+
+
+def _product_payload(ctx: Context) -> dict:
+    lang = _lang(ctx)
+    return {
+        "name": f"Bench product {ctx.rng.randrange(10 ** 6)}",
+        "desc": "<p>Benchmark product description.</p>",
+        "category": str(ctx.rng.choice(ctx.categories)),
+        "country": "Saudi Arabia",
+        "lang": lang,
+    }
+
+
+def _edit_product(ctx: Context) -> Request:
+    product_id = ctx.rng.choice(ctx.created.get("product") or ctx.products)
+    return Request("POST", f"/ControlPanel/products/edit/{product_id}/",
+                   data={"data": json.dumps({"name": f"Edited {ctx.rng.randrange(10 ** 6)}"})}, admin=True)
+
+
+def _delete(kind: str, path: str) -> Callable[[Context], Optional[Request]]:
+    def build(ctx: Context) -> Optional[Request]:
+        row_id = _take(ctx, kind)
+        return Request("POST", path.format(row_id), admin=True) if row_id else None
+    return build
+
+
+CPANEL: List[Step] = [
+    Step("cpanel_products_list", 4, lambda ctx: Request("GET", "/ControlPanel/products/?page=1", admin=True)),
+    Step("cpanel_product_add", 4, lambda ctx: Request(
+        "POST", "/ControlPanel/products/add/", data={"data": json.dumps(_product_payload(ctx))},
+        admin=True, on_success=_remember(ctx, "product"))),
+    Step("cpanel_product_edit", 4, _edit_product),
+    Step("cpanel_product_del", 2, _delete("product", "/ControlPanel/products/del/{}/")),
+    Step("cpanel_catalog_add", 1, lambda ctx: Request(
+        "POST", "/ControlPanel/catalogs/add/",
+        data={"data": json.dumps({"name": "Bench catalog", "category": str(ctx.rng.choice(ctx.categories))})},
+        files={"file": ("bench.pdf", b"%PDF-1.7\n" + ctx.rng.randbytes(200_000))},
+        admin=True, on_success=_remember(ctx, "catalog"))),
+    Step("cpanel_catalog_del", 1, _delete("catalog", "/ControlPanel/catalogs/del/{}/")),
+    Step("cpanel_datasheet_add", 2, lambda ctx: Request(
+        "POST", "/ControlPanel/TechnicalDatasheets/add/",
+        json={"name": "Bench datasheet", "link": "/download/1", "category": str(ctx.rng.choice(ctx.categories)),
+              "lang": _lang(ctx)},
+        admin=True, on_success=_remember(ctx, "datasheet"))),
+    Step("cpanel_datasheet_del", 1, _delete("datasheet", "/ControlPanel/TechnicalDatasheets/del/{}/")),
+    Step("cpanel_news_add", 2, lambda ctx: Request(
+        "POST", "/ControlPanel/news/add/",
+        json={"title": "Bench news", "description": "<p>Benchmark.</p>", "lang": _lang(ctx)},
+        admin=True, on_success=_remember(ctx, "news"))),
+    Step("cpanel_news_del", 1, _delete("news", "/ControlPanel/news/del/{}/")),
+]
+
+SCENARIOS: Dict[str, List[Step]] = {
+    "public": PUBLIC,
+    "cpanel": CPANEL,
+    # About one cpanel write per twenty public requests.
+    "mixed": PUBLIC + [Step(step.name, max(step.weight // 4, 1), step.build) for step in CPANEL],
+}
@@ -9,8 +9,14 @@ from flask_bcrypt import Bcrypt
 from flask_mail import Mail
 from flask_login import LoginManager
 
+from noblepaints.cache import QueryCache, create_backend, track_model_changes
+from noblepaints.database import engine_options, install_pragmas, profile_pragmas
+from noblepaints.logs import configure_logging
+from noblepaints.perf import install_instrumentation
+
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///noblepaints.db'
+# DATABASE_URL lets tools such as the benchmarks run against a scratch copy.
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///noblepaints.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = '526af4fbd93bc393a6392db7'
 # Keep a configurable default admin password so deployments can recover access easily.
@@ -19,19 +25,120 @@ app.config['DEFAULT_ADMIN_PASSWORD'] = os.environ.get('DEFAULT_ADMIN_PASSWORD',
 # The previous 10 MiB ceiling was too restrictive for high-resolution assets.
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # Limit uploads to 100 MiB
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=7)
-db = SQLAlchemy(app)
-bcrypt = Bcrypt(app)
-app.config['MAIL_SERVER'] = 'mail.noblepaints.com.sa'
-app.config['MAIL_PORT'] = 465
-app.config['MAIL_USE_TLS'] = False
-app.config['MAIL_USE_SSL'] = True
-app.config['MAIL_USERNAME'] ='info@noblepaints.com.sa'
-#app.config['MAIL_PASSWORD'] = 'mzdkqpflejakjled'
-app.config['MAIL_PASSWORD'] = 'm^_EHej(LNG.@@@#*@@@@@@'
+# Images uploaded from the dashboard are stored on disk by content hash and the
+# model columns only keep the short URL (see noblepaints.media).
+app.config['MEDIA_ROOT'] = os.environ.get('MEDIA_ROOT', os.path.join(app.root_path, 'static', 'media'))
+app.config['MEDIA_URL_PREFIX'] = '/media/'
+# Videos served by /video/<id> (``<id>.mp4``/``.webm``...).  Set USE_X_SENDFILE
+# when the front server supports X-Sendfile so it streams them directly.
+app.config['VIDEO_ROOT'] = os.environ.get('VIDEO_ROOT', os.path.join(app.root_path, 'static', 'videos'))
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+# Cached query results are shared between Passenger workers through a small
+# SQLite file (CACHE_BACKEND=filesystem|memory are also supported).
+app.config['CACHE_BACKEND'] = os.environ.get('CACHE_BACKEND', 'sqlite')
+app.config['CACHE_SQLITE_PATH'] = os.environ.get('CACHE_SQLITE_PATH', os.path.join(app.instance_path, 'cache.sqlite3'))
+app.config['CACHE_DIR'] = os.environ.get('CACHE_DIR', os.path.join(app.instance_path, 'cache'))
+# Per-connection SQLite pragmas and pool sizing (see noblepaints.database):
+# ``production`` enables WAL, a busy timeout and larger caches, ``default``
+# keeps SQLite's own settings.
+app.config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'production')
+app.config['SQLITE_POOL_SIZE'] = int(os.environ.get('SQLITE_POOL_SIZE', 8))
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+db = SQLAlchemy(app)
+with app.app_context():
+    install_pragmas(db.engine, profile_pragmas(app.config))
+query_cache = QueryCache(create_backend(app.config))
+track_model_changes(db.session, query_cache)
+bcrypt = Bcrypt(app)
+# The MAIL_* environment variables let tests point the outbox sender at a
+# local SMTP stand-in, e.g. ``python -m aiosmtpd -n -l localhost:1025`` with
+# MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_USE_SSL=0.
+app.config['MAIL_SERVER'] = os.environ.get('MAIL_SERVER', 'mail.noblepaints.com.sa')
+app.config['MAIL_PORT'] = int(os.environ.get('MAIL_PORT', 465))
+app.config['MAIL_USE_TLS'] = os.environ.get('MAIL_USE_TLS', '0').lower() in ('1', 'true', 'yes')
+app.config['MAIL_USE_SSL'] = os.environ.get('MAIL_USE_SSL', '1').lower() in ('1', 'true', 'yes')
+app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME', 'info@noblepaints.com.sa')
+#app.config['MAIL_PASSWORD'] = 'mzdkqpflejakjled'
+app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD', 'm^_EHej(LNG.@@@#*@@@@@@')
+# Contact form mail is queued in the ``outbox`` table and delivered by a
+# background thread in each worker (OUTBOX_SENDER=none leaves delivery to
+# ``flask outbox-send --loop`` running as its own process).
+app.config['OUTBOX_SENDER'] = os.environ.get('OUTBOX_SENDER', 'thread')
+app.config['OUTBOX_BATCH_SIZE'] = int(os.environ.get('OUTBOX_BATCH_SIZE', 20))
+app.config['OUTBOX_MAX_ATTEMPTS'] = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 8))
+# Automatic cpanel translations (noblepaints.translation): ``google`` uses
+# deep-translator, ``fake`` is an offline stand-in for tests, ``none`` disables
+# them.  Results are kept in the ``translation_memory`` table.
+app.config['TRANSLATION_BACKEND'] = os.environ.get('TRANSLATION_BACKEND', 'google')
+app.config['TRANSLATION_BATCH_SIZE'] = int(os.environ.get('TRANSLATION_BATCH_SIZE', 25))
+app.config['TRANSLATION_MAX_ATTEMPTS'] = int(os.environ.get('TRANSLATION_MAX_ATTEMPTS', 5))
+# Seconds between flushes of the buffered news view counters.
+app.config['VIEW_FLUSH_INTERVAL'] = float(os.environ.get('VIEW_FLUSH_INTERVAL', 30))
+# Workers migrate an outdated schema on their first request unless this is
+# disabled; deployments are expected to run ``flask bootstrap`` instead.
+app.config['AUTO_MIGRATE'] = os.environ.get('AUTO_MIGRATE', '1').lower() in ('1', 'true', 'yes')
+# Per-request SQL/template/serialisation timings (noblepaints.perf), shown on
+# /ControlPanel/perf and in Server-Timing headers.  PERF_SERVER_TIMING=staff
+# sends the header to logged-in users only, 1 to everyone (private load tests)
+# and 0 to nobody.
+app.config['PERF_ENABLED'] = os.environ.get('PERF_ENABLED', '1').lower() in ('1', 'true', 'yes')
+app.config['PERF_SERVER_TIMING'] = {'1': 'all', 'true': 'all', 'yes': 'all', 'all': 'all', 'staff': 'staff'}.get(
+    os.environ.get('PERF_SERVER_TIMING', 'staff').lower(), 'off'
+)
+# Application logs go through a queue to a background writer (noblepaints.logs).
+# LOG_LEVELS overrides the level per module, e.g. "noblepaints.routes=DEBUG".
+app.config['LOG_LEVEL'] = os.environ.get('LOG_LEVEL', 'INFO')
+app.config['LOG_LEVELS'] = os.environ.get('LOG_LEVELS', '')
+app.config['LOG_FORMAT'] = os.environ.get('LOG_FORMAT', 'logfmt')
+app.config['LOG_FILE'] = os.environ.get('LOG_FILE', '')
+app.config['LOG_QUEUE_SIZE'] = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+configure_logging(app.config)
 mail = Mail(app)
 ma = Marshmallow(app)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 login_manager.login_message_category = 'warning'
+from noblepaints.search import install_text_folding
+with app.app_context():
+    install_instrumentation(app, db.engine)
+    install_text_folding(db.engine)
 
 from noblepaints import routes
+from noblepaints import commands
+
+
+# Settings consumed while the package is imported (the engine, SQLite
+# pragmas and pool, the shared cache, Flask-Mail, instrumentation and the view
+# flusher); set them through the environment instead of create_app().
+IMPORT_TIME_PREFIXES = ('SQLALCHEMY_', 'SQLITE_', 'CACHE_', 'MAIL_')
+IMPORT_TIME_KEYS = frozenset({'PERF_ENABLED', 'VIEW_FLUSH_INTERVAL'})
+
+
+def create_app(config=None):
+    """Return the application, applying *config* overrides.
+
+    The app object, its extensions and its routes are created once, when the
+    package is imported; nothing here touches the database, so loading it in
+    a fresh Passenger worker is cheap.  Schema work runs from ``flask
+    migrate``/``flask bootstrap`` (see noblepaints.bootstrap).
+
+    Only settings read per request or per call can be overridden here.
+    Changing a key in :data:`IMPORT_TIME_PREFIXES`/:data:`IMPORT_TIME_KEYS`
+    (the database URL, SQLite options, cache backend, mail server...) raises
+    :class:`ValueError`, since it could no longer take effect; set those
+    through the environment before importing the package.
+    """
+    if config:
+        frozen = sorted(
+            key for key, value in config.items()
+            if (key.startswith(IMPORT_TIME_PREFIXES) or key in IMPORT_TIME_KEYS)
+            and app.config.get(key) != value
+        )
+        if frozen:
+            raise ValueError(
+                f"{', '.join(frozen)} cannot be changed after noblepaints is imported; "
+                "set them through the environment instead."
+            )
+        app.config.update(config)
+        configure_logging(app.config)
+    return app
@@ -0,0 +1,268 @@
+"""Paged JSON listings behind the control panel tables.
+
+Every cpanel view used to load all rows of its table, including the ``desc``
+and ``description`` bodies and, for rows not yet migrated by ``flask
+migrate-media``, multi-megabyte inline images.  It rendered an edit form per
+row and let the template slice out the visible page.
+
+The tables now render from ``/ControlPanel/api/<listing>/``.  Each
+:class:`AdminListing` names the columns a table shows; only those are
+selected, long text comes back as a short plain-text excerpt and images as a
+thumbnail URL (see :func:`noblepaints.media.thumbnail_url`).  Searching,
+filtering, sorting, counting and paging run in SQL.  The edit form fetches
+the full record of one row from ``/ControlPanel/api/<listing>/<id>/`` when
+it opens.
+"""
+
+from __future__ import annotations
+
+import html
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import case, func, literal, or_
+
+from noblepaints import db
+from noblepaints.facets import category_clause, category_lookup, resolve_category
+from noblepaints.media import thumbnail_url
+from noblepaints.models import Approval, Catalog, Category, Certificate, Post, Product, Social, TechnicalDatasheet
+
+DEFAULT_PER_PAGE = 10
+MAX_PER_PAGE = 100
+# Characters of a long column read from the database to build its excerpt.
+EXCERPT_SCAN = 600
+EXCERPT_LENGTH = 140
+
+_TAG = re.compile(r"<[^>]+>")
+_SPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class AdminListing:
+    """Columns and query options of one control panel table.
+
+    ``columns`` are returned as stored, ``excerpts`` as shortened plain text
+    and ``image`` (if set) as ``img``/``thumb`` URLs.  ``edit_fields`` are
+    the columns the edit form needs in full.
+    """
+
+    model: Any
+    columns: Tuple[str, ...]
+    edit_fields: Tuple[str, ...]
+    excerpts: Tuple[str, ...] = ()
+    image: Optional[str] = "img"
+    search: Tuple[str, ...] = ()
+    sorts: Tuple[str, ...] = ("id",)
+    filters: Tuple[str, ...] = ()
+    newest_first: bool = True
+
+    @property
+    def has_lang(self) -> bool:
+        return "lang" in self.columns
+
+    @property
+    def has_category(self) -> bool:
+        return "category" in self.columns
+
+
+ADMIN_LISTINGS: Dict[str, AdminListing] = {
+    "products": AdminListing(
+        Product,
+        columns=("name", "category", "country", "lang", "datasheet"),
+        edit_fields=("name", "desc", "category", "country", "lang"),
+        excerpts=("desc",),
+        search=("name", "desc"),
+        sorts=("id", "name", "category", "country", "lang"),
+        filters=("category", "country"),
+    ),
+    "catalogs": AdminListing(
+        Catalog,
+        columns=("name", "link", "category", "country", "lang"),
+        edit_fields=("name", "category", "country"),
+        search=("name",),
+        sorts=("id", "name", "category", "country"),
+        filters=("category", "country"),
+    ),
+    "TechnicalDatasheets": AdminListing(
+        TechnicalDatasheet,
+        columns=("name", "link", "category", "country", "lang"),
+        edit_fields=("name", "link", "category", "country", "lang"),
+        image=None,
+        search=("name", "link"),
+        sorts=("id", "name", "category", "country", "lang"),
+        filters=("category", "country"),
+    ),
+    "news": AdminListing(
+        Post,
+        columns=("title", "date", "lang", "views"),
+        edit_fields=("title", "date", "description", "lang"),
+        excerpts=("description",),
+        search=("title", "description"),
+        sorts=("id", "title", "date", "views"),
+    ),
+    "certificates": AdminListing(
+        Certificate,
+        columns=("title", "link", "lang"),
+        edit_fields=("title", "description", "link", "lang"),
+        excerpts=("description",),
+        search=("title", "description"),
+        sorts=("id", "title"),
+    ),
+    "approvals": AdminListing(
+        Approval,
+        columns=("title", "link", "lang"),
+        edit_fields=("title", "description", "link", "lang"),
+        excerpts=("description",),
+        search=("title", "description"),
+        sorts=("id", "title"),
+    ),
+    "categories": AdminListing(
+        Category,
+        columns=("name", "nameArabic"),
+        edit_fields=("name", "nameArabic", "desc"),
+        excerpts=("desc",),
+        search=("name", "nameArabic"),
+        sorts=("id", "name", "nameArabic"),
+        newest_first=False,
+    ),
+    "socialIcons": AdminListing(
+        Social,
+        columns=("icon", "link"),
+        edit_fields=("icon", "link"),
+        image=None,
+        search=("link", "icon"),
+        sorts=("id", "icon"),
+    ),
+}
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def excerpt(value: Optional[str], length: int = EXCERPT_LENGTH) -> str:
+    """Plain-text preview of an HTML *value*, cut to *length* characters."""
+    if not value:
+        return ""
+    text = _SPACE.sub(" ", html.unescape(_TAG.sub(" ", value))).strip()
+    if len(text) > length:
+        text = text[: length - 1].rstrip() + "…"
+    return text
+
+
+def _image_column(column):
+    # Legacy inline images are left in the database rather than shipped.
+    return case((func.substr(column, 1, 5) == "data:", literal(None)), else_=column)
+
+
+def _conditions(listing: AdminListing, query: str, filters: Dict[str, str]) -> list:
+    model = listing.model
+    conditions = []
+    term = (query or "").strip()
+    if term and listing.search:
+        pattern = _like_pattern(term)
+        conditions.append(or_(*(getattr(model, name).ilike(pattern, escape="\\") for name in listing.search)))
+    for name, value in filters.items():
+        if name not in listing.filters or not value:
+            continue
+        if name == "category":
+            conditions.append(category_clause(model, value))
+        else:
+            conditions.append(getattr(model, name) == value)
+    return conditions
+
+
+def _serialise(listing: AdminListing, row) -> Dict[str, Any]:
+    data = dict(row._mapping)
+    for name in listing.excerpts:
+        data[name] = excerpt(data[name])
+    if listing.image:
+        data["thumb"] = thumbnail_url(data["img"])
+    return data
+
+
+def _label_categories(items: Iterable[Dict[str, Any]]) -> None:
+    category_by_id, category_by_name = category_lookup()
+    for item in items:
+        item["category_label"] = resolve_category(item.get("category"), category_by_id, category_by_name)[1]
+
+
+def list_page(
+    listing: AdminListing,
+    page: int = 1,
+    per_page: int = DEFAULT_PER_PAGE,
+    sort: Optional[str] = None,
+    order: Optional[str] = None,
+    query: str = "",
+    filters: Optional[Dict[str, str]] = None,
+    where: Sequence = (),
+    priority: Sequence = (),
+) -> Dict[str, Any]:
+    """Return one page of *listing* with the paging metadata.
+
+    *where* restricts the rows further and *priority* leads the default
+    ordering (the views pass the language filter and sort of the
+    dashboard locale).  Unknown ``sort`` values fall back to that default.
+    """
+    model = listing.model
+    filters = filters or {}
+    conditions = [*where, *_conditions(listing, query, filters)]
+
+    total = db.session.query(func.count(model.id)).filter(*conditions).scalar() or 0
+    per_page = min(max(per_page, 1), MAX_PER_PAGE)
+    pages = max(math.ceil(total / per_page), 1)
+    page = min(max(page, 1), pages)
+
+    descending = order == "desc" if order in ("asc", "desc") else listing.newest_first
+    if sort in listing.sorts and sort != "id":
+        column = getattr(model, sort)
+        ordering = [column.desc() if descending else column.asc(), model.id.desc() if descending else model.id.asc()]
+    else:
+        sort = "id" if sort == "id" else None
+        ordering = [*([] if sort else priority), model.id.desc() if descending else model.id.asc()]
+
+    columns = [model.id.label("id")]
+    columns += [getattr(model, name).label(name) for name in listing.columns]
+    columns += [func.substr(getattr(model, name), 1, EXCERPT_SCAN).label(name) for name in listing.excerpts]
+    if listing.image:
+        columns.append(_image_column(getattr(model, listing.image)).label("img"))
+    rows = (
+        db.session.query(*columns)
+        .filter(*conditions)
+        .order_by(*ordering)
+        .limit(per_page)
+        .offset((page - 1) * per_page)
+        .all()
+    )
+    items = [_serialise(listing, row) for row in rows]
+    if listing.has_category:
+        _label_categories(items)
+    return {
+        "items": items,
+        "total": total,
+        "page": page,
+        "pages": pages,
+        "per_page": per_page,
+        "sort": sort or "",
+        "order": "desc" if descending else "asc",
+        "q": query or "",
+        "filters": {name: value for name, value in filters.items() if name in listing.filters and value},
+    }
+
+
+def item_detail(listing: AdminListing, item_id: int) -> Optional[Dict[str, Any]]:
+    """Return the fields the edit form of one row needs, or ``None``."""
+    model = listing.model
+    columns = [model.id.label("id")] + [getattr(model, name).label(name) for name in listing.edit_fields]
+    if listing.image:
+        columns.append(_image_column(getattr(model, listing.image)).label("img"))
+    row = db.session.query(*columns).filter(model.id == item_id).first()
+    if row is None:
+        return None
+    data = dict(row._mapping)
+    if listing.image:
+        data["thumb"] = thumbnail_url(data["img"])
+    return data
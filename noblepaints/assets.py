@@ -0,0 +1,308 @@
+"""Fingerprinted, precompressed copies of the static CSS/JS bundles.
+
+``static/js/nicepage.js``, ``static/css2`` and ``static/cpanel2`` used to be
+served under fixed names.  Browsers therefore had to revalidate them, and the
+front proxy gzipped them again on every response, if it compressed them at
+all.
+
+``flask build-assets`` copies every file below :data:`ASSET_DIRS` to
+``static/_build/<dir>/<name>.<hash>.<ext>``.  Text files also get ``.br``
+and ``.gz`` siblings (Brotli needs the optional ``brotli`` package; without it
+only gzip is written).  Relative ``url()``/``@import`` references inside
+stylesheets are rewritten to point at the hashed copies, or back at the
+original file when it is not part of the build.  The mapping is recorded in
+``static/_build/manifest.json``.
+
+At runtime :func:`fingerprinted` resolves ``url_for('static', ...)``
+filenames through the manifest.  :func:`precompressed_variant` picks the best
+encoding the client accepts, so the static view can send it with a
+year-long ``immutable`` cache lifetime.  Files missing from the manifest keep
+their plain URL, so the site works before the command has run.
+
+Pages cached before a rebuild still link to the previous hashed names, so a
+rebuild does not delete them straight away: files that drop out of the
+manifest are listed in ``static/_build/retired.json`` and removed by a later
+build once :data:`STALE_ASSET_RETENTION` has passed.  :func:`manifest_version`
+changes with every build; it is part of the release token that keys the page
+cache and the ``ETag`` of public pages.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+import tempfile
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from noblepaints import app
+
+BUILD_DIRNAME = "_build"
+MANIFEST_FILENAME = "manifest.json"
+RETIRED_FILENAME = "retired.json"
+ASSET_DIRS: Tuple[str, ...] = ("css", "css2", "js", "cpanel2", "fonts")
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".mjs", ".json", ".map", ".svg", ".txt", ".xml", ".ttf", ".otf", ".eot", ".ico")
+# Below this size compression saves next to nothing.
+MIN_COMPRESS_SIZE = 1024
+# Preferred first.
+ENCODINGS: Tuple[Tuple[str, str], ...] = (("br", ".br"), ("gzip", ".gz"))
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MANIFEST_CHECK_INTERVAL = 2.0
+# How long built files outlive the manifest entry that referenced them.  Far
+# longer than the public max-age of the pages and the page cache (5 minutes).
+STALE_ASSET_RETENTION = 24 * 3600
+
+_CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+?)\1\s*\)""")
+_CSS_IMPORT = re.compile(r"""@import\s+(['"])([^'"]+)\1""")
+_manifest_cache: Dict[str, object] = {"mtime": None, "checked": 0.0, "entries": {}, "built": {}}
+
+
+class AssetBuildError(RuntimeError):
+    """Raised when the asset build cannot run."""
+
+
+def static_root() -> str:
+    return app.static_folder
+
+
+def build_root() -> str:
+    return os.path.join(static_root(), BUILD_DIRNAME)
+
+
+def manifest_path() -> str:
+    return os.path.join(build_root(), MANIFEST_FILENAME)
+
+
+def load_manifest() -> Dict[str, dict]:
+    """Return the manifest, re-reading it when the file changes.
+
+    The file is stat'ed at most every :data:`MANIFEST_CHECK_INTERVAL`
+    seconds because this runs for every ``url_for('static')`` call.
+    """
+    now = time.monotonic()
+    if now - _manifest_cache["checked"] < MANIFEST_CHECK_INTERVAL:  # type: ignore[operator]
+        return _manifest_cache["entries"]  # type: ignore[return-value]
+    _manifest_cache["checked"] = now
+    try:
+        mtime = os.stat(manifest_path()).st_mtime_ns
+    except OSError:
+        _manifest_cache.update(mtime=None, entries={}, built={})
+        return {}
+    if _manifest_cache["mtime"] != mtime:
+        try:
+            with open(manifest_path(), encoding="utf-8") as handle:
+                entries = json.load(handle)
+        except (OSError, ValueError) as exc:
+            app.logger.warning("Could not read the asset manifest: %s", exc)
+            entries = {}
+        built = {entry["path"]: entry for entry in entries.values()}
+        _manifest_cache.update(mtime=mtime, entries=entries, built=built)
+    return _manifest_cache["entries"]  # type: ignore[return-value]
+
+
+def manifest_version() -> str:
+    """Identify the current build; it changes whenever the manifest is rewritten."""
+    load_manifest()
+    return f"{_manifest_cache['mtime'] or 0:x}"
+
+
+def reset_manifest_cache() -> None:
+    _manifest_cache.update(mtime=None, checked=0.0, entries={}, built={})
+
+
+def fingerprinted(filename: str) -> str:
+    """Return the hashed path of a static *filename*, or *filename* itself."""
+    entry = load_manifest().get(filename.lstrip("/"))
+    return entry["path"] if entry else filename
+
+
+def precompressed_variant(filename: str, accept_encodings) -> Optional[Tuple[str, Optional[str]]]:
+    """Return ``(absolute_path, content_encoding)`` for a built *filename*.
+
+    ``None`` means *filename* is not a fingerprinted asset.  The encoding is
+    ``None`` when the client should get the uncompressed copy.
+    """
+    load_manifest()
+    entry = _manifest_cache["built"].get(filename)  # type: ignore[union-attr]
+    if entry is None:
+        return None
+    path = os.path.join(static_root(), filename)
+    for encoding, suffix in ENCODINGS:
+        if encoding in entry.get("encodings", ()) and accept_encodings[encoding] > 0:
+            return path + suffix, encoding
+    return path, None
+
+
+def _iter_sources(root: str, directories: Iterable[str]) -> Iterable[str]:
+    for name in directories:
+        top = os.path.join(root, name)
+        for directory, dirnames, filenames in os.walk(top):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if not filename.startswith("."):
+                    yield os.path.relpath(os.path.join(directory, filename), root).replace(os.sep, "/")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _hashed_path(key: str, data: bytes) -> str:
+    stem, ext = posixpath.splitext(key)
+    return f"{BUILD_DIRNAME}/{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+def _compressors():
+    compressors = {"gzip": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        app.logger.warning("The brotli package is not installed; only gzip copies are written.")
+    else:
+        compressors["br"] = lambda data: brotli.compress(data, quality=11)
+    return compressors
+
+
+class _Builder:
+    def __init__(self, sources: Iterable[str], compress: bool):
+        self.root = static_root()
+        self.sources = set(sources)
+        self.compressors = _compressors() if compress else {}
+        self.manifest: Dict[str, dict] = {}
+        self.stats = {"files": 0, "written": 0, "source_bytes": 0, "compressed_bytes": 0}
+        self._building: set = set()
+
+    def build(self, key: str) -> Optional[dict]:
+        if key in self.manifest:
+            return self.manifest[key]
+        if key not in self.sources or key in self._building:
+            return None
+        self._building.add(key)
+        with open(os.path.join(self.root, key), "rb") as handle:
+            data = handle.read()
+        if key.endswith(".css"):
+            data = self._rewrite_css(key, data)
+        relative = _hashed_path(key, data)
+        target = os.path.join(self.root, relative)
+        if not os.path.exists(target):
+            _write_atomic(target, data)
+            self.stats["written"] += 1
+        entry = {"path": relative, "size": len(data), "encodings": []}
+        if key.lower().endswith(COMPRESSIBLE_EXTENSIONS) and len(data) >= MIN_COMPRESS_SIZE:
+            for encoding, suffix in ENCODINGS:
+                compress = self.compressors.get(encoding)
+                if compress is None:
+                    continue
+                if os.path.exists(target + suffix):
+                    size = os.path.getsize(target + suffix)
+                else:
+                    compressed = compress(data)
+                    size = len(compressed)
+                    # Keep only copies that save at least 5 %.
+                    if size < len(data) * 0.95:
+                        _write_atomic(target + suffix, compressed)
+                if size < len(data) * 0.95:
+                    entry["encodings"].append(encoding)
+                    self.stats["compressed_bytes"] += size
+        self.stats["files"] += 1
+        self.stats["source_bytes"] += len(data)
+        self._building.discard(key)
+        self.manifest[key] = entry
+        return entry
+
+    def _resolve(self, key: str, reference: str) -> Optional[str]:
+        """Rewrite a stylesheet *reference* relative to the hashed copy of *key*."""
+        if reference.startswith(("data:", "http:", "https:", "//", "#", "/", "about:")) or "{" in reference:
+            return None
+        path, sep, suffix = reference.partition("?")
+        if not sep:
+            path, sep, suffix = reference.partition("#")
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(key), path))
+        if target.startswith("../"):
+            return None
+        entry = self.build(target)
+        resolved = entry["path"] if entry else target
+        start = posixpath.dirname(_hashed_path(key, b""))
+        return posixpath.relpath(resolved, start) + (sep + suffix if sep else "")
+
+    def _rewrite_css(self, key: str, data: bytes) -> bytes:
+        text = data.decode("utf-8", errors="surrogateescape")
+
+        def replace(match):
+            resolved = self._resolve(key, match.group(2).strip())
+            if resolved is None:
+                return match.group(0)
+            return match.group(0).replace(match.group(2), resolved, 1)
+
+        text = _CSS_URL.sub(replace, text)
+        text = _CSS_IMPORT.sub(replace, text)
+        return text.encode("utf-8", errors="surrogateescape")
+
+
+def _load_retired() -> Dict[str, float]:
+    try:
+        with open(os.path.join(build_root(), RETIRED_FILENAME), encoding="utf-8") as handle:
+            return {str(name): float(when) for name, when in json.load(handle).items()}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def build_assets(
+    directories: Iterable[str] = ASSET_DIRS,
+    compress: bool = True,
+    retention: float = STALE_ASSET_RETENTION,
+) -> Dict[str, int]:
+    """Fingerprint and precompress the static bundles, then rewrite the manifest.
+
+    Unchanged files keep their hashed name and are not rewritten.  Built files
+    no longer referenced by the manifest are deleted once they have been
+    unreferenced for *retention* seconds.
+    """
+    root = static_root()
+    missing = [name for name in directories if not os.path.isdir(os.path.join(root, name))]
+    if missing:
+        raise AssetBuildError(f"Unknown static directories: {', '.join(missing)}")
+    builder = _Builder(_iter_sources(root, directories), compress)
+    for key in sorted(builder.sources):
+        builder.build(key)
+
+    _write_atomic(manifest_path(), json.dumps(builder.manifest, indent=1, sort_keys=True).encode("utf-8"))
+    reset_manifest_cache()
+    referenced = {MANIFEST_FILENAME, RETIRED_FILENAME}
+    for entry in builder.manifest.values():
+        name = posixpath.relpath(entry["path"], BUILD_DIRNAME)
+        referenced.add(name)
+        referenced.update(name + suffix for encoding, suffix in ENCODINGS if encoding in entry["encodings"])
+    previously_retired = _load_retired()
+    retired: Dict[str, float] = {}
+    now = time.time()
+    removed = 0
+    for directory, _, filenames in os.walk(build_root()):
+        for filename in filenames:
+            relative = os.path.relpath(os.path.join(directory, filename), build_root()).replace(os.sep, "/")
+            if relative in referenced:
+                continue
+            retired_at = previously_retired.get(relative, now)
+            if now - retired_at >= retention:
+                os.unlink(os.path.join(directory, filename))
+                removed += 1
+            else:
+                retired[relative] = retired_at
+    _write_atomic(
+        os.path.join(build_root(), RETIRED_FILENAME),
+        json.dumps(retired, indent=1, sort_keys=True).encode("utf-8"),
+    )
+    return dict(builder.stats, removed=removed, retained=len(retired))
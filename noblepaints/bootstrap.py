@@ -0,0 +1,251 @@
+"""Database migration and one-off start-up work.
+
+Importing the routes module used to create tables and indexes, inspect
+legacy tables for missing columns, build the search index, check the admin
+password with bcrypt and pre-warm the caches, in every Passenger worker on
+every spawn.  That work now lives here and runs from the CLI::
+
+    flask migrate     # schema: tables, indexes, legacy columns, search index
+    flask bootstrap   # migrate + default admin user + warm the shared caches
+
+Workers only compare ``PRAGMA user_version`` with :data:`SCHEMA_VERSION`
+once (see :func:`ensure_schema`).  When a deployment forgot to migrate they
+run the migration themselves unless ``AUTO_MIGRATE`` is disabled.  A file
+lock in the instance folder serialises migrations across worker processes
+and the CLI; whoever gets it second re-reads the version and skips the work.
+
+Bump :data:`SCHEMA_VERSION` whenever :func:`migrate_database` learns a new
+step.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
+
+from datetime import datetime
+
+from sqlalchemy import func, inspect, or_, text
+
+from noblepaints import app, db
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialised
+    fcntl = None
+
+SCHEMA_VERSION = 4
+
+INDEX_STATEMENTS = (
+    "CREATE INDEX IF NOT EXISTS idx_categories_id ON categories(category_id)",
+    "CREATE INDEX IF NOT EXISTS idx_products_category ON products(category)",
+    "CREATE INDEX IF NOT EXISTS idx_products_lang ON products(lang)",
+    "CREATE INDEX IF NOT EXISTS idx_catalogs_lang ON catalogs(lang)",
+    "CREATE INDEX IF NOT EXISTS idx_catalogs_category ON catalogs(category)",
+    "CREATE INDEX IF NOT EXISTS ix_products_category_id ON products(category_id)",
+    "CREATE INDEX IF NOT EXISTS ix_catalogs_category_id ON catalogs(category_id)",
+    'CREATE INDEX IF NOT EXISTS "ix_technicalDatasheets_category_id" ON "technicalDatasheets"(category_id)',
+    "CREATE INDEX IF NOT EXISTS ix_post_lang_view_count ON post(lang, view_count)",
+)
+
+# (table, column, column definition) added to databases created before the column existed.
+LEGACY_COLUMNS = (
+    ("certificate", "lang", "VARCHAR"),
+    ("approval", "lang", "VARCHAR"),
+    ("upload", "size", "INTEGER"),
+    ("upload", "checksum", "VARCHAR(64)"),
+    ("upload", "updated_at", "DATETIME"),
+    ("products", "category_id", "INTEGER REFERENCES categories(category_id)"),
+    ("catalogs", "category_id", "INTEGER REFERENCES categories(category_id)"),
+    ("technicalDatasheets", "category_id", "INTEGER REFERENCES categories(category_id)"),
+    ("post", "view_count", "INTEGER NOT NULL DEFAULT 0"),
+)
+
+MIGRATION_LOCK_FILENAME = "migrate.lock"
+
+_schema_lock = threading.Lock()
+_schema_checked = False
+_migration_lock = threading.Lock()
+
+
+def schema_version() -> int:
+    return int(db.session.execute(text("PRAGMA user_version")).scalar() or 0)
+
+
+def ensure_column(table_name: str, column_name: str, ddl: str) -> bool:
+    """Add *column_name* to *table_name* if it is missing."""
+    try:
+        columns = {column["name"] for column in inspect(db.engine).get_columns(table_name)}
+    except Exception:
+        return False
+    if column_name in columns:
+        return False
+    with db.engine.begin() as connection:
+        connection.execute(text(f'ALTER TABLE "{table_name}" ADD COLUMN {column_name} {ddl}'))
+    app.logger.info("Added missing column %r to %r.", column_name, table_name)
+    return True
+
+
+def migrate_post_views() -> bool:
+    """Move the old string ``post.views`` counts into ``post.view_count``."""
+    columns = {column["name"] for column in inspect(db.engine).get_columns("post")}
+    if "views" not in columns:
+        return False
+    with db.engine.begin() as connection:
+        connection.execute(text(
+            "UPDATE post SET view_count = CAST(views AS INTEGER) "
+            "WHERE view_count = 0 AND TRIM(views) GLOB '[0-9]*'"
+        ))
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(text("ALTER TABLE post DROP COLUMN views"))
+    except Exception as exc:  # SQLite before 3.35 cannot drop columns
+        app.logger.warning("Kept the legacy post.views column: %s", exc)
+    return True
+
+
+def backfill_upload_metadata() -> int:
+    """Record size, checksum and date of uploads stored before those columns existed.
+
+    Each payload is hashed chunk by chunk and committed on its own, so large
+    tables make progress even if the command is interrupted.
+    """
+    from noblepaints.models import Upload
+    from noblepaints.streaming import blob_digest, blob_length
+
+    pending = [
+        upload_id
+        for (upload_id,) in db.session.query(Upload.id).filter(
+            or_(Upload.size.is_(None), Upload.checksum.is_(None), Upload.checksum == "", Upload.updated_at.is_(None))
+        )
+    ]
+    now = datetime.utcnow().replace(microsecond=0)
+    for upload_id in pending:
+        size = blob_length("upload", "data", upload_id)
+        checksum = blob_digest("upload", "data", upload_id, size)
+        db.session.query(Upload).filter(Upload.id == upload_id).update(
+            {"size": size, "checksum": checksum, "updated_at": func.coalesce(Upload.updated_at, now)},
+            synchronize_session=False,
+        )
+        db.session.commit()
+    return len(pending)
+
+
+@contextmanager
+def migration_lock() -> Iterator[None]:
+    """Hold the migration lock of this instance, shared by all processes."""
+    with _migration_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(app.instance_path, exist_ok=True)
+        with open(os.path.join(app.instance_path, MIGRATION_LOCK_FILENAME), "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def migrate_database(if_outdated: bool = False) -> List[str]:
+    """Bring the schema up to date and return a description of each step.
+
+    With *if_outdated* nothing is done (and an empty list returned) when the
+    schema is already current once the lock is held.
+    """
+    with migration_lock():
+        # Start a fresh read: another process may have migrated meanwhile.
+        db.session.rollback()
+        if if_outdated and schema_version() >= SCHEMA_VERSION:
+            return []
+        return _migrate()
+
+
+def _migrate() -> List[str]:
+    from noblepaints.facets import backfill_category_ids
+    from noblepaints.search import ensure_search_index
+
+    steps = []
+    db.create_all()
+    steps.append("tables created/verified")
+    added = [f"{table}.{column}" for table, column, ddl in LEGACY_COLUMNS if ensure_column(table, column, ddl)]
+    steps.append(f"added columns: {', '.join(added)}" if added else "legacy columns present")
+    if migrate_post_views():
+        steps.append("copied post views into post.view_count")
+    with db.engine.begin() as connection:
+        for statement in INDEX_STATEMENTS:
+            connection.execute(text(statement))
+    steps.append(f"{len(INDEX_STATEMENTS)} indexes created/verified")
+    steps.append(f"resolved category ids for {backfill_category_ids()} rows")
+    steps.append(f"recorded size and checksum of {backfill_upload_metadata()} uploads")
+    if ensure_search_index():
+        steps.append("product search index ready")
+    else:
+        steps.append("FTS5 unavailable; search falls back to LIKE")
+    db.session.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+    db.session.commit()
+    return steps
+
+
+def ensure_admin_user() -> str:
+    """Create the default admin user or sync its password from configuration."""
+    from noblepaints.models import User
+
+    default_username = os.environ.get("ADMIN_INITIAL_USERNAME", "admin")
+    configured_password = os.environ.get("ADMIN_INITIAL_PASSWORD") or app.config.get("DEFAULT_ADMIN_PASSWORD")
+    fallback_password = configured_password or "ChangeMe123!"
+    existing_admin = db.session.query(User).filter(func.lower(User.username) == default_username.lower()).first()
+    if not existing_admin:
+        admin_user = User(username=default_username, full_name="Administrator")
+        admin_user.set_password(fallback_password)
+        db.session.add(admin_user)
+        db.session.commit()
+        if configured_password:
+            return f"Created default admin user '{default_username}' using configured credentials."
+        return f"Created default admin user '{default_username}' with fallback password '{fallback_password}'. Change it immediately."
+    if configured_password and not existing_admin.check_password(configured_password):
+        existing_admin.set_password(configured_password)
+        db.session.commit()
+        return f"Updated default admin user '{default_username}' password from configuration."
+    return f"Default admin user '{default_username}' is up to date."
+
+
+# Callables that fill the shared query cache; routes registers its own.
+cache_warmers: List[Callable[[], object]] = []
+
+
+def warm_caches() -> int:
+    """Run every registered cache warmer and return how many succeeded."""
+    warmed = 0
+    for warmer in cache_warmers:
+        try:
+            warmer()
+            warmed += 1
+        except Exception as exc:
+            app.logger.warning("Cache warmer %s failed: %s", getattr(warmer, "__name__", warmer), exc)
+    return warmed
+
+
+def ensure_schema() -> None:
+    """Check the schema version once per process, migrating if allowed."""
+    global _schema_checked
+    if _schema_checked:
+        return
+    with _schema_lock:
+        if _schema_checked:
+            return
+        current = schema_version()
+        if current < SCHEMA_VERSION:
+            if app.config.get("AUTO_MIGRATE", True):
+                app.logger.warning("Database schema is at version %s, migrating to %s.", current, SCHEMA_VERSION)
+                if migrate_database(if_outdated=True):
+                    app.logger.warning(ensure_admin_user())
+            else:
+                app.logger.error(
+                    "Database schema is at version %s but %s is required; run `flask migrate`.",
+                    current,
+                    SCHEMA_VERSION,
+                )
+        _schema_checked = True
@@ -0,0 +1,505 @@
+"""Bulk import and export of products, catalogs and technical datasheets.
+
+The control panel adds content one row at a time through JSON endpoints that
+commit individually, which does not scale to loading a catalogue of tens of
+thousands of rows.  ``flask import-content`` and ``flask export-content``
+stream CSV or JSON Lines files instead:
+
+* rows are read and written one at a time and the session is cleared after
+  every batch, so memory stays flat whatever the file size;
+* each batch of :data:`DEFAULT_BATCH_SIZE` rows is one transaction; existing
+  rows are looked up with one query per batch and matched on the natural key
+  of their kind (:attr:`ContentKind.key`), so re-running an import updates
+  rows instead of duplicating them;
+* columns missing from the file are left untouched on update;
+* attachments (product datasheets and catalog PDFs) are files in a separate
+  directory, referenced by a path relative to it.  They are copied into the
+  ``upload`` table chunk by chunk through the SQLite blob API and exported
+  back the same way, so even files of several hundred megabytes are never
+  held in memory.  A bare number refers to an existing upload id.
+
+Rows that fail validation, or whose writes the database rejects, are skipped
+and reported with their line number; each row runs in a savepoint, so the
+rest of its batch is still written.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.utils import secure_filename
+
+from noblepaints import app, db
+from noblepaints.facets import assign_category
+from noblepaints.i18n import AVAILABLE_LANGUAGES
+from noblepaints.media import MIME_EXTENSIONS, MediaError, is_data_url, store_bytes, store_image
+from noblepaints.models import Catalog, Product, TechnicalDatasheet, Upload
+from noblepaints.search import index_product
+from noblepaints.streaming import CHUNK_SIZE, BlobReader, max_blob_size, write_blob
+
+FORMATS = ("csv", "jsonl")
+FORMAT_EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+DEFAULT_BATCH_SIZE = 500
+# Only the first few row errors are kept for the summary; all are logged.
+MAX_REPORTED_ERRORS = 20
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+class BulkError(ValueError):
+    """Raised when a file or a row cannot be imported or exported."""
+
+
+@dataclass(frozen=True)
+class ContentKind:
+    """How one table maps to the columns of an import/export file.
+
+    ``key`` is the natural key rows are matched on, ``required`` the fields a
+    row must end up with and ``attachment`` the column (if any) that holds an
+    upload id.
+    """
+
+    name: str
+    model: Any
+    fields: Tuple[str, ...]
+    key: Tuple[str, ...]
+    required: Tuple[str, ...]
+    attachment: Optional[str] = None
+    has_lang: bool = True
+
+
+KINDS: Dict[str, ContentKind] = {
+    "products": ContentKind(
+        "products", Product,
+        fields=("name", "lang", "desc", "category", "country", "img", "datasheet"),
+        key=("name", "lang"),
+        required=("name", "desc"),
+        attachment="datasheet",
+    ),
+    "catalogs": ContentKind(
+        "catalogs", Catalog,
+        fields=("name", "country", "category", "img", "link"),
+        key=("name", "country"),
+        required=("name", "link"),
+        attachment="link",
+        has_lang=False,
+    ),
+    "datasheets": ContentKind(
+        "datasheets", TechnicalDatasheet,
+        fields=("name", "lang", "category", "country", "link"),
+        key=("name", "lang"),
+        required=("name", "link"),
+    ),
+}
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    """Return *fmt*, or the format implied by the extension of *path*."""
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMAT_EXTENSIONS:
+        raise BulkError(f"Cannot tell the format of {path!r}; pass --format ({', '.join(FORMATS)}).")
+    return FORMAT_EXTENSIONS[extension]
+
+
+def _open_text(path: str, mode: str):
+    if path == "-":
+        stream = sys.stdin if mode == "r" else sys.stdout
+        return open(stream.fileno(), mode, encoding="utf-8", newline="", closefd=False)
+    return open(path, mode, encoding="utf-8-sig" if mode == "r" else "utf-8", newline="")
+
+
+def read_rows(path: str, fmt: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield ``(line_number, row)`` pairs from a CSV or JSON Lines file."""
+    with _open_text(path, "r") as handle:
+        if fmt == "csv":
+            reader = csv.DictReader(handle)
+            for row in reader:
+                yield reader.line_num, {key.strip(): value for key, value in row.items() if key}
+            return
+        for line_number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_number, {"__error__": f"Invalid JSON: {exc}"}
+                continue
+            if not isinstance(row, dict):
+                row = {"__error__": "Each line must be a JSON object."}
+            yield line_number, row
+
+
+class _RowWriter:
+    def __init__(self, handle, fmt: str, fields: Tuple[str, ...]):
+        self.handle = handle
+        self.fmt = fmt
+        if fmt == "csv":
+            self._csv = csv.DictWriter(handle, fieldnames=fields, lineterminator="\n")
+            self._csv.writeheader()
+
+    def write(self, row: Dict[str, Any]) -> None:
+        if self.fmt == "csv":
+            self._csv.writerow({key: "" if value is None else value for key, value in row.items()})
+        else:
+            self.handle.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def _clean(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _lang(value: Any) -> str:
+    value = (_clean(value) or "").lower()
+    return value if value in AVAILABLE_LANGUAGES else "en"
+
+
+def _natural_key(kind: ContentKind, values: Dict[str, Any]) -> Tuple:
+    return tuple(values.get(field) for field in kind.key)
+
+
+def _resolve_path(root: Optional[str], relative: str) -> str:
+    if root is None:
+        raise BulkError(f"{relative!r} names a file but no attachments directory was given.")
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, relative))
+    if os.path.commonpath([root, path]) != root:
+        raise BulkError(f"{relative!r} points outside the attachments directory.")
+    if not os.path.isfile(path):
+        raise BulkError(f"Attachment {relative!r} does not exist.")
+    return path
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_SIZE * 4), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Importer:
+    """Upsert the rows of one file into the table of *kind*."""
+
+    def __init__(
+        self,
+        kind: ContentKind,
+        attachments: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        dry_run: bool = False,
+        progress: Optional[ProgressCallback] = None,
+    ):
+        self.kind = kind
+        self.attachments = attachments
+        self.batch_size = max(batch_size, 1)
+        self.dry_run = dry_run
+        self.progress = progress
+        self.started = time.monotonic()
+        self.stats: Dict[str, Any] = {
+            "rows": 0, "inserted": 0, "updated": 0, "unchanged": 0, "failed": 0,
+            "attachments": 0, "attachment_bytes": 0, "errors": [],
+        }
+
+    def run(self, rows: Iterator[Tuple[int, Dict[str, Any]]]) -> Dict[str, Any]:
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        for item in rows:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                self._import_batch(batch)
+                batch = []
+        if batch:
+            self._import_batch(batch)
+        self.stats["elapsed"] = time.monotonic() - self.started
+        return self.stats
+
+    def _fail(self, line_number: int, message: str) -> None:
+        self.stats["failed"] += 1
+        app.logger.warning("%s line %s: %s", self.kind.name, line_number, message)
+        if len(self.stats["errors"]) < MAX_REPORTED_ERRORS:
+            self.stats["errors"].append((line_number, message))
+
+    def _values(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if "__error__" in row:
+            raise BulkError(row["__error__"])
+        values = {field: _clean(row[field]) for field in self.kind.fields if field in row}
+        if self.kind.has_lang:
+            values["lang"] = _lang(values.get("lang"))
+        if not values.get("name"):
+            raise BulkError("name is required.")
+        return values
+
+    def _existing(self, keyed: List[Tuple[int, Dict[str, Any]]]) -> Dict[Tuple, Any]:
+        model = self.kind.model
+        names = {values["name"] for _, values in keyed}
+        found: Dict[Tuple, Any] = {}
+        if names:
+            for instance in db.session.query(model).filter(model.name.in_(names)).order_by(model.id):
+                values = {field: getattr(instance, field) for field in self.kind.key}
+                if "lang" in values:
+                    values["lang"] = _lang(values["lang"])
+                found.setdefault(_natural_key(self.kind, values), instance)
+        return found
+
+    def _import_batch(self, batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+        keyed = []
+        for line_number, row in batch:
+            self.stats["rows"] += 1
+            try:
+                keyed.append((line_number, self._values(row)))
+            except BulkError as exc:
+                self._fail(line_number, str(exc))
+
+        existing = self._existing(keyed)
+        touched = []
+        for line_number, values in keyed:
+            key = _natural_key(self.kind, values)
+            instance = existing.get(key)
+            try:
+                with db.session.begin_nested():
+                    changed = self._apply(instance, values)
+            except (ValueError, MediaError, OSError, SQLAlchemyError) as exc:
+                self._fail(line_number, str(exc))
+                continue
+            if changed is None:
+                self.stats["unchanged"] += 1
+                continue
+            if instance is None:
+                db.session.add(changed)
+                existing[key] = changed
+                self.stats["inserted"] += 1
+            else:
+                self.stats["updated"] += 1
+            touched.append(changed)
+
+        db.session.flush()
+        if self.kind.model is Product:
+            for product in touched:
+                index_product(product)
+        if self.dry_run:
+            db.session.rollback()
+        else:
+            db.session.commit()
+        db.session.expunge_all()
+        if self.progress:
+            self.progress(dict(self.stats, elapsed=time.monotonic() - self.started))
+
+    def _apply(self, instance, values: Dict[str, Any]):
+        """Copy *values* onto *instance* (a new row when ``None``).
+
+        Returns the row when anything changed, otherwise ``None``.  The image
+        and attachment are resolved before any field is assigned, so a row
+        that fails leaves *instance* untouched.
+        """
+        kind = self.kind
+        target = {field: value for field, value in values.items() if field != kind.attachment}
+        if instance is not None:
+            for field in kind.required:
+                if field in target and not target[field]:
+                    raise BulkError(f"{field} cannot be empty.")
+        else:
+            missing = [field for field in kind.required
+                       if not (values.get(field) if field == kind.attachment else target.get(field))]
+            if missing:
+                raise BulkError(f"{', '.join(missing)} required for a new row.")
+
+        if "img" in target:
+            target["img"] = self._image(target["img"])
+        reference = values.get(kind.attachment) if kind.attachment else None
+        if reference:
+            current = getattr(instance, kind.attachment) if instance is not None else None
+            target[kind.attachment] = str(self._attachment(reference, current))
+
+        if instance is None:
+            instance = kind.model()
+        changed = instance.id is None
+        for field, value in target.items():
+            if field == "category":
+                if value != instance.category:
+                    assign_category(instance, value)
+                    changed = True
+            elif field == kind.attachment:
+                if value != str(getattr(instance, field) or ""):
+                    setattr(instance, field, value)
+                    changed = True
+            elif getattr(instance, field) != value:
+                setattr(instance, field, value)
+                changed = True
+        return instance if changed else None
+
+    def _image(self, value: Optional[str]) -> Optional[str]:
+        """Keep URLs, store ``data:`` URLs and files from the attachments directory."""
+        if not value or value.startswith(("/", "http:", "https:", "//")):
+            return value
+        if is_data_url(value):
+            return value if self.dry_run else store_image(value)
+        path = _resolve_path(self.attachments, value)
+        mime = mimetypes.guess_type(path)[0]
+        if mime not in MIME_EXTENSIONS:
+            raise BulkError(f"Unsupported image type for {value!r}.")
+        if self.dry_run:
+            return value
+        with open(path, "rb") as handle:
+            return store_bytes(handle.read(), mime)
+
+    def _attachment(self, reference: str, current: Optional[str]) -> Any:
+        """Return the upload id for *reference*, storing the file when needed."""
+        if reference.isdigit():
+            if db.session.query(Upload.id).filter(Upload.id == int(reference)).first() is None:
+                raise BulkError(f"Upload {reference} does not exist.")
+            return reference
+        path = _resolve_path(self.attachments, reference)
+        size = os.path.getsize(path)
+        limit = max_blob_size()
+        if limit is not None and size > limit:
+            raise BulkError(f"Attachment {reference!r} is {size} bytes; the database stores at most {limit}.")
+        checksum = _file_digest(path)
+        if current and str(current).isdigit():
+            stored = (
+                db.session.query(Upload.size, Upload.checksum)
+                .filter(Upload.id == int(current))
+                .first()
+            )
+            if stored is not None and stored.size == size and stored.checksum == checksum:
+                return current
+        self.stats["attachments"] += 1
+        self.stats["attachment_bytes"] += size
+        if self.dry_run:
+            return reference
+
+        # The row's savepoint (see _import_batch) drops a half-written upload
+        # if the file cannot be read to the end.
+        upload = Upload(
+            filename=os.path.basename(path),
+            size=size,
+            checksum=checksum,
+            updated_at=datetime.utcnow().replace(microsecond=0),
+        )
+        db.session.add(upload)
+        db.session.flush()
+        with open(path, "rb") as handle:
+            write_blob(Upload.__tablename__, "data", upload.id, handle, size)
+        return upload.id
+
+
+def import_content(
+    kind: str,
+    path: str,
+    fmt: Optional[str] = None,
+    attachments: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """Upsert the rows of the CSV/JSONL file at *path* into the *kind* table."""
+    if kind not in KINDS:
+        raise BulkError(f"Unknown content kind: {kind}.")
+    if attachments is not None and not os.path.isdir(attachments):
+        raise BulkError(f"Attachments directory {attachments!r} does not exist.")
+    importer = Importer(KINDS[kind], attachments, batch_size, dry_run, progress)
+    return importer.run(read_rows(path, detect_format(path, fmt)))
+
+
+def _export_upload(upload, directory: str, kind: str) -> Tuple[str, int]:
+    """Copy one stored upload to *directory* and return ``(relative_path, bytes_written)``."""
+    filename = secure_filename(upload.filename or "") or "file"
+    relative = f"{kind}/{upload.id}-{filename}"
+    target = os.path.join(directory, *relative.split("/"))
+    size = upload.size or 0
+    if os.path.isfile(target) and os.path.getsize(target) == size:
+        return relative, 0
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".export-")
+    reader = BlobReader(Upload.__tablename__, "data", upload.id, size)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            for chunk in iter(lambda: reader.read(CHUNK_SIZE * 4), b""):
+                handle.write(chunk)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    finally:
+        reader.close()
+    return relative, size
+
+
+def export_content(
+    kind: str,
+    path: str,
+    fmt: Optional[str] = None,
+    attachments: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """Write every row of the *kind* table to *path* in primary-key order.
+
+    With *attachments*, referenced uploads are copied below that directory
+    and the attachment column holds their relative path; otherwise it keeps
+    the upload id.  Files already exported with the same size are skipped,
+    so an interrupted export can simply be run again.
+    """
+    if kind not in KINDS:
+        raise BulkError(f"Unknown content kind: {kind}.")
+    content = KINDS[kind]
+    model = content.model
+    columns = [getattr(model, field) for field in content.fields]
+    started = time.monotonic()
+    stats: Dict[str, Any] = {"rows": 0, "attachments": 0, "attachment_bytes": 0, "missing_attachments": 0}
+
+    with _open_text(path, "w") as handle:
+        writer = _RowWriter(handle, detect_format(path, fmt), content.fields)
+        last_id = 0
+        while True:
+            rows = (
+                db.session.query(model.id, *columns)
+                .filter(model.id > last_id)
+                .order_by(model.id)
+                .limit(max(batch_size, 1))
+                .all()
+            )
+            if not rows:
+                break
+            uploads = {}
+            if attachments and content.attachment:
+                ids = {int(row._mapping[content.attachment]) for row in rows
+                       if str(row._mapping[content.attachment] or "").isdigit()}
+                if ids:
+                    uploads = {
+                        upload.id: upload
+                        for upload in db.session.query(Upload.id, Upload.filename, Upload.size).filter(Upload.id.in_(ids))
+                    }
+            for row in rows:
+                last_id = row.id
+                record = {field: row._mapping[field] for field in content.fields}
+                reference = str(record.get(content.attachment) or "") if content.attachment else ""
+                if attachments and reference.isdigit():
+                    upload = uploads.get(int(reference))
+                    if upload is not None:
+                        record[content.attachment], written = _export_upload(upload, attachments, kind)
+                        stats["attachments"] += 1
+                        stats["attachment_bytes"] += written
+                    else:
+                        stats["missing_attachments"] += 1
+                writer.write(record)
+                stats["rows"] += 1
+            db.session.expunge_all()
+            if progress:
+                progress(dict(stats, elapsed=time.monotonic() - started))
+    stats["elapsed"] = time.monotonic() - started
+    return stats
@@ -0,0 +1,443 @@
+"""Two-tier query cache that stays coherent across worker processes.
+
+Passenger runs several worker processes and each used to keep its own
+``categories_cache`` dict: an edit only cleared the worker that handled it
+and, once the TTL lapsed, every worker hit the database at the same moment.
+
+:class:`QueryCache` layers
+
+* an in-process LRU (tier 1) in front of
+* an optional shared tier (tier 2) -- an SQLite file or a directory of
+  pickles that every worker on the host can read -- and
+* per-namespace version counters kept in the same shared store.
+
+Cached values are tagged with the versions of the namespaces (table names)
+they were computed from.  :func:`track_model_changes` bumps those versions
+after every committed write, so all workers see fresh data on their next
+lookup.  Expired entries are served stale for ``stale_ttl`` seconds while a
+single caller recomputes them (single-flight per process, plus a short
+cross-worker lease in the shared tier).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+_MISSING = object()
+
+
+class _Entry:
+    __slots__ = ("value", "versions", "expires_at", "stale_until")
+
+    def __init__(self, value, versions, expires_at, stale_until):
+        self.value = value
+        self.versions = versions
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+
+class _Flight:
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+class MemoryBackend:
+    """Process-local store; versions are only coherent within one worker."""
+
+    def __init__(self):
+        self._versions: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        return None
+
+    def set(self, key: str, entry: _Entry) -> None:
+        return None
+
+    def acquire_lease(self, key: str, ttl: float) -> bool:
+        return True
+
+    def release_lease(self, key: str) -> None:
+        return None
+
+    def versions(self, namespaces: Sequence[str]) -> Dict[str, Tuple[int, float]]:
+        with self._lock:
+            return {name: self._versions.get(name, (0, 0.0)) for name in namespaces}
+
+    def bump(self, namespaces: Iterable[str]) -> None:
+        now = time.time()
+        with self._lock:
+            for name in namespaces:
+                version, _ = self._versions.get(name, (0, 0.0))
+                self._versions[name] = (version + 1, now)
+
+
+class SQLiteBackend:
+    """Shared tier stored in a small SQLite file next to the application."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    stale_until REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS cache_versions (
+                    namespace TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS cache_leases (
+                    key TEXT PRIMARY KEY,
+                    expires_at REAL NOT NULL
+                );
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[_Entry]:
+        row = self._connect().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND stale_until > ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            return None
+
+    def set(self, key: str, entry: _Entry) -> None:
+        connection = self._connect()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, stale_until) VALUES (?, ?, ?)",
+            (key, pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL), entry.stale_until),
+        )
+        # Opportunistically drop long-dead entries so the file stays small.
+        connection.execute("DELETE FROM cache_entries WHERE stale_until < ?", (time.time() - 3600,))
+
+    def acquire_lease(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        connection = self._connect()
+        connection.execute("DELETE FROM cache_leases WHERE key = ? AND expires_at < ?", (key, now))
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO cache_leases (key, expires_at) VALUES (?, ?)", (key, now + ttl)
+        )
+        return cursor.rowcount == 1
+
+    def release_lease(self, key: str) -> None:
+        self._connect().execute("DELETE FROM cache_leases WHERE key = ?", (key,))
+
+    def versions(self, namespaces: Sequence[str]) -> Dict[str, Tuple[int, float]]:
+        if not namespaces:
+            return {}
+        placeholders = ", ".join("?" for _ in namespaces)
+        rows = self._connect().execute(
+            f"SELECT namespace, version, updated_at FROM cache_versions WHERE namespace IN ({placeholders})",
+            tuple(namespaces),
+        ).fetchall()
+        found = {name: (version, updated_at) for name, version, updated_at in rows}
+        return {name: found.get(name, (0, 0.0)) for name in namespaces}
+
+    def bump(self, namespaces: Iterable[str]) -> None:
+        now = time.time()
+        connection = self._connect()
+        for name in namespaces:
+            connection.execute(
+                "INSERT INTO cache_versions (namespace, version, updated_at) VALUES (?, 1, ?) "
+                "ON CONFLICT(namespace) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at",
+                (name, now),
+            )
+
+
+class FilesystemBackend:
+    """Shared tier made of pickle files; handy on hosts without SQLite WAL."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, "entries"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "versions"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "leases"), exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.directory, kind, hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def _write_atomic(self, path: str, payload: bytes) -> None:
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(payload)
+        os.replace(tmp_path, path)
+
+    def get(self, key: str) -> Optional[_Entry]:
+        try:
+            with open(self._path("entries", key), "rb") as handle:
+                entry = pickle.load(handle)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if entry.stale_until <= time.time():
+            return None
+        return entry
+
+    def set(self, key: str, entry: _Entry) -> None:
+        self._write_atomic(self._path("entries", key), pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def acquire_lease(self, key: str, ttl: float) -> bool:
+        path = self._path("leases", key)
+        try:
+            if time.time() - os.path.getmtime(path) > ttl:
+                os.unlink(path)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            return False
+
+    def release_lease(self, key: str) -> None:
+        try:
+            os.unlink(self._path("leases", key))
+        except OSError:
+            pass
+
+    def versions(self, namespaces: Sequence[str]) -> Dict[str, Tuple[int, float]]:
+        result = {}
+        for name in namespaces:
+            try:
+                with open(self._path("versions", name), "r", encoding="ascii") as handle:
+                    version, updated_at = handle.read().split()
+                result[name] = (int(version), float(updated_at))
+            except (OSError, ValueError):
+                result[name] = (0, 0.0)
+        return result
+
+    def bump(self, namespaces: Iterable[str]) -> None:
+        # The read-increment-write is guarded per process; concurrent bumps
+        # from two workers can collapse into one increment, which still
+        # changes the version and therefore still invalidates.
+        now = time.time()
+        with self._lock:
+            for name in namespaces:
+                version = self.versions([name])[name][0] + 1
+                self._write_atomic(self._path("versions", name), f"{version} {now}".encode("ascii"))
+
+
+class QueryCache:
+    """LRU cache whose entries are invalidated by namespace versions."""
+
+    def __init__(self, backend=None, max_entries: int = 512, version_check_interval: float = 1.0):
+        self.backend = backend or MemoryBackend()
+        self.max_entries = max_entries
+        self.version_check_interval = version_check_interval
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._known_versions: Dict[str, Tuple[int, float]] = {}
+        self._versions_checked_at: Dict[str, float] = {}
+
+    # -- versions -----------------------------------------------------------
+    def versions(self, namespaces: Sequence[str]) -> Dict[str, Tuple[int, float]]:
+        """Return ``{namespace: (version, updated_at)}``.
+
+        Shared versions are re-read at most every ``version_check_interval``
+        seconds per namespace; bumps made by this process are visible
+        immediately.
+        """
+        now = time.monotonic()
+        stale = [
+            name for name in namespaces
+            if now - self._versions_checked_at.get(name, float("-inf")) >= self.version_check_interval
+        ]
+        if stale:
+            fresh = self.backend.versions(stale)
+            with self._lock:
+                self._known_versions.update(fresh)
+                for name in stale:
+                    self._versions_checked_at[name] = now
+        return {name: self._known_versions.get(name, (0, 0.0)) for name in namespaces}
+
+    def version(self, namespace: str) -> int:
+        return self.versions([namespace])[namespace][0]
+
+    def bump(self, *namespaces: str) -> None:
+        """Invalidate everything computed from *namespaces* in every worker."""
+        if not namespaces:
+            return
+        self.backend.bump(namespaces)
+        fresh = self.backend.versions(namespaces)
+        now = time.monotonic()
+        with self._lock:
+            self._known_versions.update(fresh)
+            for name in namespaces:
+                self._versions_checked_at[name] = now
+
+    # -- entries ------------------------------------------------------------
+    @staticmethod
+    def make_key(key: Hashable) -> str:
+        return repr(key)
+
+    def _lookup(self, key: str) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = self.backend.get(key)
+        if entry is not None:
+            self._store_local(key, entry)
+        return entry
+
+    def _store_local(self, key: str, entry: _Entry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @contextmanager
+    def _flight(self, key: str, blocking: bool = True) -> Iterator[bool]:
+        """Hold the in-process lock for *key*; yields whether it was acquired.
+
+        A key's lock only lives while some caller holds or waits for it, so
+        keys built from client query strings cannot grow the table.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+            flight.users += 1
+        acquired = flight.lock.acquire(blocking)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                flight.lock.release()
+            with self._lock:
+                flight.users -= 1
+                if not flight.users:
+                    del self._flights[key]
+
+    def get_or_set(
+        self,
+        key: Hashable,
+        producer: Callable[[], Any],
+        namespaces: Sequence[str] = (),
+        ttl: float = 300,
+        stale_ttl: float = 60,
+    ) -> Any:
+        """Return the cached value for *key* or compute it with *producer*.
+
+        The entry is valid while the versions of *namespaces* are unchanged and
+        its TTL has not expired.  Past the TTL (but within ``stale_ttl``) the
+        old value keeps being served while one caller refreshes it.
+        """
+        cache_key = self.make_key(key)
+        versions = tuple(version for version, _ in self.versions(namespaces).values())
+        entry = self._lookup(cache_key)
+        now = time.time()
+        if entry is not None and entry.versions == versions:
+            if now < entry.expires_at:
+                return entry.value
+            if now < entry.stale_until:
+                with self._flight(cache_key, blocking=False) as acquired:
+                    if not acquired or not self.backend.acquire_lease(cache_key, ttl=30):
+                        return entry.value
+                    try:
+                        return self._refresh(cache_key, producer, versions, ttl, stale_ttl)
+                    finally:
+                        self.backend.release_lease(cache_key)
+
+        with self._flight(cache_key):
+            # Another thread may have filled the entry while we waited.
+            entry = self._lookup(cache_key)
+            if entry is not None and entry.versions == versions and time.time() < entry.expires_at:
+                return entry.value
+            return self._refresh(cache_key, producer, versions, ttl, stale_ttl)
+
+    def _refresh(self, cache_key: str, producer, versions, ttl: float, stale_ttl: float) -> Any:
+        value = producer()
+        now = time.time()
+        entry = _Entry(value, versions, now + ttl, now + ttl + stale_ttl)
+        self._store_local(cache_key, entry)
+        try:
+            self.backend.set(cache_key, entry)
+        except Exception:
+            # The shared tier is an optimisation; never fail a request on it.
+            pass
+        return value
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._known_versions.clear()
+            self._versions_checked_at.clear()
+
+
+def create_backend(config: Dict[str, Any]):
+    """Build the shared tier selected by ``CACHE_BACKEND``."""
+    kind = (config.get("CACHE_BACKEND") or "memory").lower()
+    if kind == "sqlite":
+        return SQLiteBackend(config["CACHE_SQLITE_PATH"])
+    if kind == "filesystem":
+        return FilesystemBackend(config["CACHE_DIR"])
+    return MemoryBackend()
+
+
+def track_model_changes(session_factory, cache: QueryCache) -> None:
+    """Bump the cache version of every table touched by a committed session."""
+
+    def changed_tables(session):
+        return session.info.setdefault("changed_tables", set())
+
+    @event.listens_for(session_factory, "after_flush")
+    def _collect_flushed(session, flush_context):
+        tables = changed_tables(session)
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            table = getattr(obj, "__table__", None)
+            if table is not None:
+                tables.add(table.name)
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _collect_bulk(orm_execute_state):
+        if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+            mapper = orm_execute_state.bind_mapper
+            if mapper is not None:
+                changed_tables(orm_execute_state.session).add(mapper.local_table.name)
+
+    @event.listens_for(session_factory, "after_commit")
+    def _bump_committed(session):
+        tables = session.info.pop("changed_tables", None)
+        if tables:
+            cache.bump(*sorted(tables))
+
+    @event.listens_for(session_factory, "after_rollback")
+    def _discard_rolled_back(session):
+        session.info.pop("changed_tables", None)
@@ -0,0 +1,225 @@
+"""Maintenance commands exposed through the ``flask`` CLI.
+
+Run them with ``FLASK_APP=noblepaints flask <command>`` from the project root.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+import click
+
+from noblepaints import app, db
+from noblepaints.assets import ASSET_DIRS, AssetBuildError, build_assets
+from noblepaints.database import PROFILES, benchmark_concurrency, run_maintenance
+from noblepaints.bulk import DEFAULT_BATCH_SIZE, FORMATS, KINDS, BulkError, export_content, import_content
+from noblepaints.bootstrap import SCHEMA_VERSION, ensure_admin_user, migrate_database, schema_version, warm_caches
+from noblepaints.images import DEFAULT_FORMATS, DEFAULT_WIDTHS, ImageBuildError, build_image_derivatives
+from noblepaints.media import migrate_inline_images
+from noblepaints.outbox import deliver_pending, outbox_sender
+from noblepaints.models import Approval, Catalog, Category, Certificate, Post, Product
+from noblepaints.search import ensure_search_index, rebuild_search_index
+
+
+@app.cli.command('migrate-media')
+@click.option('--batch-size', default=50, show_default=True, help='Rows rewritten per transaction.')
+@click.option('--dry-run', is_flag=True, help='Report what would change without writing anything.')
+def migrate_media_command(batch_size, dry_run):
+    """Move inline base64 images from the database into the media store."""
+    models = (Category, Product, Catalog, Post, Certificate, Approval)
+    stats = migrate_inline_images(models, batch_size=batch_size, dry_run=dry_run)
+    for table, table_stats in stats.items():
+        click.echo(
+            f"{table}: {table_stats['migrated']} migrated, {table_stats['failed']} failed, "
+            f"{table_stats['bytes_saved'] / (1024 * 1024):.1f} MiB saved"
+        )
+    if dry_run:
+        click.echo('Dry run: no rows were modified.')
+
+
+@app.cli.command('search-reindex')
+def search_reindex_command():
+    """Rebuild the FTS5 product search index from the products table."""
+    if not ensure_search_index():
+        raise click.ClickException('SQLite was built without FTS5; search uses LIKE filtering instead.')
+    click.echo(f'Indexed {rebuild_search_index()} products.')
+
+
+@app.cli.command('build-images')
+@click.option('--widths', default=','.join(map(str, DEFAULT_WIDTHS)), show_default=True, help='Comma separated breakpoint widths.')
+@click.option('--formats', default=','.join(DEFAULT_FORMATS), show_default=True, help='Comma separated output formats (avif, webp).')
+@click.option('--force', is_flag=True, help='Rebuild every image even if its source is unchanged.')
+def build_images_command(widths, formats, force):
+    """Build hashed AVIF/WebP derivatives of static/images and their manifest."""
+    try:
+        width_list = [int(width) for width in widths.split(',') if width.strip()]
+    except ValueError:
+        raise click.BadParameter('widths must be integers', param_hint='--widths')
+    format_list = [fmt.strip().lower() for fmt in formats.split(',') if fmt.strip()]
+    try:
+        stats = build_image_derivatives(widths=width_list, formats=format_list, force=force)
+    except ImageBuildError as exc:
+        raise click.ClickException(str(exc))
+    click.echo(
+        f"{stats['built']} built, {stats['skipped']} unchanged, {stats['failed']} failed; "
+        f"{stats['source_bytes'] / (1024 * 1024):.1f} MiB of sources -> "
+        f"{stats['derived_bytes'] / (1024 * 1024):.1f} MiB of derivatives"
+    )
+
+
+@app.cli.command('build-assets')
+@click.option('--dirs', default=','.join(ASSET_DIRS), show_default=True, help='Comma separated directories below static/.')
+@click.option('--no-compress', is_flag=True, help='Only write the hashed copies, without .br/.gz siblings.')
+def build_assets_command(dirs, no_compress):
+    """Write fingerprinted, precompressed copies of the static bundles and their manifest."""
+    directories = [name.strip().strip('/') for name in dirs.split(',') if name.strip()]
+    try:
+        stats = build_assets(directories, compress=not no_compress)
+    except AssetBuildError as exc:
+        raise click.ClickException(str(exc))
+    click.echo(
+        f"{stats['files']} assets ({stats['written']} new, {stats['removed']} stale removed, "
+        f"{stats['retained']} kept for pages cached before this build); "
+        f"{stats['source_bytes'] / (1024 * 1024):.1f} MiB -> "
+        f"{stats['compressed_bytes'] / (1024 * 1024):.1f} MiB of compressed copies"
+    )
+
+
+def _report_progress(stats):
+    click.echo(
+        f"  {stats['rows']} rows, {stats['attachment_bytes'] / (1024 * 1024):.1f} MiB of attachments "
+        f"({stats['rows'] / max(stats['elapsed'], 1e-6):.0f} rows/s)",
+        err=True,
+    )
+
+
+@app.cli.command('import-content')
+@click.argument('kind', type=click.Choice(sorted(KINDS)))
+@click.argument('source', type=click.Path(dir_okay=False, allow_dash=True))
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), help='File format; defaults to the file extension.')
+@click.option('--attachments', type=click.Path(file_okay=False, exists=True), help='Directory that attachment and image paths are relative to.')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Rows written per transaction.')
+@click.option('--dry-run', is_flag=True, help='Validate every row without writing anything.')
+def import_content_command(kind, source, fmt, attachments, batch_size, dry_run):
+    """Insert or update products, catalogs or datasheets from a CSV/JSONL file (see noblepaints.bulk)."""
+    try:
+        stats = import_content(kind, source, fmt=fmt, attachments=attachments, batch_size=batch_size,
+                               dry_run=dry_run, progress=_report_progress)
+    except (BulkError, OSError) as exc:
+        raise click.ClickException(str(exc))
+    for line_number, message in stats['errors']:
+        click.echo(f'  line {line_number}: {message}', err=True)
+    click.echo(
+        f"{kind}: {stats['rows']} rows in {stats['elapsed']:.1f} s; {stats['inserted']} inserted, "
+        f"{stats['updated']} updated, {stats['unchanged']} unchanged, {stats['failed']} failed; "
+        f"{stats['attachments']} attachments ({stats['attachment_bytes'] / (1024 * 1024):.1f} MiB)"
+    )
+    if dry_run:
+        click.echo('Dry run: no rows were modified.')
+
+
+@app.cli.command('export-content')
+@click.argument('kind', type=click.Choice(sorted(KINDS)))
+@click.argument('target', type=click.Path(dir_okay=False, allow_dash=True))
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), help='File format; defaults to the file extension.')
+@click.option('--attachments', type=click.Path(file_okay=False), help='Copy attachments below this directory and reference them by path.')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Rows read per query.')
+def export_content_command(kind, target, fmt, attachments, batch_size):
+    """Write products, catalogs or datasheets to a CSV/JSONL file (see noblepaints.bulk)."""
+    try:
+        stats = export_content(kind, target, fmt=fmt, attachments=attachments, batch_size=batch_size,
+                               progress=_report_progress)
+    except (BulkError, OSError) as exc:
+        raise click.ClickException(str(exc))
+    click.echo(
+        f"{kind}: {stats['rows']} rows in {stats['elapsed']:.1f} s; {stats['attachments']} attachments "
+        f"({stats['attachment_bytes'] / (1024 * 1024):.1f} MiB copied), "
+        f"{stats['missing_attachments']} missing",
+        err=target == '-',
+    )
+
+
+@app.cli.command('outbox-send')
+@click.option('--loop', is_flag=True, help='Keep polling the outbox instead of exiting when it is empty.')
+@click.option('--interval', default=outbox_sender.interval, show_default=True, help='Seconds between polls with --loop.')
+def outbox_send_command(loop, interval):
+    """Deliver queued contact form mail (see noblepaints.outbox)."""
+    total = 0
+    while True:
+        claimed = deliver_pending()
+        total += claimed
+        if claimed:
+            continue
+        if not loop:
+            break
+        time.sleep(interval)
+    click.echo(f'Processed {total} queued messages.')
+
+
+@app.cli.command('migrate')
+def migrate_command():
+    """Create tables, indexes and missing columns (see noblepaints.bootstrap)."""
+    click.echo(f'Schema version {schema_version()} -> {SCHEMA_VERSION}')
+    for step in migrate_database():
+        click.echo(f'  {step}')
+
+
+@app.cli.command('bootstrap')
+def bootstrap_command():
+    """Migrate, ensure the default admin user and warm the shared caches."""
+    for step in migrate_database():
+        click.echo(f'  {step}')
+    click.echo(ensure_admin_user())
+    click.echo(f'Warmed {warm_caches()} caches.')
+
+
+BOOT_PROBE = (
+    'import time; started = time.perf_counter(); '
+    'from noblepaints import create_app; create_app(); '
+    'print(time.perf_counter() - started)'
+)
+
+
+@app.cli.command('boot-time')
+@click.option('--runs', default=5, show_default=True, help='Number of fresh interpreters to time.')
+def boot_time_command(runs):
+    """Time importing the application in a fresh interpreter (a cold worker)."""
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', BOOT_PROBE],
+            cwd=os.path.dirname(app.root_path),
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise click.ClickException(result.stderr.strip() or 'application import failed')
+        timings.append(float(result.stdout.strip().splitlines()[-1]) * 1000)
+    timings.sort()
+    click.echo(
+        f'Cold start over {runs} runs: min {timings[0]:.0f} ms, '
+        f'median {timings[len(timings) // 2]:.0f} ms, max {timings[-1]:.0f} ms'
+    )
+
+
+@app.cli.command('db-maintenance')
+@click.option('--vacuum', is_flag=True, help='Also rebuild the database file (locks it while running).')
+def db_maintenance_command(vacuum):
+    """Refresh planner statistics and checkpoint the WAL (see noblepaints.database)."""
+    for step in run_maintenance(db.engine, vacuum=vacuum):
+        click.echo(f'  {step}')
+
+
+@app.cli.command('db-benchmark')
+@click.option('--readers', default=8, show_default=True, help='Concurrent reader threads.')
+@click.option('--duration', default=3.0, show_default=True, help='Seconds per profile.')
+def db_benchmark_command(readers, duration):
+    """Compare read/write throughput of the SQLite profiles on a scratch database."""
+    for name, pragmas in PROFILES.items():
+        result = benchmark_concurrency(pragmas, readers=readers, duration=duration)
+        click.echo(
+            f"{name:>10}: {result['reads_per_second']:9.0f} reads/s  "
+            f"{result['writes_per_second']:7.0f} writes/s  "
+            f"{result['locked_errors']} 'database is locked' errors"
+        )
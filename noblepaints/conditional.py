@@ -0,0 +1,108 @@
+"""Conditional GET for responses derived from database tables.
+
+Every committed write bumps the version of the tables it touched (see
+:func:`noblepaints.cache.track_model_changes`), so the versions of the tables
+a view reads identify the content it will render.  :func:`conditional_view`
+turns them into an ``ETag`` and ``Last-Modified`` pair and answers matching
+``If-None-Match``/``If-Modified-Since`` requests with ``304`` *before* the
+view runs, so revalidations cost no query, template rendering or JSON
+serialisation.
+
+The validator also covers the endpoint, its arguments, the active language,
+the deployed code and the static build, so a new release, an asset rebuild or
+a different language never revalidates an old copy.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from functools import lru_cache, wraps
+from typing import Callable, Iterable, Optional, Tuple
+
+from flask import Response, g, make_response, request
+from werkzeug.http import is_resource_modified
+
+from noblepaints import app, query_cache
+from noblepaints.assets import manifest_version
+
+
+@lru_cache(maxsize=1)
+def _code_token() -> str:
+    configured = app.config.get("RELEASE_ID")
+    if configured:
+        return str(configured)
+    latest = 0
+    for directory in (app.root_path, os.path.join(app.root_path, "templates")):
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith((".py", ".html")):
+                latest = max(latest, entry.stat().st_mtime_ns)
+    return f"{latest:x}"
+
+
+def release_token() -> str:
+    """Identify the deployed templates, code and static build.
+
+    Pages link to the hashed asset names of the build they were rendered
+    with, so ``flask build-assets`` changes the token as a new release does.
+    """
+    return f"{_code_token()}.{manifest_version()}"
+
+
+def content_validators(namespaces: Iterable[str], *extra) -> Tuple[str, Optional[datetime]]:
+    """Return ``(etag, last_modified)`` for content built from *namespaces*."""
+    versions = query_cache.versions(tuple(namespaces))
+    raw = repr((release_token(), sorted((name, version) for name, (version, _) in versions.items()), extra))
+    etag = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+    changed_at = max((updated_at for _, updated_at in versions.values()), default=0.0)
+    last_modified = datetime.fromtimestamp(int(changed_at), timezone.utc) if changed_at else None
+    return etag, last_modified
+
+
+def conditional_view(
+    namespaces: Iterable[str],
+    cache_control: Optional[str] = None,
+    validator: Optional[Callable[[], str]] = None,
+):
+    """Answer conditional GETs for a view that reads *namespaces*.
+
+    *cache_control* is applied to ``200`` and ``304`` responses that do not
+    set their own ``Cache-Control``.  *validator* returns a version for
+    content that does not live in the database (a data file digest, say);
+    it is mixed into the ``ETag``.  Responses that are not ``200`` or that
+    are marked ``no-store`` are returned without validators.
+    """
+    namespaces = tuple(namespaces)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(*args, **kwargs)
+
+            etag, last_modified = content_validators(
+                namespaces,
+                request.endpoint,
+                getattr(g, "current_lang", None),
+                sorted((request.view_args or {}).items()),
+                sorted(request.args.items(multi=True)),
+                validator() if validator else None,
+            )
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.cache_control.no_store:
+                    return response
+            if "ETag" not in response.headers:
+                response.set_etag(etag, weak=True)
+            if last_modified and "Last-Modified" not in response.headers:
+                response.last_modified = last_modified
+            if cache_control and "Cache-Control" not in response.headers:
+                response.headers["Cache-Control"] = cache_control
+            return response
+
+        return wrapper
+
+    return decorator
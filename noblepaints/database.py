@@ -0,0 +1,217 @@
+"""SQLite engine profile, maintenance and a concurrency benchmark.
+
+With SQLite's defaults (rollback journal, no busy timeout) a cpanel write
+blocks every public reader until it commits, and a reader that arrives
+mid-write fails with "database is locked" instead of waiting.
+
+``SQLITE_PROFILE`` selects one of :data:`PROFILES`.  Its pragmas are applied
+to every new connection (see :func:`install_pragmas`).  The ``production``
+profile switches to WAL, so readers never wait for the writer.  It also
+waits up to ``busy_timeout`` for the write lock instead of failing, keeps a
+larger page cache and memory-maps the file.  :func:`engine_options` sizes the
+connection pool for threaded workers.
+
+``flask db-maintenance`` runs ``PRAGMA optimize``/``ANALYZE``, checkpoints the
+WAL and optionally ``VACUUM``\\s; schedule it from cron, e.g.::
+
+    15 3 * * * cd /home/app && FLASK_APP=noblepaints flask db-maintenance
+    30 3 * * 0 cd /home/app && FLASK_APP=noblepaints flask db-maintenance --vacuum
+
+``flask db-benchmark`` compares the profiles with concurrent readers and a
+writer on a scratch database (:func:`benchmark_concurrency`).
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+
+PROFILES: Dict[str, Dict[str, Any]] = {
+    # SQLite's own defaults; kept for comparison and for read-only media.
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,  # milliseconds
+        "cache_size": -20000,  # negative: KiB, i.e. ~20 MiB per connection
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def profile_pragmas(config) -> Dict[str, Any]:
+    """Return the pragmas of the configured profile with per-pragma overrides."""
+    name = (config.get("SQLITE_PROFILE") or "production").lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE {name!r}; expected one of {', '.join(PROFILES)}")
+    pragmas = dict(PROFILES[name])
+    pragmas.update(config.get("SQLITE_PRAGMAS") or {})
+    return pragmas
+
+
+def engine_options(config) -> Dict[str, Any]:
+    """``SQLALCHEMY_ENGINE_OPTIONS`` for a file-backed SQLite database.
+
+    The options are specific to the ``sqlite3`` driver and a ``QueuePool``,
+    so any other ``DATABASE_URL`` (and in-memory SQLite, which SQLAlchemy
+    pools differently) keeps the defaults.
+    """
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return {}
+    busy_timeout = profile_pragmas(config).get("busy_timeout", 0)
+    return {
+        "connect_args": {
+            # The sqlite3 module's own wait for locks, in seconds.
+            "timeout": max(busy_timeout / 1000.0, 5.0),
+            # Pooled connections are handed between worker threads.
+            "check_same_thread": False,
+        },
+        "pool_size": config.get("SQLITE_POOL_SIZE", 8),
+        "max_overflow": config.get("SQLITE_MAX_OVERFLOW", 8),
+        "pool_timeout": config.get("SQLITE_POOL_TIMEOUT", 10),
+        # Connections never go stale on a local file.
+        "pool_pre_ping": False,
+    }
+
+
+def apply_pragmas(connection, pragmas: Dict[str, Any]) -> None:
+    """Run ``PRAGMA name = value`` on a DB-API *connection*."""
+    cursor = connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def install_pragmas(engine, pragmas: Dict[str, Any]) -> None:
+    """Apply *pragmas* to every connection *engine* opens."""
+    if not pragmas or engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def run_maintenance(engine, vacuum: bool = False) -> List[str]:
+    """Refresh planner statistics, checkpoint the WAL and optionally VACUUM."""
+    steps = []
+    database = engine.url.database
+    size_before = _file_size(database) + _file_size(f"{database}-wal")
+    with engine.connect() as connection:
+        connection.execute(text("PRAGMA analysis_limit = 1000"))
+        connection.execute(text("PRAGMA optimize"))
+        connection.execute(text("ANALYZE"))
+        connection.commit()
+        steps.append("statistics refreshed (PRAGMA optimize, ANALYZE)")
+        integrity = connection.execute(text("PRAGMA quick_check")).scalar()
+        steps.append(f"quick_check: {integrity}")
+        if vacuum:
+            connection.execute(text("VACUUM"))
+            steps.append("database vacuumed")
+        busy, log_frames, checkpointed = connection.execute(text("PRAGMA wal_checkpoint(TRUNCATE)")).one()
+        steps.append(f"WAL checkpoint: {checkpointed}/{log_frames} frames" + (" (busy)" if busy else ""))
+    size_after = _file_size(database) + _file_size(f"{database}-wal")
+    steps.append(f"size {size_before / 1024:.0f} KiB -> {size_after / 1024:.0f} KiB")
+    return steps
+
+
+def benchmark_concurrency(
+    pragmas: Dict[str, Any],
+    readers: int = 8,
+    duration: float = 3.0,
+    rows: int = 5000,
+) -> Dict[str, float]:
+    """Measure reads and writes per second with *readers* threads and one writer.
+
+    Runs against a scratch database shaped like the products table, so the
+    live database is never touched.
+    """
+    directory = tempfile.mkdtemp(prefix="noblepaints-bench-")
+    path = os.path.join(directory, "bench.db")
+    setup = sqlite3.connect(path)
+    setup.execute("CREATE TABLE IF NOT EXISTS products (id INTEGER PRIMARY KEY, name TEXT, lang TEXT, views INTEGER)")
+    setup.execute("CREATE INDEX IF NOT EXISTS ix_products_lang ON products(lang, id)")
+    setup.executemany(
+        "INSERT INTO products (name, lang, views) VALUES (?, ?, 0)",
+        ((f"Product {i}", "en" if i % 2 else "ar") for i in range(rows)),
+    )
+    setup.commit()
+    setup.close()
+
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    # Python's sqlite3 waits 5 s for locks unless told otherwise.
+    busy_timeout = pragmas.get("busy_timeout", 5000) / 1000.0
+
+    def connect():
+        connection = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False)
+        apply_pragmas(connection, pragmas)
+        return connection
+
+    def reader():
+        connection = connect()
+        done = errors = 0
+        while not stop.is_set():
+            try:
+                connection.execute(
+                    "SELECT id, name FROM products WHERE lang = ? ORDER BY id DESC LIMIT 12", ("en",)
+                ).fetchall()
+                done += 1
+            except sqlite3.OperationalError:
+                errors += 1
+        connection.close()
+        with lock:
+            counts["reads"] += done
+            counts["errors"] += errors
+
+    def writer():
+        connection = connect()
+        done = errors = 0
+        while not stop.is_set():
+            try:
+                connection.execute("UPDATE products SET views = views + 1 WHERE id = ?", (done % rows + 1,))
+                connection.commit()
+                done += 1
+            except sqlite3.OperationalError:
+                connection.rollback()
+                errors += 1
+        connection.close()
+        with lock:
+            counts["writes"] += done
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)] + [threading.Thread(target=writer)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    shutil.rmtree(directory, ignore_errors=True)
+    return {
+        "reads_per_second": counts["reads"] / elapsed,
+        "writes_per_second": counts["writes"] / elapsed,
+        "locked_errors": counts["errors"],
+    }
@@ -0,0 +1,233 @@
+"""Colour swatches and store locations read from JSON data files.
+
+``colors.html`` and ``locations.html`` used to carry their whole datasets in
+markup: about a thousand swatches (each repeated in a desktop chart and a
+mobile list) and every store card.  Each visit downloaded several hundred
+kilobytes of HTML, and changing a colour or a shop address meant editing a
+template.
+
+The data now lives in ``noblepaints/data/colors.json`` and
+``noblepaints/data/stores.json``.  Editors change those files; the pages are
+small shells that fetch paged, filtered slices from ``/api/colors/`` and
+``/api/stores/``.  Names and addresses carry both languages (``{"en": ...,
+"ar": ...}``), so one response serves either locale and can be cached by the
+browser and any proxy.
+
+A :class:`DataFile` re-reads its file when its modification time changes
+(checked at most every :data:`CHECK_INTERVAL` seconds).  Its
+:meth:`~DataFile.version` digest feeds the ``ETag`` of the API responses.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from noblepaints import app
+from noblepaints.search import normalise_text
+
+DATA_DIRNAME = "data"
+CHECK_INTERVAL = 2.0
+DEFAULT_PER_PAGE = 60
+MAX_PER_PAGE = 500
+
+
+class DataFileError(RuntimeError):
+    """Raised when a data file is missing or is not valid JSON."""
+
+
+class DataFile:
+    """A JSON file loaded on demand and reloaded when it changes on disk.
+
+    *prepare* turns the parsed document into the structure the callers use
+    (lookup maps, folded search text); it runs once per reload.
+    """
+
+    def __init__(self, filename: str, prepare: Optional[Callable[[Any], Any]] = None):
+        self.filename = filename
+        self.prepare = prepare
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        self._mtime: Optional[int] = None
+        self._version = ""
+        self._data: Any = None
+
+    @property
+    def path(self) -> str:
+        return os.path.join(app.root_path, DATA_DIRNAME, self.filename)
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._data is not None and now - self._checked < CHECK_INTERVAL:
+            return
+        with self._lock:
+            self._checked = now
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError as exc:
+                if self._data is None:
+                    raise DataFileError(f"Cannot read {self.filename}: {exc}") from exc
+                return
+            if mtime == self._mtime:
+                return
+            try:
+                with open(self.path, "rb") as handle:
+                    raw = handle.read()
+                document = json.loads(raw)
+            except (OSError, ValueError) as exc:
+                if self._data is None:
+                    raise DataFileError(f"Cannot read {self.filename}: {exc}") from exc
+                # Keep serving the previous copy while an edit is half-written.
+                app.logger.warning("Keeping the previous %s: %s", self.filename, exc)
+                return
+            self._data = self.prepare(document) if self.prepare else document
+            self._version = hashlib.sha1(raw).hexdigest()[:16]
+            self._mtime = mtime
+
+    def load(self) -> Any:
+        self._refresh()
+        return self._data
+
+    def version(self) -> str:
+        """Digest of the file contents currently served."""
+        self._refresh()
+        return self._version
+
+
+def paginate(items: List[Any], page: int, per_page: int) -> Dict[str, Any]:
+    """Slice *items* and describe the page the way the JSON endpoints return it."""
+    per_page = min(max(per_page, 1), MAX_PER_PAGE)
+    total = len(items)
+    pages = max((total + per_page - 1) // per_page, 1)
+    page = min(max(page, 1), pages)
+    start = (page - 1) * per_page
+    return {
+        "items": items[start:start + per_page],
+        "total": total,
+        "page": page,
+        "pages": pages,
+        "per_page": per_page,
+    }
+
+
+def _folded(*values: Any) -> str:
+    parts = []
+    for value in values:
+        if isinstance(value, dict):
+            parts.extend(str(text) for text in value.values())
+        elif value:
+            parts.append(str(value))
+    return normalise_text(" ".join(parts))
+
+
+def _prepare_colors(document: Dict[str, Any]) -> Dict[str, Any]:
+    families = []
+    by_key = {}
+    for family in document.get("families", []):
+        colors = [dict(color) for color in family.get("colors", [])]
+        entry = {
+            "key": family["key"],
+            "name": family.get("name", {}),
+            "hex": family.get("hex"),
+            "colors": colors,
+            "search": [_folded(color.get("code"), color.get("name")) for color in colors],
+        }
+        families.append(entry)
+        by_key[entry["key"]] = entry
+    return {"families": families, "by_key": by_key}
+
+
+def _prepare_stores(document: Dict[str, Any]) -> Dict[str, Any]:
+    stores = [dict(store) for store in document.get("stores", [])]
+    return {
+        "countries": document.get("countries", []),
+        "cities": document.get("cities", []),
+        "types": document.get("types", []),
+        "stores": stores,
+        "search": [_folded(store.get("name"), store.get("address")) for store in stores],
+    }
+
+
+colors_file = DataFile("colors.json", _prepare_colors)
+stores_file = DataFile("stores.json", _prepare_stores)
+
+
+def color_families() -> List[Dict[str, Any]]:
+    """Every colour family with its swatch count, in display order."""
+    return [
+        {"key": family["key"], "name": family["name"], "hex": family["hex"], "count": len(family["colors"])}
+        for family in colors_file.load()["families"]
+    ]
+
+
+def family_colors(key: str, query: str = "", page: int = 1, per_page: int = DEFAULT_PER_PAGE) -> Optional[Dict[str, Any]]:
+    """Return one page of the swatches in family *key*, or ``None`` if it does not exist.
+
+    *query* matches the swatch code (``"c12"`` finds ``NP C12.1`` ... ``NP C12.6``).
+    """
+    family = colors_file.load()["by_key"].get(key)
+    if family is None:
+        return None
+    colors = family["colors"]
+    needle = normalise_text(query)
+    if needle:
+        colors = [color for color, text in zip(colors, family["search"]) if needle in text]
+    result = paginate(colors, page, per_page)
+    result["family"] = {"key": family["key"], "name": family["name"], "hex": family["hex"]}
+    return result
+
+
+def _used(options: List[Dict[str, Any]], stores: List[Dict[str, Any]], field: str) -> List[Dict[str, Any]]:
+    used = {store.get(field) for store in stores}
+    return [option for option in options if option["id"] in used]
+
+
+def _selected(value: Optional[int], options: Iterable[Dict[str, Any]]) -> Optional[int]:
+    return value if value is not None and any(option["id"] == value for option in options) else None
+
+
+def find_stores(
+    country: Optional[int] = None,
+    city: Optional[int] = None,
+    store_type: Optional[int] = None,
+    query: str = "",
+    page: int = 1,
+    per_page: int = DEFAULT_PER_PAGE,
+) -> Dict[str, Any]:
+    """Filter the store list and return one page with the filter options.
+
+    Only countries, cities and types that have stores are offered, and
+    cities are limited to the selected country.  ``filters`` echoes the
+    values actually applied (unknown ids are ignored).
+    """
+    data = stores_file.load()
+    stores = data["stores"]
+    countries = _used(data["countries"], stores, "country")
+    country = _selected(country, countries)
+    cities = [option for option in _used(data["cities"], stores, "city")
+              if country is None or option.get("country") == country]
+    city = _selected(city, cities)
+    types = _used(data["types"], stores, "type")
+    store_type = _selected(store_type, types)
+    needle = normalise_text(query)
+
+    matches = []
+    for store, text in zip(stores, data["search"]):
+        if country is not None and store.get("country") != country:
+            continue
+        if city is not None and store.get("city") != city:
+            continue
+        if store_type is not None and store.get("type") != store_type:
+            continue
+        if needle and needle not in text:
+            continue
+        matches.append(store)
+
+    result = paginate(matches, page, per_page)
+    result["filters"] = {"country": country, "city": city, "type": store_type, "q": query}
+    result["options"] = {"countries": countries, "cities": cities, "types": types}
+    return result
@@ -0,0 +1,272 @@
+"""In-memory facet index for the catalog and datasheet listings.
+
+The catalogs and technical datasheets pages used to load every category,
+build the id/name lookup maps, run ``DISTINCT category`` and ``DISTINCT
+country`` queries and then count and page the filtered rows on each request.
+
+:func:`get_facet_index` keeps one :class:`FacetIndex` per table in the shared
+query cache instead.  It holds the id, resolved category, country, language
+and folded name of every row.  The index is tagged with the versions of the
+listing table and ``categories``, so any cpanel write rebuilds it (with a
+single query) on the next read.  Filtering, ordering, counting and the
+per-facet counts shown in the sidebars all run against the index.  The
+listing view then only fetches the rows of the current page by id.
+
+Rows point at their category through the indexed ``category_id`` foreign
+key.  The free-form ``category`` string is only used for legacy values that
+do not name an existing category.  :func:`assign_category` resolves the
+value an editor submits, and :func:`backfill_category_ids` resolves
+existing rows (run by ``flask migrate`` and after categories change).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+from noblepaints import db, query_cache
+from noblepaints.i18n import AVAILABLE_LANGUAGES
+from noblepaints.models import Catalog, Category, Product, TechnicalDatasheet
+from noblepaints.search import normalise_text
+
+FACET_MODELS = {
+    Catalog.__tablename__: Catalog,
+    TechnicalDatasheet.__tablename__: TechnicalDatasheet,
+}
+CATEGORISED_MODELS = (Product, Catalog, TechnicalDatasheet)
+ALL = ("", "All", "null")
+
+
+def category_lookup() -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Return ``(label_by_id, id_by_name)`` maps used to resolve category strings.
+
+    Catalog and datasheet rows reference categories by id or by English or
+    Arabic name; both maps come from the shared query cache.
+    """
+    return query_cache.get_or_set("category_lookup", _build_category_lookup, namespaces=("categories",))
+
+
+def _build_category_lookup():
+    categories_data = (
+        db.session.query(Category.id, Category.name, Category.nameArabic)
+        .order_by(Category.name.asc())
+        .all()
+    )
+    category_by_id = {}
+    category_by_name = {}
+    for category_id, category_name, category_name_ar in categories_data:
+        cleaned_name = (category_name or "").strip()
+        cleaned_name_ar = (category_name_ar or "").strip()
+        display_label = cleaned_name or cleaned_name_ar or f"Category {category_id}"
+        key = str(category_id)
+        category_by_id[key] = display_label
+        if cleaned_name:
+            category_by_name[cleaned_name] = key
+            category_by_name.setdefault(cleaned_name.lower(), key)
+        if cleaned_name_ar:
+            category_by_name[cleaned_name_ar] = key
+            category_by_name.setdefault(cleaned_name_ar.lower(), key)
+    return category_by_id, category_by_name
+
+
+def resolve_category(raw: Optional[str], category_by_id: Dict[str, str], category_by_name: Dict[str, str]) -> Tuple[str, str]:
+    """Map a stored or requested category string to ``(value, label)``."""
+    raw = (raw or "").strip()
+    if raw in category_by_id:
+        return raw, category_by_id[raw]
+    mapped_id = category_by_name.get(raw) or category_by_name.get(raw.lower())
+    if mapped_id:
+        return mapped_id, category_by_id.get(mapped_id, raw)
+    return raw, raw
+
+
+def category_id_for(value) -> Optional[int]:
+    """Return the id of the category *value* (an id or a name) refers to."""
+    if value is None:
+        return None
+    category_by_id, category_by_name = category_lookup()
+    resolved = resolve_category(str(value), category_by_id, category_by_name)[0]
+    return int(resolved) if resolved in category_by_id else None
+
+
+def assign_category(instance, value) -> None:
+    """Store the submitted category *value* and its resolved foreign key."""
+    instance.category = value
+    instance.category_id = category_id_for(value)
+
+
+def category_clause(model, value):
+    """Filter *model* rows by category *value* with one indexed comparison."""
+    category_id = category_id_for(value)
+    if category_id is not None:
+        return model.category_id == category_id
+    return model.category == value
+
+
+def backfill_category_ids() -> int:
+    """Resolve ``category_id`` for rows that only carry a category string.
+
+    Also imports links from the legacy ``product_categorie`` association
+    table, if it is still present.  Returns the number of rows updated.
+    """
+    category_by_id, category_by_name = _build_category_lookup()
+    updated = 0
+    for model in CATEGORISED_MODELS:
+        pending = (
+            db.session.query(model.id, model.category)
+            .filter(model.category_id.is_(None), model.category.isnot(None), model.category != "")
+            .all()
+        )
+        for row_id, raw in pending:
+            resolved = resolve_category(raw, category_by_id, category_by_name)[0]
+            if resolved in category_by_id:
+                db.session.query(model).filter(model.id == row_id).update(
+                    {"category_id": int(resolved)}, synchronize_session=False
+                )
+                updated += 1
+    legacy_links = 0
+    legacy_table = db.session.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'product_categorie'")
+    ).scalar()
+    if legacy_table:
+        legacy_links = db.session.execute(text(
+            "UPDATE products SET category_id = ("
+            " SELECT MIN(category_id) FROM product_categorie pc WHERE pc.product_id = products.product_id)"
+            " WHERE category_id IS NULL"
+            " AND product_id IN (SELECT product_id FROM product_categorie WHERE category_id IS NOT NULL)"
+        )).rowcount or 0
+    db.session.commit()
+    if legacy_links:
+        # Raw SQL is invisible to track_model_changes.
+        query_cache.bump(Product.__tablename__)
+    return updated + legacy_links
+
+
+def language_priority(lang: Optional[str], active_lang: str) -> int:
+    """Python twin of ``routes._language_sort_case``."""
+    lang = (lang or "").lower()
+    if lang == "":
+        return 0
+    if lang == active_lang:
+        return 1
+    priority = 2
+    for code in AVAILABLE_LANGUAGES:
+        if code == active_lang:
+            continue
+        if lang == code:
+            return priority
+        priority += 1
+    return priority
+
+
+class FacetIndex:
+    """Facet values of every row of one listing table.
+
+    ``rows`` holds ``(id, category_value, country, lang, folded_name)``
+    tuples ordered by id, newest first.  Instances only contain plain values
+    so the shared cache tier can pickle them.
+    """
+
+    def __init__(self, rows: Sequence[tuple], category_labels: Dict[str, str]):
+        self.rows = tuple(rows)
+        self.category_labels = category_labels
+
+    def matching(
+        self,
+        category: Optional[str] = None,
+        country: Optional[str] = None,
+        search: Optional[str] = None,
+        visible_only: bool = False,
+        skip: Iterable[str] = (),
+    ) -> List[tuple]:
+        """Return the rows matching the filters, ignoring the facets in *skip*."""
+        skip = set(skip)
+        needle = normalise_text(search) if search and "search" not in skip else ""
+        use_category = bool(category) and category not in ALL and "category" not in skip
+        use_country = bool(country) and country not in ALL and "country" not in skip
+        result = []
+        for row in self.rows:
+            row_id, row_category, row_country, row_lang, row_name = row
+            if visible_only and row_lang and row_lang not in AVAILABLE_LANGUAGES:
+                continue
+            if use_category and row_category != category:
+                continue
+            if use_country and row_country != country:
+                continue
+            if needle and needle not in row_name:
+                continue
+            result.append(row)
+        return result
+
+    def ordered_ids(self, active_lang: str, **filters) -> List[int]:
+        """Ids of the matching rows in listing order (language, then newest)."""
+        rows = self.matching(**filters)
+        rows.sort(key=lambda row: language_priority(row[3], active_lang))
+        return [row[0] for row in rows]
+
+    def counts(self, **filters) -> Dict[str, Dict[str, int]]:
+        """Per-facet item counts for the sidebars.
+
+        Each facet is counted with every *other* active filter applied, so a
+        count tells how many items selecting that value would show.
+        """
+        result: Dict[str, Dict[str, int]] = {"category": {}, "country": {}, "lang": {}}
+        for facet, position in (("category", 1), ("country", 2), ("lang", 3)):
+            bucket = result[facet]
+            for row in self.matching(skip=(facet,), **filters):
+                value = row[position]
+                if value:
+                    bucket[value] = bucket.get(value, 0) + 1
+        return result
+
+    def category_options(self, counts: Dict[str, int]) -> List[dict]:
+        """Sidebar category options: every category plus unmatched stored values."""
+        options = dict(self.category_labels)
+        for row in self.rows:
+            if row[1] and row[1] not in options:
+                options[row[1]] = row[1]
+        return [
+            {"value": value, "label": label, "count": counts.get(value, 0)}
+            for value, label in sorted(options.items(), key=lambda item: str(item[1]).lower())
+        ]
+
+    def country_options(self, counts: Dict[str, int]) -> List[dict]:
+        countries = sorted({row[2] for row in self.rows if row[2]})
+        return [{"value": country, "label": country, "count": counts.get(country, 0)} for country in countries]
+
+
+def _build_facet_index(table_name: str) -> FacetIndex:
+    model = FACET_MODELS[table_name]
+    category_by_id, category_by_name = category_lookup()
+    rows = []
+    query = (
+        db.session.query(model.id, model.category_id, model.category, model.country, model.lang, model.name)
+        .order_by(model.id.desc())
+    )
+    for row_id, category_id, category, country, lang, name in query:
+        rows.append((
+            row_id,
+            str(category_id) if category_id else resolve_category(category, category_by_id, category_by_name)[0],
+            (country or "").strip(),
+            (lang or "").strip().lower(),
+            normalise_text(name),
+        ))
+    return FacetIndex(rows, dict(category_by_id))
+
+
+def get_facet_index(table_name: str) -> FacetIndex:
+    """Return the facet index of ``catalogs`` or ``technicalDatasheets``."""
+    return query_cache.get_or_set(
+        ("facet_index", table_name),
+        lambda: _build_facet_index(table_name),
+        namespaces=(table_name, "categories"),
+    )
+
+
+def load_page(model, ids: Sequence[int]) -> list:
+    """Fetch *ids* of *model* with one query, keeping the order of *ids*."""
+    if not ids:
+        return []
+    by_id = {item.id: item for item in db.session.query(model).filter(model.id.in_(ids))}
+    return [by_id[row_id] for row_id in ids if row_id in by_id]
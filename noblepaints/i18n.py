@@ -4,11 +4,22 @@ The original project relied on front-end scripts that mutated DOM elements by
 array index, which quickly drifted out of sync and produced broken Arabic
 translations.  This module centralises shared translations and provides a small
 utility for resolving them consistently on both the server and client.
+
+Templates render their text with ``t()`` on the server.  The browser only
+needs the keys that ``layout.js`` applies to ``data-i18n-key`` elements, so
+the translations are compiled at import time into one JSON bundle per
+language and namespace (the part of the key before the first dot).  Each
+bundle is named by a digest of its contents and served from
+``/i18n/<lang>/<digest>.json`` with a year-long ``immutable`` lifetime;
+editing a string changes the URL.  A page ships the :data:`LAYOUT_NAMESPACES`
+plus the ones its template lists in ``i18n_namespaces``.
 """
 
 from __future__ import annotations
 
-from typing import Dict, Iterable
+import hashlib
+import json
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 AVAILABLE_LANGUAGES: Dict[str, str] = {
     "en": "English",
@@ -102,6 +113,7 @@ BASE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "admin.nav.certificates": "Certificates",
         "admin.nav.approvals": "Approvals",
         "admin.nav.social": "Social Icons",
+        "admin.nav.performance": "Performance",
         "admin.nav.language": "Language",
         "admin.nav.logout": "Sign out",
         "admin.nav.greeting": "Hello, {name}",
@@ -268,6 +280,29 @@ BASE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "contact.extra.training.text": "Hands-on programmes help applicators and inspectors master Noble systems and best practices.",
         "contact.extra.partners.title": "Partnerships",
         "contact.extra.partners.text": "We collaborate with consultants, contractors and retailers to deliver tailored solutions.",
+        "colors.meta_title": "Noble Paints | Colors",
+        "colors.title": "Colors",
+        "colors.disclaimer": "Paint colours may vary when viewing on your screen from the actual colours",
+        "colors.search_placeholder": "Search by code, e.g. C12",
+        "colors.count": "{count} colours",
+        "colors.empty": "No colours match your search.",
+        "colors.loading": "Loading colours…",
+        "colors.error": "The colours could not be loaded. Please try again later.",
+        "locations.meta_title": "Noble Paints | Find A Store",
+        "locations.title": "Find A Store",
+        "locations.tab_list": "List",
+        "locations.tab_map": "Map",
+        "locations.filter_country": "Select a country",
+        "locations.filter_city": "Select a city",
+        "locations.filter_type": "Select type",
+        "locations.filter_search": "Store name",
+        "locations.all": "All",
+        "locations.count": "{count} stores",
+        "locations.empty": "No stores match these filters.",
+        "locations.loading": "Loading stores…",
+        "locations.error": "The stores could not be loaded. Please try again later.",
+        "locations.directions": "Directions",
+        "locations.show_on_map": "Show on map",
     },
     "ar": {
         "meta.site_name": "دهانات نوبل",
@@ -354,6 +389,7 @@ BASE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "admin.nav.certificates": "الشهادات",
         "admin.nav.approvals": "الاعتمادات",
         "admin.nav.social": "روابط التواصل",
+        "admin.nav.performance": "الأداء",
         "admin.nav.language": "اللغة",
         "admin.nav.logout": "تسجيل الخروج",
         "admin.nav.greeting": "مرحباً، {name}",
@@ -520,6 +556,29 @@ BASE_TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "contact.extra.training.text": "برامج تطبيق عملية تساعد المقاولين والمفتشين على إتقان أنظمة نوبل وأفضل الممارسات.",
         "contact.extra.partners.title": "شراكات",
         "contact.extra.partners.text": "نتعاون مع الاستشاريين والمقاولين وتجار التجزئة لتقديم حلول مصممة حسب الحاجة.",
+        "colors.meta_title": "دهانات نوبل | الألوان",
+        "colors.title": "الألوان",
+        "colors.disclaimer": "قد تختلف ألوان الطلاء المعروضة على الشاشة عن الألوان الفعلية",
+        "colors.search_placeholder": "ابحث بالرمز، مثل C12",
+        "colors.count": "{count} لون",
+        "colors.empty": "لا توجد ألوان مطابقة لبحثك.",
+        "colors.loading": "جارٍ تحميل الألوان…",
+        "colors.error": "تعذر تحميل الألوان. يرجى المحاولة لاحقاً.",
+        "locations.meta_title": "دهانات نوبل | ابحث عن متجر",
+        "locations.title": "ابحث عن متجر",
+        "locations.tab_list": "القائمة",
+        "locations.tab_map": "الخريطة",
+        "locations.filter_country": "اختر الدولة",
+        "locations.filter_city": "اختر المدينة",
+        "locations.filter_type": "اختر النوع",
+        "locations.filter_search": "اسم المتجر",
+        "locations.all": "الكل",
+        "locations.count": "{count} متجر",
+        "locations.empty": "لا توجد متاجر مطابقة لهذه الخيارات.",
+        "locations.loading": "جارٍ تحميل المتاجر…",
+        "locations.error": "تعذر تحميل المتاجر. يرجى المحاولة لاحقاً.",
+        "locations.directions": "الاتجاهات",
+        "locations.show_on_map": "عرض على الخريطة",
     },
 }
 
@@ -546,3 +605,65 @@ def serialise_translations(keys: Iterable[str] | None = None) -> Dict[str, Dict[
     for lang, mapping in BASE_TRANSLATIONS.items():
         filtered[lang] = {k: v for k, v in mapping.items() if k in keys}
     return filtered
+
+
+# Namespaces every public page and the control panel layout apply client side.
+LAYOUT_NAMESPACES = ("meta", "nav", "footer")
+
+
+class TranslationBundle(NamedTuple):
+    lang: str
+    namespace: str
+    digest: str
+    body: bytes
+
+
+def namespace_of(key: str) -> str:
+    return key.split(".", 1)[0]
+
+
+def compile_bundles(translations: Dict[str, Dict[str, str]] | None = None) -> Dict[Tuple[str, str], TranslationBundle]:
+    """Build the ``(lang, namespace)`` bundles of *translations*.
+
+    Keys missing from a language fall back to English inside the bundle, so
+    the client never needs a second language.  The body has the same
+    ``{lang: {key: text}}`` shape as :func:`serialise_translations`.
+    """
+    translations = BASE_TRANSLATIONS if translations is None else translations
+    keys = set()
+    for mapping in translations.values():
+        keys.update(mapping)
+    bundles: Dict[Tuple[str, str], TranslationBundle] = {}
+    for lang in AVAILABLE_LANGUAGES:
+        grouped: Dict[str, Dict[str, str]] = {}
+        for key in keys:
+            text = translations.get(lang, {}).get(key, translations.get("en", {}).get(key))
+            if text is not None:
+                grouped.setdefault(namespace_of(key), {})[key] = text
+        for namespace, messages in grouped.items():
+            body = json.dumps({lang: messages}, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+            digest = hashlib.sha256(body).hexdigest()[:16]
+            bundles[(lang, namespace)] = TranslationBundle(lang, namespace, digest, body)
+    return bundles
+
+
+_BUNDLES = compile_bundles()
+_BUNDLES_BY_DIGEST = {(bundle.lang, bundle.digest): bundle for bundle in _BUNDLES.values()}
+
+
+def bundles_for(lang: str, namespaces: Iterable[str]) -> List[TranslationBundle]:
+    """Return the bundles of *namespaces* in *lang*; unknown namespaces are skipped."""
+    if lang not in AVAILABLE_LANGUAGES:
+        lang = "en"
+    seen = set()
+    bundles = []
+    for namespace in namespaces:
+        bundle = _BUNDLES.get((lang, namespace))
+        if bundle is not None and namespace not in seen:
+            seen.add(namespace)
+            bundles.append(bundle)
+    return bundles
+
+
+def find_bundle(lang: str, digest: str) -> Optional[TranslationBundle]:
+    return _BUNDLES_BY_DIGEST.get((lang, digest))
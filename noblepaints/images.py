@@ -0,0 +1,305 @@
+"""Responsive derivatives of the bundled ``static/images`` artwork.
+
+The theme images are exported at full resolution (several are 4 MB PNGs) and
+were sent unchanged to every device.  ``flask build-images`` resizes each
+PNG/JPEG to a handful of breakpoint widths, encodes AVIF and WebP copies whose
+filenames carry a hash of their content (so they can be cached forever) and
+records them, together with a tiny blurred placeholder, in
+``static/images/_derived/manifest.json``.
+
+At runtime :func:`responsive_image` turns a manifest entry into a
+``<picture>`` element with ``srcset``/``sizes`` and :func:`negotiate_variant`
+picks the best variant for clients that cannot use ``srcset`` (CSS
+backgrounds, old browsers) from their ``Accept`` header.  Images without a
+manifest entry fall back to the original file, so the site keeps working
+before the command has run.
+
+Pillow is only needed to build the derivatives and is imported lazily.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import json
+import os
+import tempfile
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from flask import url_for
+from markupsafe import Markup, escape
+
+from noblepaints import app
+
+DERIVED_DIRNAME = "_derived"
+MANIFEST_FILENAME = "manifest.json"
+DEFAULT_WIDTHS: Tuple[int, ...] = (320, 640, 960, 1280, 1920)
+# Preferred first: AVIF is smaller, WebP is supported more widely.
+DEFAULT_FORMATS: Tuple[str, ...] = ("avif", "webp")
+FORMAT_MIMETYPES: Dict[str, str] = {"avif": "image/avif", "webp": "image/webp"}
+ENCODER_OPTIONS: Dict[str, dict] = {
+    "avif": {"quality": 55},
+    "webp": {"quality": 78, "method": 6},
+}
+SOURCE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+PLACEHOLDER_WIDTH = 16
+
+_manifest_cache: Dict[str, object] = {"mtime": None, "entries": {}}
+
+
+class ImageBuildError(RuntimeError):
+    """Raised when derivatives cannot be built (e.g. Pillow is missing)."""
+
+
+def images_root() -> str:
+    return os.path.join(app.static_folder, "images")
+
+
+def derived_root() -> str:
+    return os.path.join(images_root(), DERIVED_DIRNAME)
+
+
+def manifest_path() -> str:
+    return os.path.join(derived_root(), MANIFEST_FILENAME)
+
+
+def image_key(src: str) -> str:
+    """Normalise ``/static/images/a.png``, ``images/a.png`` or ``a.png`` to ``a.png``."""
+    key = src.split("?", 1)[0].lstrip("/")
+    for prefix in ("static/", "images/"):
+        if key.startswith(prefix):
+            key = key[len(prefix):]
+    return key
+
+
+def load_manifest() -> Dict[str, dict]:
+    """Return the manifest, re-reading it whenever the file changes."""
+    try:
+        mtime = os.stat(manifest_path()).st_mtime_ns
+    except OSError:
+        _manifest_cache.update(mtime=None, entries={})
+        return {}
+    if _manifest_cache["mtime"] != mtime:
+        try:
+            with open(manifest_path(), encoding="utf-8") as handle:
+                entries = json.load(handle)
+        except (OSError, ValueError) as exc:
+            app.logger.warning("Could not read the image manifest: %s", exc)
+            entries = {}
+        _manifest_cache.update(mtime=mtime, entries=entries)
+    return _manifest_cache["entries"]  # type: ignore[return-value]
+
+
+def _static_url(relative_path: str) -> str:
+    return url_for("static", filename=f"images/{relative_path}")
+
+
+def _srcset(variants: Sequence[Sequence]) -> str:
+    return ", ".join(f"{_static_url(path)} {width}w" for width, path in variants)
+
+
+def _render_attributes(attrs: Dict[str, object]) -> str:
+    parts = []
+    for name, value in attrs.items():
+        if value is None or value is False:
+            continue
+        name = name.rstrip("_").replace("_", "-")
+        if value is True:
+            parts.append(f" {name}")
+        else:
+            parts.append(f' {name}="{escape(value)}"')
+    return "".join(parts)
+
+
+def responsive_image(src: str, alt: str = "", sizes: str = "100vw", loading: str = "lazy", **attrs) -> Markup:
+    """Render ``<picture>`` markup for a bundled image.
+
+    Extra keyword arguments become attributes of the ``<img>`` element
+    (``class_`` for ``class``, ``data_id`` for ``data-id``).
+    """
+    key = image_key(src)
+    entry = load_manifest().get(key)
+    img_attrs: Dict[str, object] = {"src": _static_url(key), "alt": alt, "loading": loading, "decoding": "async"}
+    if not entry:
+        img_attrs.update(attrs)
+        return Markup(f"<img{_render_attributes(img_attrs)}>")
+
+    img_attrs.update(width=entry["width"], height=entry["height"])
+    style = f"background:url({entry['placeholder']}) center/cover no-repeat"
+    if attrs.get("style"):
+        style = f"{attrs.pop('style')};{style}"
+    img_attrs["style"] = style
+    img_attrs.update(attrs)
+
+    sources = [
+        f'<source type="{FORMAT_MIMETYPES[fmt]}" srcset="{escape(_srcset(variants))}" sizes="{escape(sizes)}">'
+        for fmt, variants in entry["variants"].items()
+        if variants and fmt in FORMAT_MIMETYPES
+    ]
+    return Markup(f"<picture style=\"display:contents\">{''.join(sources)}<img{_render_attributes(img_attrs)}></picture>")
+
+
+def _explicitly_accepts(accept, mimetype: str) -> bool:
+    # ``*/*`` and ``image/*`` do not count: legacy browsers send them too.
+    return any(value == mimetype and quality > 0 for value, quality in accept)
+
+
+def negotiate_variant(src: str, accept, width: int = 0) -> Optional[Tuple[str, str]]:
+    """Pick the derivative that best fits *accept* and *width*.
+
+    Returns ``(absolute_path, mimetype)`` or ``None`` when the client should
+    receive the original file.
+    """
+    entry = load_manifest().get(image_key(src))
+    if not entry:
+        return None
+    for fmt in DEFAULT_FORMATS:
+        variants = entry["variants"].get(fmt)
+        if not variants or not _explicitly_accepts(accept, FORMAT_MIMETYPES[fmt]):
+            continue
+        chosen = variants[-1]
+        if width > 0:
+            chosen = next((variant for variant in variants if variant[0] >= width), chosen)
+        return os.path.join(images_root(), chosen[1]), FORMAT_MIMETYPES[fmt]
+    return None
+
+
+def _iter_sources(root: str) -> Iterable[str]:
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames if name != DERIVED_DIRNAME)
+        for filename in sorted(filenames):
+            if filename.lower().endswith(SOURCE_EXTENSIONS):
+                yield os.path.join(directory, filename)
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _encode(image, fmt: str) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), **ENCODER_OPTIONS.get(fmt, {}))
+    return buffer.getvalue()
+
+
+def _target_widths(original_width: int, widths: Sequence[int]) -> List[int]:
+    targets = {width for width in widths if width < original_width}
+    targets.add(min(original_width, max(widths)))
+    return sorted(targets)
+
+
+def _build_entry(path: str, key: str, digest: str, widths: Sequence[int], formats: Sequence[str]) -> Tuple[dict, int]:
+    from PIL import Image, ImageFilter
+
+    with Image.open(path) as source:
+        source.load()
+        image = source.convert("RGBA" if source.mode in ("RGBA", "LA", "P") else "RGB")
+    entry = {
+        "digest": digest,
+        "width": image.width,
+        "height": image.height,
+        "variants": {},
+    }
+    stem = os.path.splitext(key)[0]
+    written = 0
+    for fmt in formats:
+        variants = []
+        for width in _target_widths(image.width, widths):
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            data = _encode(resized, fmt)
+            relative = f"{DERIVED_DIRNAME}/{stem}-{width}w.{hashlib.sha1(data).hexdigest()[:10]}.{fmt}"
+            target = os.path.join(images_root(), relative)
+            if not os.path.exists(target):
+                _write_atomic(target, data)
+            written += len(data)
+            variants.append([width, relative])
+        entry["variants"][fmt] = variants
+
+    height = max(1, round(image.height * PLACEHOLDER_WIDTH / image.width))
+    placeholder = image.resize((PLACEHOLDER_WIDTH, height), Image.BILINEAR).filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    placeholder.save(buffer, format="WEBP", quality=30)
+    entry["placeholder"] = "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+    return entry, written
+
+
+def build_image_derivatives(
+    widths: Sequence[int] = DEFAULT_WIDTHS,
+    formats: Sequence[str] = DEFAULT_FORMATS,
+    force: bool = False,
+) -> Dict[str, int]:
+    """Build derivatives for every bundled image and rewrite the manifest.
+
+    Sources whose digest matches the manifest are skipped unless *force* is
+    set.  Derivatives no longer referenced by the manifest are deleted.
+    """
+    try:
+        from PIL import features
+    except ImportError as exc:
+        raise ImageBuildError("Pillow is required to build image derivatives (pip install Pillow).") from exc
+
+    unsupported = [fmt for fmt in formats if fmt not in FORMAT_MIMETYPES]
+    if unsupported:
+        raise ImageBuildError(f"Unsupported formats: {', '.join(unsupported)}")
+    available = [fmt for fmt in formats if features.check(fmt)]
+    for fmt in formats:
+        if fmt not in available:
+            app.logger.warning("Pillow was built without %s support; skipping those variants.", fmt.upper())
+    if not available:
+        raise ImageBuildError("Pillow supports none of the requested formats.")
+
+    widths = sorted(set(widths))
+    previous = {} if force else load_manifest()
+    manifest: Dict[str, dict] = {}
+    stats = {"built": 0, "skipped": 0, "failed": 0, "source_bytes": 0, "derived_bytes": 0}
+    root = images_root()
+    for path in _iter_sources(root):
+        key = os.path.relpath(path, root).replace(os.sep, "/")
+        digest = _file_digest(path)
+        cached = previous.get(key)
+        if (
+            cached
+            and cached.get("digest") == digest
+            and set(cached["variants"]) == set(available)
+            and all(os.path.exists(os.path.join(root, variant[1])) for variants in cached["variants"].values() for variant in variants)
+        ):
+            manifest[key] = cached
+            stats["skipped"] += 1
+            continue
+        try:
+            manifest[key], written = _build_entry(path, key, digest, widths, available)
+        except Exception as exc:  # corrupt or unsupported source files
+            app.logger.warning("Could not build derivatives for %s: %s", key, exc)
+            stats["failed"] += 1
+            continue
+        stats["built"] += 1
+        stats["source_bytes"] += os.path.getsize(path)
+        stats["derived_bytes"] += written
+
+    _write_atomic(manifest_path(), json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8"))
+    referenced = {variant[1] for entry in manifest.values() for variants in entry["variants"].values() for variant in variants}
+    for directory, _, filenames in os.walk(derived_root()):
+        for filename in filenames:
+            relative = os.path.relpath(os.path.join(directory, filename), root).replace(os.sep, "/")
+            if filename != MANIFEST_FILENAME and relative not in referenced:
+                os.unlink(os.path.join(directory, filename))
+    return stats
@@ -0,0 +1,242 @@
+"""Structured logging through a background queue.
+
+The request handlers used to ``print()``, one line per category on every
+cache refresh and one per request from ``categories_page`` and
+``api_categories``.  Under Passenger every one of those lines is a
+synchronous write to a pipe that the request waits on.
+
+:func:`configure_logging` gives the ``noblepaints`` logger (``app.logger``
+and every ``get_logger(__name__)`` child) a single :class:`DroppingQueueHandler`.
+Callers only append records to a bounded in-memory queue.  A
+:class:`~logging.handlers.QueueListener` thread formats and writes them to
+stderr or ``LOG_FILE``.  When the queue is full, records are dropped and
+counted instead of blocking the request.
+
+:func:`get_logger` returns a :class:`StructuredLogger`: messages are event
+names and keyword arguments become fields::
+
+    log = get_logger(__name__)
+    log.info("categories.page", count=12, sample=100)
+
+``sample=N`` keeps one in every *N* calls per event (the record carries
+``sampled=N``), for events that fire on every request.  Records are written
+as ``logfmt`` (``LOG_FORMAT=json`` for one JSON object per line).
+``LOG_LEVEL`` sets the base level and ``LOG_LEVELS`` overrides it per module,
+e.g. ``noblepaints.routes=WARNING,noblepaints.cache=DEBUG``.
+"""
+
+from __future__ import annotations
+
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+ROOT_LOGGER = "noblepaints"
+# Keyword arguments that belong to Logger._log rather than to the record.
+_LOG_KWARGS = frozenset(("exc_info", "stack_info", "stacklevel", "extra"))
+_RESERVED = frozenset(logging.LogRecord("", 0, "", 0, "", None, None).__dict__) | {"message", "asctime"}
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """Parse ``"module=LEVEL,module=LEVEL"`` into logger names and levels."""
+    levels = {}
+    for item in (spec or "").split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return {name: level for name, level in levels.items() if isinstance(level, int)}
+
+
+class _Sampler:
+    """Keeps every *n*-th call per event; counters are shared by all threads."""
+
+    def __init__(self):
+        self._counters: Dict[tuple, itertools.count] = {}
+        self._lock = threading.Lock()
+
+    def keep(self, logger: str, event: str, every: int) -> bool:
+        key = (logger, event)
+        counter = self._counters.get(key)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(key, itertools.count())
+        # next() on itertools.count is atomic under the GIL.
+        return next(counter) % every == 0
+
+
+_sampler = _Sampler()
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """Logger adapter that turns keyword arguments into record fields."""
+
+    def __init__(self, logger: logging.Logger):
+        super().__init__(logger, {})
+
+    def log(self, level, msg, *args, sample: Optional[int] = None, **kwargs):
+        if not self.isEnabledFor(level):
+            return
+        if sample and sample > 1:
+            if not _sampler.keep(self.logger.name, msg, sample):
+                return
+            kwargs["sampled"] = sample
+        fields = {key: kwargs.pop(key) for key in list(kwargs) if key not in _LOG_KWARGS}
+        kwargs.setdefault("extra", {})["fields"] = _request_fields(fields)
+        self.logger.log(level, msg, *args, **kwargs)
+
+    def exception(self, msg, *args, exc_info=True, **kwargs):
+        self.log(logging.ERROR, msg, *args, exc_info=exc_info, **kwargs)
+
+
+def _request_fields(fields: Dict[str, Any]) -> Dict[str, Any]:
+    # Imported lazily: configure_logging runs before Flask has a request.
+    from flask import has_request_context, request
+
+    if has_request_context():
+        fields.setdefault("method", request.method)
+        fields.setdefault("path", request.path)
+    return fields
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(logging.getLogger(name))
+
+
+def _format_value(value: Any) -> str:
+    text = str(value)
+    if not text or any(char in text for char in ' ="\n'):
+        return json.dumps(text, ensure_ascii=False)
+    return text
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats records as ``logfmt`` or JSON lines with their fields."""
+
+    def __init__(self, style: str = "logfmt"):
+        super().__init__()
+        self.json = style == "json"
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "pid": record.process,
+            "event": record.getMessage(),
+        }
+        data.update(getattr(record, "fields", None) or {})
+        # ``extra=`` passed to app.logger directly.
+        data.update({key: value for key, value in record.__dict__.items()
+                     if key not in _RESERVED and key != "fields"})
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc"] = record.exc_text
+        if self.json:
+            return json.dumps(data, ensure_ascii=False, default=str)
+        exc = data.pop("exc", None)
+        line = " ".join(f"{key}={_format_value(value)}" for key, value in data.items())
+        return f"{line}\n{exc}" if exc else line
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks: records beyond the queue size are dropped."""
+
+    def __init__(self, maxsize: int):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener formats the record in its own thread.  Resolve the
+        # message arguments and any traceback now, while they are still valid.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return
+        if self.dropped:
+            with self._lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                self._report_dropped(dropped)
+
+    def _report_dropped(self, dropped: int) -> None:
+        record = logging.LogRecord(ROOT_LOGGER, logging.WARNING, __file__, 0, "log.dropped", None, None)
+        record.fields = {"count": dropped}
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += dropped
+
+
+class _AsyncLogging:
+    """The queue handler and the listener thread writing its records."""
+
+    def __init__(self, target: logging.Handler, maxsize: int):
+        self.target = target
+        self.maxsize = maxsize
+        self.handler = DroppingQueueHandler(maxsize)
+        self.listener: Optional[logging.handlers.QueueListener] = None
+
+    def start(self) -> None:
+        self.listener = logging.handlers.QueueListener(self.handler.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self) -> None:
+        # Drains the queue before returning.
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def restart_in_child(self) -> None:
+        # A forked worker inherits the queue but not the listener thread.
+        self.handler.queue = queue.Queue(self.maxsize)
+        self.handler.dropped = 0
+        self.listener = None
+        self.start()
+
+
+_async: Optional[_AsyncLogging] = None
+
+
+def configure_logging(config) -> logging.Logger:
+    """Route the ``noblepaints`` loggers through the queue; safe to call twice."""
+    global _async
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(logging.getLevelName(str(config.get("LOG_LEVEL", "INFO")).upper()))
+    for name, level in parse_levels(config.get("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(level)
+    if _async is not None:
+        return root
+
+    path = config.get("LOG_FILE")
+    target = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler(sys.stderr)
+    target.setFormatter(StructuredFormatter(config.get("LOG_FORMAT", "logfmt")))
+    _async = _AsyncLogging(target, int(config.get("LOG_QUEUE_SIZE", 10000)))
+    _async.start()
+    # Flask adds its own stream handler to app.logger unless one is already set.
+    root.addHandler(_async.handler)
+    root.propagate = False
+    atexit.register(_async.stop)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_async.restart_in_child)
+    return root
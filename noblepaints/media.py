@@ -0,0 +1,257 @@
+"""Content-addressed storage for images uploaded through the control panel.
+
+The dashboard forms read images with ``FileReader.readAsDataURL`` and post the
+resulting base64 string.  Persisting that string in the model columns meant
+every listing query, schema dump and rendered page carried megabytes of image
+data.  This module decodes such payloads, writes them to disk under their
+SHA-256 digest and hands back a short URL that the ``img`` columns store
+instead.  Identical uploads therefore share one file and the files can be
+cached forever by browsers and proxies.
+
+SVG files can carry script.  Inside ``<img>`` it never runs, but a stored file
+opened directly would run same-origin with the control panel session, so
+``/media`` sends them with :data:`SVG_CONTENT_SECURITY_POLICY`.
+
+:func:`thumbnail_url` points listings at small WebP copies of stored images
+(``thumbs/<width>/<path>.webp``).  They are written the first time they are
+requested (see :func:`build_thumbnail`); Pillow is only needed for that and
+is imported lazily.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import importlib.util
+import os
+import re
+import tempfile
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import unquote_to_bytes
+
+from noblepaints import app, db
+
+DATA_URL_PATTERN = re.compile(
+    r"^data:(?P<mime>[\w.+-]+/[\w.+-]+)?(?P<params>(?:;[\w.+-]+=[^;,]*)*)(?P<base64>;base64)?,",
+    re.IGNORECASE,
+)
+
+MIME_EXTENSIONS: Dict[str, str] = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/pjpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/avif": ".avif",
+    "image/svg+xml": ".svg",
+    "image/bmp": ".bmp",
+    "image/x-icon": ".ico",
+    "image/vnd.microsoft.icon": ".ico",
+}
+# Sent with stored SVG files: no scripts, no subresources, a unique origin.
+SVG_CONTENT_SECURITY_POLICY = "default-src 'none'; style-src 'unsafe-inline'; sandbox"
+
+THUMBNAIL_DIRNAME = "thumbs"
+THUMBNAIL_WIDTHS = (160,)
+# Formats Pillow can shrink; SVG and icons are listed as they are.
+THUMBNAIL_SOURCE_EXTENSIONS = (".png", ".jpg", ".gif", ".webp", ".bmp")
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+
+
+class MediaError(ValueError):
+    """Raised when an uploaded image payload cannot be decoded or stored."""
+
+
+def is_data_url(value) -> bool:
+    """Return ``True`` when *value* looks like an inline ``data:`` URL."""
+    return isinstance(value, str) and value[:5].lower() == "data:"
+
+
+def decode_data_url(value: str) -> Tuple[str, bytes]:
+    """Split a ``data:`` URL into its MIME type and decoded bytes."""
+    match = DATA_URL_PATTERN.match(value)
+    if not match:
+        raise MediaError("Malformed data URL.")
+    mime = (match.group("mime") or "").lower()
+    if mime not in MIME_EXTENSIONS:
+        raise MediaError(f"Unsupported image type: {mime or 'unknown'}.")
+    payload = value[match.end():]
+    if match.group("base64"):
+        try:
+            data = base64.b64decode(payload, validate=False)
+        except (binascii.Error, ValueError) as exc:
+            raise MediaError("Image payload is not valid base64.") from exc
+    else:
+        data = unquote_to_bytes(payload)
+    if not data:
+        raise MediaError("Image payload is empty.")
+    return mime, data
+
+
+def media_path_for(digest: str, extension: str) -> str:
+    """Return the path of a stored file relative to ``MEDIA_ROOT``."""
+    return f"{digest[:2]}/{digest}{extension}"
+
+
+def media_url_for(relative_path: str) -> str:
+    prefix = app.config["MEDIA_URL_PREFIX"]
+    if not prefix.endswith("/"):
+        prefix += "/"
+    return prefix + relative_path
+
+
+def store_bytes(data: bytes, mime: str) -> str:
+    """Persist *data* under its content hash and return the public URL.
+
+    Writes go through a temporary file and ``os.replace`` so concurrent
+    workers storing the same image never expose a half-written file.
+    """
+    extension = MIME_EXTENSIONS.get(mime)
+    if extension is None:
+        raise MediaError(f"Unsupported image type: {mime}.")
+    digest = hashlib.sha256(data).hexdigest()
+    relative_path = media_path_for(digest, extension)
+    target = os.path.join(app.config["MEDIA_ROOT"], *relative_path.split("/"))
+    if not os.path.exists(target):
+        directory = os.path.dirname(target)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+    return media_url_for(relative_path)
+
+
+def thumbnail_url(url: Optional[str], width: int = THUMBNAIL_WIDTHS[0]) -> Optional[str]:
+    """Return the URL of a *width* pixel wide thumbnail of the stored image *url*.
+
+    Images outside the media store (static assets, external links) are
+    returned unchanged, inline ``data:`` URLs as ``None``.
+    """
+    if not url or is_data_url(url):
+        return None
+    prefix = media_url_for("")
+    if not url.startswith(prefix) or not url.lower().endswith(THUMBNAIL_SOURCE_EXTENSIONS):
+        return url
+    if not HAS_PILLOW:
+        return url
+    return media_url_for(f"{THUMBNAIL_DIRNAME}/{width}/{url[len(prefix):]}.webp")
+
+
+def build_thumbnail(relative_path: str) -> bool:
+    """Write the thumbnail at *relative_path* (below ``MEDIA_ROOT``) from its source image.
+
+    Returns ``False`` when the path does not name a thumbnail of a stored
+    image, so the caller can answer ``404``.
+    """
+    parts = relative_path.split("/")
+    if len(parts) < 4 or parts[0] != THUMBNAIL_DIRNAME or not parts[-1].endswith(".webp"):
+        return False
+    try:
+        width = int(parts[1])
+    except ValueError:
+        return False
+    source_path = "/".join(parts[2:])[: -len(".webp")]
+    if width not in THUMBNAIL_WIDTHS or not source_path.lower().endswith(THUMBNAIL_SOURCE_EXTENSIONS):
+        return False
+    root = app.config["MEDIA_ROOT"]
+    source = os.path.join(root, *source_path.split("/"))
+    if ".." in parts or not os.path.isfile(source):
+        return False
+    try:
+        from PIL import Image
+    except ImportError:
+        app.logger.warning("Pillow is not installed; cannot build %s.", relative_path)
+        return False
+
+    target = os.path.join(root, *parts)
+    directory = os.path.dirname(target)
+    os.makedirs(directory, exist_ok=True)
+    with Image.open(source) as image:
+        image.thumbnail((width, width * 4))
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".thumb-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                image.save(handle, format="WEBP", quality=80)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+    return True
+
+
+def store_image(value: Optional[str]) -> Optional[str]:
+    """Normalise an ``img`` payload coming from the control panel.
+
+    Inline ``data:`` URLs are written to the media store and replaced with
+    their URL.  Anything else (an existing URL, ``None``) is returned as-is so
+    editors can keep pointing at static assets.
+    """
+    if not isinstance(value, str):
+        return value
+    value = value.strip()
+    if not value:
+        return None
+    if not is_data_url(value):
+        return value
+    mime, data = decode_data_url(value)
+    return store_bytes(data, mime)
+
+
+def migrate_inline_images(models: Iterable, batch_size: int = 50, dry_run: bool = False) -> Dict[str, Dict[str, int]]:
+    """Rewrite ``img`` columns that still hold ``data:`` URLs.
+
+    Rows are processed in primary-key order and committed per batch, loading
+    only the ``id``/``img`` pair so memory stays bounded even when the legacy
+    payloads are several megabytes each.
+    """
+    stats: Dict[str, Dict[str, int]] = {}
+    for model in models:
+        table_stats = {"migrated": 0, "failed": 0, "bytes_saved": 0}
+        stats[model.__tablename__] = table_stats
+        last_id = 0
+        while True:
+            rows = (
+                db.session.query(model.id, model.img)
+                .filter(model.id > last_id, model.img.like("data:%"))
+                .order_by(model.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            for row_id, img in rows:
+                last_id = row_id
+                try:
+                    mime, data = decode_data_url(img)
+                    if dry_run:
+                        digest = hashlib.sha256(data).hexdigest()
+                        url = media_url_for(media_path_for(digest, MIME_EXTENSIONS[mime]))
+                    else:
+                        url = store_bytes(data, mime)
+                except MediaError as exc:
+                    app.logger.warning("Skipping %s #%s: %s", model.__tablename__, row_id, exc)
+                    table_stats["failed"] += 1
+                    continue
+                table_stats["migrated"] += 1
+                table_stats["bytes_saved"] += len(img) - len(url)
+                if not dry_run:
+                    db.session.query(model).filter(model.id == row_id).update(
+                        {model.img: url}, synchronize_session=False
+                    )
+            if not dry_run:
+                db.session.commit()
+            db.session.expunge_all()
+    return stats
@@ -1,3 +1,4 @@
+import hashlib
 from datetime import datetime
 
 from flask_login import UserMixin
@@ -6,61 +7,71 @@ from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
 from noblepaints import db,app,ma
 from noblepaints import bcrypt
-
-product_categorie = db.Table('product_categorie', db.Model.metadata,
-    db.Column('category_id', db.Integer, db.ForeignKey('categories.category_id')),
-    db.Column('product_id', db.Integer, db.ForeignKey('products.product_id'))
-)
-
-class Category(db.Model):
-    __tablename__ = "categories"
-    id = db.Column('category_id',db.Integer, primary_key=True)
-    name = db.Column(db.String())
-    nameArabic = db.Column(db.String())
-    desc = db.Column(db.String())
-    img = db.Column(db.String())
-    products = db.relationship("Product",secondary=product_categorie,lazy='dynamic',cascade='all, delete')
-
-class Product(db.Model):
-    __tablename__ = "products"
-    id = db.Column('product_id',db.Integer, primary_key=True)
-    img = db.Column(db.String())
-    name = db.Column(db.String())
-    desc = db.Column(db.String())
-    country = db.Column(db.String())
-    category = db.Column(db.String())
-    lang = db.Column(db.String())
-    datasheet = db.Column(db.String())
-
-class Catalog(db.Model):
-    __tablename__ = "catalogs"
-    id = db.Column('catalog_id',db.Integer, primary_key=True)
-    img = db.Column(db.String())
-    name = db.Column(db.String())
-    link = db.Column(db.String())
-    category = db.Column(db.String())
-    country = db.Column(db.String())
-    lang = db.Column(db.String())
-
-class TechnicalDatasheet(db.Model):
-    __tablename__ = "technicalDatasheets"
-    id = db.Column('technicalDatasheet_id',db.Integer, primary_key=True)
-    name = db.Column(db.String())
-    link = db.Column(db.String())
-    category = db.Column(db.String())
-    country = db.Column(db.String())
-    lang = db.Column(db.String())
-
-class Post(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    title = db.Column(db.String())
-    description = db.Column(db.String())
-    date = db.Column(db.String())
-    lang = db.Column(db.String())
-    img = db.Column(db.String())
-    category = db.Column(db.String())
-    views = db.Column(db.String())
-
+
+class Category(db.Model):
+    __tablename__ = "categories"
+    id = db.Column('category_id',db.Integer, primary_key=True)
+    name = db.Column(db.String())
+    nameArabic = db.Column(db.String())
+    desc = db.Column(db.String())
+    img = db.Column(db.String())
+    products = db.relationship("Product",back_populates="category_ref",lazy='dynamic')
+    catalogs = db.relationship("Catalog",back_populates="category_ref",lazy='dynamic')
+    datasheets = db.relationship("TechnicalDatasheet",back_populates="category_ref",lazy='dynamic')
+
+class Product(db.Model):
+    __tablename__ = "products"
+    id = db.Column('product_id',db.Integer, primary_key=True)
+    img = db.Column(db.String())
+    name = db.Column(db.String())
+    desc = db.Column(db.String())
+    country = db.Column(db.String())
+    # ``category`` keeps the value the editor typed (an id or a name);
+    # ``category_id`` is its resolved foreign key (see noblepaints.facets).
+    category = db.Column(db.String())
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.category_id'), index=True)
+    category_ref = db.relationship("Category", back_populates="products")
+    lang = db.Column(db.String())
+    datasheet = db.Column(db.String())
+
+class Catalog(db.Model):
+    __tablename__ = "catalogs"
+    id = db.Column('catalog_id',db.Integer, primary_key=True)
+    img = db.Column(db.String())
+    name = db.Column(db.String())
+    link = db.Column(db.String())
+    category = db.Column(db.String())
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.category_id'), index=True)
+    category_ref = db.relationship("Category", back_populates="catalogs")
+    country = db.Column(db.String())
+    lang = db.Column(db.String())
+
+class TechnicalDatasheet(db.Model):
+    __tablename__ = "technicalDatasheets"
+    id = db.Column('technicalDatasheet_id',db.Integer, primary_key=True)
+    name = db.Column(db.String())
+    link = db.Column(db.String())
+    category = db.Column(db.String())
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.category_id'), index=True)
+    category_ref = db.relationship("Category", back_populates="datasheets")
+    country = db.Column(db.String())
+    lang = db.Column(db.String())
+
+class Post(db.Model):
+    __table_args__ = (
+        # "Most viewed in <lang>" is a backwards scan of this index.
+        db.Index('ix_post_lang_view_count', 'lang', 'view_count'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String())
+    description = db.Column(db.String())
+    date = db.Column(db.String())
+    lang = db.Column(db.String())
+    img = db.Column(db.String())
+    category = db.Column(db.String())
+    # Incremented in batches by noblepaints.counters, never per request.
+    views = db.Column('view_count', db.Integer, nullable=False, default=0, server_default='0')
+
 class Certificate(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String())
@@ -76,19 +87,81 @@ class Approval(db.Model):
     link = db.Column(db.String())
     img = db.Column(db.String())
     lang = db.Column(db.String())
-
+
 class ProductSchema(SQLAlchemyAutoSchema):
     class Meta:
         model = Product
         load_instance = False
         include_fk = True
-        fields = ('id', 'img', 'name', 'desc', 'category', 'country', 'lang', 'datasheet')
-
+        fields = ('id', 'img', 'name', 'desc', 'category', 'category_id', 'country', 'lang', 'datasheet')
+
 class Upload(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.Unicode(255))
-    data = db.Column(db.LargeBinary)
-
+    # Deferred so metadata lookups never pull the (often multi-MB) payload;
+    # downloads stream it through noblepaints.streaming instead.
+    data = db.deferred(db.Column(db.LargeBinary))
+    size = db.Column(db.Integer)
+    checksum = db.Column(db.String(64))
+    updated_at = db.Column(db.DateTime)
+
+    def set_data(self, filename, data):
+        self.filename = filename
+        self.data = data
+        self.size = len(data)
+        self.checksum = hashlib.sha256(data).hexdigest()
+        self.updated_at = datetime.utcnow().replace(microsecond=0)
+
+class OutboxMessage(db.Model):
+    """Mail waiting to be delivered by the outbox sender (noblepaints.outbox)."""
+    __tablename__ = "outbox"
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255))
+    sender = db.Column(db.String(255))
+    recipients = db.Column(db.Text)  # comma separated
+    body = db.Column(db.Text)
+    status = db.Column(db.String(16), default='pending', index=True)
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    claimed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+class TranslationMemory(db.Model):
+    """Translations already obtained, keyed by (source text, source lang, target lang)."""
+    __tablename__ = "translation_memory"
+    __table_args__ = (
+        db.UniqueConstraint('source_hash', 'source_lang', 'target_lang', name='uq_translation_memory_key'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    source_hash = db.Column(db.String(40), nullable=False)
+    source_lang = db.Column(db.String(8), nullable=False)
+    target_lang = db.Column(db.String(8), nullable=False)
+    source_text = db.Column(db.Text, nullable=False)
+    translated_text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class TranslationJob(db.Model):
+    """A field waiting for an automatic translation (noblepaints.translation)."""
+    __tablename__ = "translation_jobs"
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(64), nullable=False)
+    row_id = db.Column(db.Integer, nullable=False)
+    field = db.Column(db.String(64), nullable=False)
+    source_text = db.Column(db.Text, nullable=False)
+    source_lang = db.Column(db.String(8), nullable=False)
+    target_lang = db.Column(db.String(8), nullable=False)
+    # Value of the field when the job was queued; the translation is only
+    # written if the field still holds it (so manual edits always win).
+    placeholder = db.Column(db.Text)
+    status = db.Column(db.String(16), default='pending', index=True)
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    claimed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class Social(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String())
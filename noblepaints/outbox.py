@@ -0,0 +1,103 @@
+"""Durable outbox for outgoing mail.
+
+The contact form used to talk to the SMTP server inside the request: a slow
+or unreachable server held a worker for the whole SMTP timeout and the message
+was lost when sending failed.  Messages are now written to the ``outbox``
+table and the request returns immediately.  :data:`outbox_sender` delivers
+them in the background.  It sends each batch over one SMTP connection and
+reschedules failures with exponential backoff until
+``OUTBOX_MAX_ATTEMPTS`` is reached.
+
+Rows are claimed with a conditional ``UPDATE`` so several Passenger workers
+(or ``flask outbox-send --loop`` in its own process) can share the table.
+Claims older than :data:`CLAIM_TIMEOUT` are considered abandoned and retried.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from flask_mail import Message
+
+from noblepaints import app, db, mail
+from noblepaints.models import OutboxMessage
+from noblepaints.workers import BackgroundWorker, claim_due, retry_delay
+
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def enqueue_mail(subject: str, recipients: Iterable[str], body: str, sender: str) -> OutboxMessage:
+    """Store a message in the outbox and wake the sender."""
+    message = OutboxMessage(
+        subject=subject,
+        sender=sender,
+        recipients=", ".join(recipients),
+        body=body,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+    )
+    db.session.add(message)
+    db.session.commit()
+    if app.config.get("OUTBOX_SENDER") == "thread":
+        outbox_sender.wake()
+    return message
+
+
+def _mark_failed(message: OutboxMessage, error: Exception) -> None:
+    message.attempts = (message.attempts or 0) + 1
+    message.last_error = str(error)[:1000]
+    message.claimed_at = None
+    if message.attempts >= app.config["OUTBOX_MAX_ATTEMPTS"]:
+        message.status = "failed"
+        app.logger.error("Giving up on outbox message %s after %s attempts: %s", message.id, message.attempts, error)
+    else:
+        message.status = "pending"
+        message.next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_delay(message.attempts))
+        app.logger.warning("Outbox message %s failed (attempt %s): %s", message.id, message.attempts, error)
+
+
+def deliver_pending(batch_size: Optional[int] = None) -> int:
+    """Send one batch of due messages and return how many were claimed."""
+    batch_size = batch_size or app.config["OUTBOX_BATCH_SIZE"]
+    claimed = claim_due(OutboxMessage, batch_size, CLAIM_TIMEOUT)
+    if not claimed:
+        return 0
+    messages = (
+        db.session.query(OutboxMessage)
+        .filter(OutboxMessage.id.in_(claimed))
+        .order_by(OutboxMessage.id)
+        .all()
+    )
+    try:
+        with mail.connect() as connection:
+            for message in messages:
+                try:
+                    connection.send(Message(
+                        message.subject,
+                        sender=message.sender,
+                        recipients=[address.strip() for address in message.recipients.split(",") if address.strip()],
+                        body=message.body,
+                    ))
+                except Exception as exc:
+                    _mark_failed(message, exc)
+                else:
+                    message.status = "sent"
+                    message.sent_at = datetime.utcnow()
+                    message.claimed_at = None
+                    message.last_error = None
+                # Commit per message so a crash never re-sends delivered mail.
+                db.session.commit()
+    except Exception as exc:
+        # Connecting (or closing the connection) failed: retry whatever is
+        # still claimed by this batch.
+        db.session.rollback()
+        for message in messages:
+            if message.status == "sending":
+                _mark_failed(message, exc)
+        db.session.commit()
+    return len(claimed)
+
+
+outbox_sender = BackgroundWorker("outbox-sender", deliver_pending, interval=30.0)
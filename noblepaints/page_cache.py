@@ -0,0 +1,118 @@
+"""Full-page response cache for anonymous visitors.
+
+Public pages are identical for every anonymous visitor in a given language,
+yet each request re-ran the same queries and re-rendered the same template.
+:func:`cached_page` stores the rendered response in the shared
+:class:`~noblepaints.cache.QueryCache`, keyed by endpoint, normalised query
+arguments and language.  Each entry is tied to the versions of the tables the
+page reads, so the model change hooks fired by cpanel add/edit/delete commits
+invalidate it in every worker.
+
+Logged-in users always get a freshly rendered page.  Every response carries
+an ``X-Cache`` header (``HIT``, ``MISS`` or ``BYPASS``).
+
+:class:`PublicPageSessionInterface` keeps ``Vary: Cookie`` off responses that
+were marked ``Cache-Control: public``: their content is determined by the URL
+alone, even though Flask-Login peeks at the session on every request.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from functools import wraps
+from typing import Iterable
+
+from flask import Response, g, make_response, request
+from flask.sessions import SecureCookieSessionInterface
+from flask_login import current_user
+
+from noblepaints import query_cache
+from noblepaints.conditional import release_token
+
+# Query arguments that never change the rendered page.
+IGNORED_ARGS = frozenset({"lang", "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "fbclid", "gclid"})
+# Response headers that must not be replayed to other visitors.
+UNCACHED_HEADERS = frozenset({"set-cookie", "content-length", "x-cache"})
+
+
+def page_cache_key(endpoint: str, lang: str, view_args=None) -> str:
+    args = sorted(
+        (key, value)
+        for key, values in request.args.lists()
+        if key not in IGNORED_ARGS
+        for value in values
+        if value != ""
+    )
+    # The release is part of the key: pages link to translation bundles and
+    # assets by content hash, and a new release may no longer serve the old ones.
+    raw = repr((release_token(), endpoint, lang, sorted((view_args or {}).items()), args))
+    return "page:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def cached_page(namespaces: Iterable[str], ttl: float = 300):
+    """Cache a public view's ``200`` responses for anonymous visitors.
+
+    Responses marked ``Cache-Control: no-store`` are never stored.
+
+    *namespaces* lists the tables whose changes must invalidate the page.
+    """
+    namespaces = tuple(namespaces)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != "GET" or current_user.is_authenticated:
+                response = make_response(view(*args, **kwargs))
+                response.headers["X-Cache"] = "BYPASS"
+                return response
+
+            g.page_cacheable = True
+
+            key = page_cache_key(request.endpoint, getattr(g, "current_lang", "en"), request.view_args)
+            rendered = {}
+
+            def render():
+                response = make_response(view(*args, **kwargs))
+                rendered["response"] = response
+                if (
+                    response.status_code != 200
+                    or response.cache_control.no_store
+                    or response.direct_passthrough
+                    or response.is_streamed
+                ):
+                    # Errors, degraded ``no-store`` pages and streams are not
+                    # cached; record a marker so the next visitor renders again.
+                    return None
+                headers = [
+                    (name, value)
+                    for name, value in response.headers.items()
+                    if name.lower() not in UNCACHED_HEADERS
+                ]
+                return (response.status_code, headers, response.get_data())
+
+            cached = query_cache.get_or_set(("page", key), render, namespaces=namespaces, ttl=ttl)
+            if "response" in rendered:
+                response = rendered["response"]
+                response.headers["X-Cache"] = "MISS"
+                return response
+            if cached is None:
+                response = make_response(view(*args, **kwargs))
+                response.headers["X-Cache"] = "MISS"
+                return response
+            status, headers, body = cached
+            response = Response(body, status=status, headers=headers)
+            response.headers["X-Cache"] = "HIT"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+class PublicPageSessionInterface(SecureCookieSessionInterface):
+    """Cookie sessions that do not add ``Vary: Cookie`` to public responses."""
+
+    def save_session(self, app, session, response) -> None:
+        if response.cache_control.public and not session.modified:
+            session.accessed = False
+        super().save_session(app, session, response)
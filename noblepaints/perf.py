@@ -0,0 +1,285 @@
+"""Per-request performance instrumentation.
+
+Each request records the following:
+
+- the number and total time of its SQL statements, from SQLAlchemy's
+  ``before/after_cursor_execute`` engine events;
+- the time spent rendering templates, from Flask's template signals;
+- the time spent serialising JSON responses, through the app's JSON provider;
+- the size of the response body.
+
+The numbers are sent back in a ``Server-Timing`` header, so the browser's
+network panel shows them next to each response.  Public pages are cached by
+shared caches, so by default (``PERF_SERVER_TIMING=staff``) the header only
+goes to logged-in users; ``all`` sends it to everyone and ``off`` to nobody.
+The numbers are also added to
+:data:`perf_stats`, which ``/ControlPanel/perf`` reads to list the slowest
+endpoints and the statements executed most often per request.
+
+The aggregates live in memory and are per worker process.  Each Passenger
+worker reports only the traffic it served, and they reset on restart.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from flask import g, has_request_context, request, template_rendered, before_render_template
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+# Latencies kept per endpoint for the percentile columns.
+LATENCY_SAMPLES = 200
+# Distinct statements tracked; later ones are folded into one bucket.
+MAX_STATEMENTS = 500
+STATEMENT_KEY_LENGTH = 400
+OTHER_STATEMENTS = "(other statements)"
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_LITERAL_NUMBER = re.compile(r"\b\d+\b")
+
+
+def normalise_statement(statement: str) -> str:
+    """Collapse whitespace, ``IN (?, ?, ...)`` lists and inline numbers."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _PARAMETER_LIST.sub("(?, ...)", statement)
+    statement = _LITERAL_NUMBER.sub("N", statement)
+    return statement[:STATEMENT_KEY_LENGTH]
+
+
+class RequestStats:
+    """Timings collected while one request is being handled."""
+
+    __slots__ = ("started", "sql_count", "sql_time", "statements", "template_time",
+                 "serialize_time", "_template_started")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.statements: Dict[str, List[float]] = {}
+        self.template_time = 0.0
+        self.serialize_time = 0.0
+        self._template_started: List[float] = []
+
+    def add_statement(self, statement: str, seconds: float) -> None:
+        self.sql_count += 1
+        self.sql_time += seconds
+        entry = self.statements.setdefault(normalise_statement(statement), [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+
+def current_stats() -> Optional[RequestStats]:
+    if not has_request_context():
+        return None
+    return g.get("_perf")
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+class PerfRegistry:
+    """Thread-safe aggregates per endpoint and per normalised statement."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.since = time.time()
+            self._endpoints: Dict[str, Dict[str, Any]] = {}
+            self._statements: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, endpoint: str, stats: RequestStats, total: float, size: int, status: int) -> None:
+        with self._lock:
+            entry = self._endpoints.get(endpoint)
+            if entry is None:
+                entry = self._endpoints[endpoint] = {
+                    "requests": 0, "errors": 0, "total_time": 0.0, "max_time": 0.0,
+                    "sql_count": 0, "sql_time": 0.0, "template_time": 0.0, "serialize_time": 0.0,
+                    "bytes": 0, "latencies": deque(maxlen=LATENCY_SAMPLES),
+                }
+            entry["requests"] += 1
+            entry["errors"] += status >= 500
+            entry["total_time"] += total
+            entry["max_time"] = max(entry["max_time"], total)
+            entry["sql_count"] += stats.sql_count
+            entry["sql_time"] += stats.sql_time
+            entry["template_time"] += stats.template_time
+            entry["serialize_time"] += stats.serialize_time
+            entry["bytes"] += size
+            latencies: Deque[float] = entry["latencies"]
+            latencies.append(total)
+
+            for statement, (count, seconds) in stats.statements.items():
+                if statement not in self._statements and len(self._statements) >= MAX_STATEMENTS:
+                    statement = OTHER_STATEMENTS
+                row = self._statements.get(statement)
+                if row is None:
+                    row = self._statements[statement] = {
+                        "executions": 0, "requests": 0, "max_per_request": 0, "total_time": 0.0, "endpoints": {},
+                    }
+                row["executions"] += count
+                row["requests"] += 1
+                row["max_per_request"] = max(row["max_per_request"], count)
+                row["total_time"] += seconds
+                row["endpoints"][endpoint] = row["endpoints"].get(endpoint, 0) + count
+
+    def endpoints(self) -> List[Dict[str, Any]]:
+        """Endpoints ordered by 95th percentile latency, slowest first."""
+        with self._lock:
+            items = [(name, dict(entry, latencies=sorted(entry["latencies"])))
+                     for name, entry in self._endpoints.items()]
+        rows = []
+        for name, entry in items:
+            requests = entry["requests"]
+            rows.append({
+                "endpoint": name,
+                "requests": requests,
+                "errors": entry["errors"],
+                "mean_ms": entry["total_time"] / requests * 1000,
+                "p95_ms": _percentile(entry["latencies"], 0.95) * 1000,
+                "max_ms": entry["max_time"] * 1000,
+                "sql_per_request": entry["sql_count"] / requests,
+                "sql_ms": entry["sql_time"] / requests * 1000,
+                "template_ms": entry["template_time"] / requests * 1000,
+                "serialize_ms": entry["serialize_time"] / requests * 1000,
+                "bytes_mean": entry["bytes"] / requests,
+            })
+        rows.sort(key=lambda row: row["p95_ms"], reverse=True)
+        return rows
+
+    def statements(self) -> List[Dict[str, Any]]:
+        """Statements ordered by executions per request that ran them."""
+        with self._lock:
+            items = [(statement, dict(row, endpoints=dict(row["endpoints"])))
+                     for statement, row in self._statements.items()]
+        rows = []
+        for statement, row in items:
+            endpoints = sorted(row["endpoints"].items(), key=lambda item: item[1], reverse=True)
+            rows.append({
+                "statement": statement,
+                "executions": row["executions"],
+                "requests": row["requests"],
+                "per_request": row["executions"] / row["requests"],
+                "max_per_request": row["max_per_request"],
+                "total_ms": row["total_time"] * 1000,
+                "mean_ms": row["total_time"] / row["executions"] * 1000,
+                "endpoints": [name for name, _ in endpoints[:3]],
+            })
+        rows.sort(key=lambda row: (row["per_request"], row["executions"]), reverse=True)
+        return rows
+
+    def snapshot(self, limit: int = 50) -> Dict[str, Any]:
+        return {
+            "since": self.since,
+            "endpoints": self.endpoints()[:limit],
+            "statements": self.statements()[:limit],
+        }
+
+
+perf_stats = PerfRegistry()
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Adds the time spent in ``dumps`` to the current request's stats."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        stats = current_stats()
+        if stats is None:
+            return super().dumps(obj, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            stats.serialize_time += time.perf_counter() - started
+
+
+def server_timing(stats: RequestStats, total: float) -> str:
+    return ", ".join((
+        f'db;dur={stats.sql_time * 1000:.1f};desc="{stats.sql_count} queries"',
+        f"tpl;dur={stats.template_time * 1000:.1f}",
+        f"ser;dur={stats.serialize_time * 1000:.1f}",
+        f"app;dur={total * 1000:.1f}",
+    ))
+
+
+def _wants_server_timing(mode: str) -> bool:
+    if mode == "all":
+        return True
+    if mode != "staff":
+        return False
+    # Only a user Flask-Login already loaded for this request counts; reading
+    # the session here would add ``Vary: Cookie`` to every response.
+    user = g.get("_login_user")
+    return bool(user is not None and user.is_authenticated)
+
+
+def install_instrumentation(app, engine) -> None:
+    """Hook the timers into *app* and *engine* when ``PERF_ENABLED`` is set.
+
+    Call this before the routes are imported.  ``after_request`` functions
+    run in reverse order of registration, so the timer registered here runs
+    last and also counts the other hooks.
+    """
+    if not app.config.get("PERF_ENABLED", True):
+        return
+    app.json = TimedJSONProvider(app)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        if current_stats() is not None:
+            conn.info.setdefault("perf_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = current_stats()
+        started = conn.info.get("perf_started")
+        if stats is not None and started:
+            stats.add_statement(statement, time.perf_counter() - started.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _failed_execute(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("perf_started"):
+            connection.info["perf_started"].pop()
+
+    def _template_started(sender, template, context, **extra):
+        stats = current_stats()
+        if stats is not None:
+            stats._template_started.append(time.perf_counter())
+
+    def _template_finished(sender, template, context, **extra):
+        stats = current_stats()
+        if stats is not None and stats._template_started:
+            stats.template_time += time.perf_counter() - stats._template_started.pop()
+
+    # Signals hold weak references by default; these closures would be collected.
+    before_render_template.connect(_template_started, app, weak=False)
+    template_rendered.connect(_template_finished, app, weak=False)
+
+    @app.before_request
+    def _start_request_timer():
+        g._perf = RequestStats()
+
+    @app.after_request
+    def _finish_request_timer(response):
+        stats = g.pop("_perf", None)
+        if stats is None:
+            return response
+        total = time.perf_counter() - stats.started
+        if _wants_server_timing(app.config.get("PERF_SERVER_TIMING", "staff")):
+            response.headers["Server-Timing"] = server_timing(stats, total)
+        endpoint = f"{request.method} {request.endpoint or '(unmatched)'}"
+        perf_stats.record(endpoint, stats, total, response.content_length or 0, response.status_code)
+        return response
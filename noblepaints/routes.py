@@ -1,14 +1,13 @@
-from noblepaints import app,mail,db,login_manager
+from noblepaints import app,db,login_manager,query_cache
 from datetime import datetime
 import math
 import time
-from io import BytesIO
+import mimetypes
 import os
 from urllib.parse import urlparse
-from sqlalchemy import insert, desc, func, case, or_, text, inspect
-from sqlalchemy.orm import noload
+from sqlalchemy import insert, desc, func, case, or_
+from sqlalchemy.orm import load_only, noload
 import pathlib
-import requests
 from flask import (
     g,
     render_template,
@@ -21,15 +20,10 @@ from flask import (
     session,
     abort,
     make_response,
-    Response,
-    send_file,
     json,
+    has_request_context,
 )
 from flask_login import login_user, logout_user, login_required, current_user
-try:
-    from deep_translator import GoogleTranslator  # type: ignore
-except Exception:  # pragma: no cover - translation is optional at runtime
-    GoogleTranslator = None
 from noblepaints.forms import LoginForm
 from noblepaints.models import (
     Category,
@@ -45,13 +39,42 @@ from noblepaints.models import (
     Social,
     User,
 )
+from noblepaints.admin_listing import ADMIN_LISTINGS, item_detail, list_page
+from noblepaints.assets import IMMUTABLE_CACHE_CONTROL, fingerprinted, precompressed_variant
+from noblepaints.bootstrap import cache_warmers, ensure_schema
+from noblepaints.conditional import conditional_view
+from noblepaints.counters import record_post_view
+from noblepaints.datafiles import DEFAULT_PER_PAGE, color_families, colors_file, family_colors, find_stores, stores_file
+from noblepaints.facets import (
+    CATEGORISED_MODELS,
+    assign_category,
+    backfill_category_ids,
+    category_clause,
+    category_lookup,
+    get_facet_index,
+    load_page,
+    resolve_category,
+)
+from noblepaints.images import images_root, negotiate_variant, responsive_image
+from noblepaints.logs import get_logger
+from noblepaints.media import SVG_CONTENT_SECURITY_POLICY, MediaError, build_thumbnail, store_image
+from noblepaints.outbox import enqueue_mail, outbox_sender
+from noblepaints.translation import get_backend as get_translation_backend, translate_or_queue, translation_worker
+from noblepaints.page_cache import PublicPageSessionInterface, cached_page
+from noblepaints.perf import perf_stats
+from noblepaints.search import index_product, remove_product, search_product_ids
+from noblepaints.streaming import BlobReader, blob_length, file_response, ranged_response
+from werkzeug.utils import safe_join
 from noblepaints.i18n import (
     AVAILABLE_LANGUAGES,
+    LAYOUT_NAMESPACES,
+    bundles_for,
+    find_bundle,
     get_translation,
-    serialise_translations,
 )
-from functools import lru_cache
-from flask_mail import Message
+from functools import lru_cache, partial
+
+log = get_logger(__name__)
 
 
 FEATURED_PRODUCT_IDS = (
@@ -67,19 +90,35 @@ FEATURED_PRODUCT_IDS = (
     76,
 )
 
-
-def _translate_text(text, target_lang="ar", source_lang="auto"):
-    """Translate *text* into *target_lang* if translation services are available."""
-
-    if not text or not GoogleTranslator:
-        return None
-
-    try:
-        translator = GoogleTranslator(source=source_lang, target=target_lang)
-        return translator.translate(text)
-    except Exception as exc:  # pragma: no cover - network/transient failures
-        app.logger.warning("Auto-translation failed: %s", exc)
-        return None
+NEWS_PER_PAGE = 6
+PRODUCTS_PER_PAGE = 12
+
+# Public pages also served under a ``/<lang>/`` prefix (see
+# ``_register_localized_routes``); their URLs carry the language instead of
+# the session, so shared caches can store one copy per language.
+LOCALIZED_ENDPOINTS = frozenset({
+    'home_page',
+    'ralColors',
+    'about_page',
+    'calculator_page',
+    'socialMedia_page',
+    'products_page',
+    'product_page',
+    'locations_page',
+    'colors_page',
+    'contact_page',
+    'categories_page',
+    'news_page',
+    'news_page_details',
+    'certificates_page',
+    'approvals_page',
+    'products_cat_page',
+    'productsSearch_page_filter_none',
+    'catalogs_page_filter_none',
+    'TechnicalDatasheets_page_filter_none',
+})
+# max-age for language-prefixed pages served to anonymous visitors.
+PUBLIC_PAGE_MAX_AGE = 300
 
 
 def _normalise_lang(candidate):
@@ -96,8 +135,41 @@ def _normalise_lang(candidate):
     return "en"
 
 
+def _product_card(product):
+    """Plain-dict snapshot of the product fields the listing cards render.
+
+    Cached values are shared between workers, so they must not hold
+    session-bound ORM instances.
+    """
+    return {
+        'id': product.id,
+        'name': product.name,
+        'desc': product.desc,
+        'img': product.img,
+        'lang': product.lang,
+        'category': product.category,
+    }
+
+
 def _get_featured_products_for_lang(lang):
     lang = _normalise_lang(lang)
+    return query_cache.get_or_set(
+        ('featured_products', lang),
+        lambda: _query_featured_products(lang),
+        namespaces=('products',),
+    )
+
+
+def _get_latest_products_for_lang(lang, limit=6):
+    lang = _normalise_lang(lang)
+    return query_cache.get_or_set(
+        ('latest_products', lang, limit),
+        lambda: _query_latest_products(lang, limit),
+        namespaces=('products',),
+    )
+
+
+def _query_featured_products(lang):
     search_order = [lang]
     if lang != "en":
         search_order.append("en")
@@ -112,12 +184,11 @@ def _get_featured_products_for_lang(lang):
         for row in rows:
             collected.setdefault(row.id, row)
 
-    ordered = [collected[pid] for pid in FEATURED_PRODUCT_IDS if pid in collected]
+    ordered = [_product_card(collected[pid]) for pid in FEATURED_PRODUCT_IDS if pid in collected]
     return ordered
 
 
-def _get_latest_products_for_lang(lang, limit=6):
-    lang = _normalise_lang(lang)
+def _query_latest_products(lang, limit):
     search_order = [lang]
     if lang != "en":
         search_order.append("en")
@@ -143,65 +214,13 @@ def _get_latest_products_for_lang(lang, limit=6):
         if len(latest) >= limit:
             break
 
-    return latest[:limit]
-# Initialize database tables once at startup
-with app.app_context():
-    db.create_all()
-    # Add database indexes for better performance
-    try:
-        # Create indexes if they don't exist (SQLite compatible)
-        statements = (
-            'CREATE INDEX IF NOT EXISTS idx_categories_id ON categories(category_id)',
-            'CREATE INDEX IF NOT EXISTS idx_products_category ON products(category)',
-            'CREATE INDEX IF NOT EXISTS idx_products_lang ON products(lang)',
-            'CREATE INDEX IF NOT EXISTS idx_catalogs_lang ON catalogs(lang)',
-            'CREATE INDEX IF NOT EXISTS idx_catalogs_category ON catalogs(category)',
-        )
-        with db.engine.begin() as connection:
-            for statement in statements:
-                connection.execute(text(statement))
-        print("Database indexes created/verified for better performance")
-    except Exception as e:
-        print(f"Note: Could not create indexes (may already exist): {e}")
-
-    # Ensure legacy tables contain multilingual support columns
-    try:
-        def ensure_column(table_name, column_name, ddl):
-            inspector = inspect(db.engine)
-            try:
-                columns = {column['name'] for column in inspector.get_columns(table_name)}
-            except Exception:
-                return
-            if column_name not in columns:
-                with db.engine.begin() as connection:
-                    connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {ddl}"))
-                print(f"Added missing column '{column_name}' to '{table_name}'.")
-
-        ensure_column('certificate', 'lang', "VARCHAR")
-        ensure_column('approval', 'lang', "VARCHAR")
-    except Exception as e:
-        print(f"Could not ensure multilingual columns exist: {e}")
-    try:
-        default_username = os.environ.get('ADMIN_INITIAL_USERNAME', 'admin')
-        configured_password = os.environ.get('ADMIN_INITIAL_PASSWORD') or app.config.get('DEFAULT_ADMIN_PASSWORD')
-        fallback_password = configured_password or 'ChangeMe123!'
-        existing_admin = db.session.query(User).filter(func.lower(User.username) == default_username.lower()).first()
-        if not existing_admin:
-            admin_user = User(username=default_username, full_name='Administrator')
-            admin_user.set_password(fallback_password)
-            db.session.add(admin_user)
-            db.session.commit()
-            if configured_password:
-                print(f"Created default admin user '{default_username}' using configured credentials.")
-            else:
-                print(f"Created default admin user '{default_username}' with fallback password '{fallback_password}'. Change it immediately.")
-        elif configured_password and not existing_admin.check_password(configured_password):
-            existing_admin.set_password(configured_password)
-            db.session.commit()
-            print(f"Updated default admin user '{default_username}' password from configuration.")
-    except Exception as e:
-        print(f"Could not ensure default admin user: {e}")
-# Cache will be pre-warmed after function definitions
+    return [_product_card(product) for product in latest[:limit]]
+# Schema migration, the default admin user and cache warming run from
+# ``flask migrate``/``flask bootstrap`` (noblepaints.bootstrap); workers only
+# check the schema version on their first request.
+@app.before_request
+def _check_schema():
+    ensure_schema()
 #pip install Flask-HTTPAuth
 #pip install email_validator
 #pip install flask_bcrypt
@@ -211,6 +230,7 @@ with app.app_context():
 #Authlib==0.14.3
 #os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
 app.secret_key = os.environ.get('SECRET_KEY', 'change-me-please')
+app.session_interface = PublicPageSessionInterface()
 @login_manager.user_loader
 def load_user(user_id):
     try:
@@ -218,24 +238,99 @@ def load_user(user_id):
     except (TypeError, ValueError):
         return None
 def _resolve_language_from_request():
-    """Determine the active language for the current request."""
+    """Determine the active language and where it came from.
+
+    An explicit ``?lang=`` argument (legacy links, the language switcher) wins,
+    then the ``/<lang>/`` URL prefix, then the language remembered in the
+    session of visitors that already carry a session cookie.
+    """
+    url_lang = g.pop('url_lang', None)
+    if url_lang in AVAILABLE_LANGUAGES:
+        candidate = request.args.get('lang')
+        if candidate in AVAILABLE_LANGUAGES and candidate != url_lang:
+            return candidate, 'query'
+        return url_lang, 'url'
     candidate = request.args.get('lang')
     if candidate in AVAILABLE_LANGUAGES:
-        return candidate
-    stored = session.get('lang')
-    if stored in AVAILABLE_LANGUAGES:
-        return stored
-    return 'en'
+        return candidate, 'query'
+    if _has_session_cookie():
+        stored = session.get('lang')
+        if stored in AVAILABLE_LANGUAGES:
+            return stored, 'session'
+    return 'en', 'default'
+def _has_session_cookie():
+    cookies = request.cookies
+    return (
+        app.config['SESSION_COOKIE_NAME'] in cookies
+        or app.config.get('REMEMBER_COOKIE_NAME', 'remember_token') in cookies
+    )
+def _remember_language(lang):
+    # Only touch the session when the stored value actually changes so public
+    # responses do not carry a Set-Cookie header (and Vary: Cookie).
+    if session.get('lang') != lang:
+        session['lang'] = lang
+@app.url_value_preprocessor
+def _pull_language_code(endpoint, values):
+    if values and 'lang_code' in values:
+        g.url_lang = values.pop('lang_code')
+@app.url_defaults
+def _add_language_code(endpoint, values):
+    if endpoint not in LOCALIZED_ENDPOINTS or 'lang_code' in values:
+        return
+    lang = values.pop('lang', None)
+    if lang not in AVAILABLE_LANGUAGES:
+        lang = g.get('current_lang') if has_request_context() else None
+    if lang in AVAILABLE_LANGUAGES:
+        values['lang_code'] = lang
 @app.before_request
 def _set_language_context():
-    lang = _resolve_language_from_request()
-    session['lang'] = lang
+    lang, source = _resolve_language_from_request()
     g.current_lang = lang
+    g.lang_from_url = source == 'url'
+    if source == 'query':
+        _remember_language(lang)
+        if request.method == 'GET' and request.endpoint in LOCALIZED_ENDPOINTS:
+            # Send legacy ``?lang=`` links to the canonical prefixed URL.
+            args = request.args.to_dict()
+            args.pop('lang', None)
+            args.update(request.view_args or {})
+            return redirect(url_for(request.endpoint, lang_code=lang, **args), code=301)
+    elif source == 'url' and _has_session_cookie():
+        _remember_language(lang)
+    if not _has_session_cookie():
+        # Nobody can be logged in without a cookie; skip Flask-Login's session
+        # lookup so the response stays free of Vary: Cookie.
+        g._login_user = login_manager.anonymous_user()
+@app.before_request
+def _start_background_workers():
+    # Picks up work queued by an earlier process.
+    if app.config['OUTBOX_SENDER'] == 'thread' and not outbox_sender.is_alive():
+        outbox_sender.start()
+    if not translation_worker.is_alive() and get_translation_backend() is not None:
+        translation_worker.start()
+@app.after_request
+def _add_language_headers(response):
+    lang = g.get('current_lang')
+    if lang and response.mimetype == 'text/html':
+        response.headers.setdefault('Content-Language', lang)
+        if (
+            g.get('lang_from_url')
+            and request.endpoint in LOCALIZED_ENDPOINTS
+            and (g.get('page_cacheable') or not _has_session_cookie())
+            and response.status_code in (200, 304)
+            and not session.modified
+            and 'Cache-Control' not in response.headers
+        ):
+            response.headers['Cache-Control'] = f'public, max-age={PUBLIC_PAGE_MAX_AGE}'
+    return response
 @app.context_processor
 def inject_layout_helpers():
     current_lang = getattr(g, 'current_lang', 'en')
     def url_for_lang(endpoint, **values):
-        values.setdefault('lang', current_lang)
+        if endpoint in LOCALIZED_ENDPOINTS:
+            values.setdefault('lang_code', values.pop('lang', current_lang))
+        else:
+            values.setdefault('lang', current_lang)
         return url_for(endpoint, **values)
     def switch_lang_url(lang_code):
         try:
@@ -247,17 +342,28 @@ def inject_layout_helpers():
             values = {}
             query_args = {}
         values.update(query_args)
-        values['lang'] = lang_code
+        if endpoint in LOCALIZED_ENDPOINTS:
+            values.pop('lang', None)
+            values['lang_code'] = lang_code
+        else:
+            values['lang'] = lang_code
         return url_for(endpoint, **values)
     def translate(key, default=None):
         return get_translation(key, current_lang, default)
+    def i18n_bundles(*namespaces):
+        """URLs of the translation bundles a page applies client side."""
+        return [
+            url_for('i18n_bundle', lang=bundle.lang, digest=bundle.digest)
+            for bundle in bundles_for(current_lang, LAYOUT_NAMESPACES + namespaces)
+        ]
     return {
         'current_lang': current_lang,
         'available_languages': AVAILABLE_LANGUAGES,
         'url_for_lang': url_for_lang,
         'switch_lang_url': switch_lang_url,
+        'responsive_image': responsive_image,
         't': translate,
-        'base_translations': serialise_translations(),
+        'i18n_bundles': i18n_bundles,
     }
 
 
@@ -282,17 +388,10 @@ def json_error(message, status=400, **extra):
 def _get_admin_pagination(default_show=10):
     """Return validated ``page`` and ``show`` parameters for admin listings.
 
-    The dashboard templates slice the result sets manually using the string
-    values of ``page`` and ``show``.  Historically the routes passed ``None``
-    when these query parameters were missing which caused ``page|int`` and
-    ``show|int`` in the templates to evaluate to ``0``.  The end result was an
-    empty table, broken pagination controls and failing CRUD actions because
-    the forms rely on the currently visible entries.
-
-    This helper normalises the query parameters so that every control-panel
-    view always receives sensible defaults.  The template logic continues to
-    work as-is while ensuring that out-of-range or non-numeric input silently
-    falls back to ``1`` (for ``page``) and ``default_show`` (for ``show``).
+    The control panel pages hand them to their table script as the starting
+    page, and the JSON listings (``cpanel_api_list``) read them for every
+    request.  Missing, out-of-range or non-numeric input silently falls back
+    to ``1`` (for ``page``) and ``default_show`` (for ``show``).
     """
 
     raw_page = request.args.get('page', '1')
@@ -312,6 +411,54 @@ def _get_admin_pagination(default_show=10):
     return str(page_num), str(show_num)
 
 
+def _page_window(total_items, page, per_page):
+    """Return the pager metadata shared by the paginated public listings.
+
+    ``page`` is clamped into ``1..total_pages`` so out-of-range requests land
+    on the last page instead of rendering an empty listing.
+    """
+    total_pages = max(1, math.ceil(total_items / per_page)) if total_items else 1
+    page = min(max(page, 1), total_pages)
+    return {
+        'page': page,
+        'total_pages': total_pages,
+        'page_numbers': list(range(1, total_pages + 1)),
+        'total_items': total_items,
+        'items_per_page': per_page,
+        'has_prev': page > 1,
+        'has_next': page < total_pages,
+        'prev_page': (page - 1) if page > 1 else None,
+        'next_page': (page + 1) if page < total_pages else None,
+    }
+
+
+def _paginate_query(query, page, per_page, count_column):
+    """Fetch a single page of *query* using ``LIMIT``/``OFFSET``.
+
+    The total is computed with a plain ``COUNT(column)`` on the filtered query
+    (ordering stripped) rather than ``Query.count()``'s wrapping subquery, and
+    only the rows of the requested page are hydrated.
+    """
+    total_items = query.with_entities(func.count(count_column)).order_by(None).scalar() or 0
+    pagination = _page_window(total_items, page, per_page)
+    if total_items:
+        offset = (pagination['page'] - 1) * per_page
+        items = query.offset(offset).limit(per_page).all()
+    else:
+        offset = 0
+        items = []
+    pagination['start_index'] = offset + 1 if items else 0
+    pagination['end_index'] = offset + len(items)
+    return items, pagination
+
+
+def _parse_page_arg(name='page'):
+    try:
+        return max(int(request.args.get(name, 1)), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
 def _get_admin_lang(default='en'):
     """Resolve the active language for admin listings."""
 
@@ -363,23 +510,105 @@ def _visible_lang_filter(lang_column, active_lang):
     visible_codes.add(normalised)
 
     return or_(lang_expr == '', lang_expr.in_(tuple(visible_codes)))
+@app.errorhandler(MediaError)
+def handle_media_error(exc):
+    return json_error(f'Invalid image upload: {exc}', status=400)
+@app.route('/media/<path:filename>')
+def media_file(filename):
+    # Stored files are named after their content hash so they never change.
+    path = safe_join(app.config['MEDIA_ROOT'], filename)
+    if path is None or (not os.path.isfile(path) and not build_thumbnail(filename)):
+        abort(404)
+    response = send_from_directory(app.config['MEDIA_ROOT'], filename, max_age=31536000)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    if filename.lower().endswith('.svg'):
+        response.headers['Content-Security-Policy'] = SVG_CONTENT_SECURITY_POLICY
+        response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
+def _upload_metadata(upload_id):
+    """Load an upload's metadata (``flask migrate`` backfills legacy rows)."""
+    try:
+        upload_id = int(upload_id)
+    except (TypeError, ValueError):
+        abort(404)
+    upload = db.session.query(Upload).filter(Upload.id == upload_id).first()
+    if not upload:
+        abort(404)
+    return upload
+def _send_upload(upload_id, as_attachment, mimetype=None):
+    upload = _upload_metadata(upload_id)
+    filename = upload.filename or f'upload-{upload.id}'
+    mimetype = mimetype or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    row_id = upload.id
+    # Rows from before the metadata columns are served without validators
+    # until `flask migrate` has hashed them.
+    size = upload.size if upload.size is not None else blob_length('upload', 'data', row_id)
+    return ranged_response(
+        lambda: BlobReader('upload', 'data', row_id, size),
+        size=size,
+        mimetype=mimetype,
+        etag=upload.checksum or None,
+        last_modified=upload.updated_at,
+        download_name=filename,
+        as_attachment=as_attachment,
+    )
+_default_send_file_max_age = app.get_send_file_max_age
+def _static_send_file_max_age(filename):
+    # Image derivatives carry a content hash in their name and never change.
+    if filename and filename.replace('\\', '/').startswith('images/_derived/'):
+        return 31536000
+    return _default_send_file_max_age(filename)
+app.get_send_file_max_age = _static_send_file_max_age
+@app.url_defaults
+def _fingerprint_static_urls(endpoint, values):
+    # url_for('static', filename='css/site.css') -> the hashed copy when built.
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = fingerprinted(values['filename'])
+def static_files(filename):
+    # Fingerprinted assets are sent precompressed and cached for a year;
+    # everything else goes through Flask's own static handler.
+    variant = precompressed_variant(filename, request.accept_encodings)
+    if variant is None:
+        return app.send_static_file(filename)
+    path, encoding = variant
+    if not os.path.isfile(path):
+        abort(404)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    response = file_response(path, mimetype=mimetype, cache_control=IMMUTABLE_CACHE_CONTROL)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+app.view_functions['static'] = static_files
+@app.route('/img/<path:filename>')
+def negotiated_image(filename):
+    # For CSS backgrounds and clients without srcset support: serve the best
+    # derivative the Accept header allows, or the original image.
+    width = request.args.get('w', default=0, type=int)
+    variant = negotiate_variant(filename, request.accept_mimetypes, width)
+    if variant is None:
+        path = safe_join(images_root(), filename)
+        if not path or not os.path.isfile(path):
+            abort(404)
+        response = file_response(path)
+    else:
+        path, mimetype = variant
+        if not os.path.isfile(path):
+            abort(404)
+        response = file_response(path, mimetype=mimetype)
+    response.vary.add('Accept')
+    return response
 # create download function for download files
 @app.route('/download/<upload_id>')
 def download(upload_id):
-    upload = Upload.query.filter_by(id=upload_id).first()
-    return send_file(BytesIO(upload.data),
-                     download_name=upload.filename, as_attachment=True)
+    return _send_upload(upload_id, as_attachment=True)
 @app.route('/show/<upload_id>/')
 def show_static_pdf(upload_id):
-    upload = Upload.query.filter_by(id=upload_id).first()
-    pdf = BytesIO()
-    pdf.write(upload.data)
-    pdf.seek(0)
-    return send_file(pdf, as_attachment=False, mimetype='application/pdf')
+    return _send_upload(upload_id, as_attachment=False, mimetype='application/pdf')
 @app.route('/home')
-@app.route('/en/')
-@app.route('/ar/')
 @app.route('/')
+@conditional_view(('products',))
+@cached_page(('products',))
 def home_page():
     lang = _normalise_lang(getattr(g, 'current_lang', 'en'))
     featured = _get_featured_products_for_lang(lang)
@@ -388,15 +617,19 @@ def home_page():
 @app.route('/ral-colors/')
 def ralColors():
     return render_template('RalColors.html')
+VIDEO_EXTENSIONS = ('.mp4', '.webm', '.ogv', '.mov')
 @app.route('/video')
-def get_video():  
-    def generate():
-        with open("/flask/noblepaints/static/videos/1.mp4", "rb") as f:
-            data = f.read(1024)
-            while data:
-                yield data
-                data = f.read(1024)
-    return Response(generate(), mimetype="video/mp4", headers={"Accept-Ranges": "bytes"})
+@app.route('/video/<video_id>')
+def get_video(video_id='1'):
+    """Serve a promotional video from ``VIDEO_ROOT`` with seek (Range) support."""
+    if not video_id.replace('-', '').replace('_', '').isalnum():
+        abort(404)
+    video_root = app.config['VIDEO_ROOT']
+    for extension in VIDEO_EXTENSIONS:
+        path = safe_join(video_root, f'{video_id}{extension}')
+        if path and os.path.isfile(path):
+            return file_response(path)
+    abort(404)
 @app.route('/sendC/', methods=["POST", "GET"])
 def sendC():
     if request.method != 'POST':
@@ -411,25 +644,20 @@ def sendC():
             status=400
         )
 
-    msg = Message(
+    enqueue_mail(
         data["type"],
-        sender="noreply@demo.com",
         recipients=["info@noblepaints.com.sa"],
+        body=(
+            ":Noble Paints Customers:\n"
+            f"Name: {data.get('name')}\n"
+            f"Company Name: {data.get('comp', '')}\n"
+            f"Phone: {data.get('phone')}\n"
+            f"Message: {data.get('message', '')}\n"
+        ),
+        sender="noreply@demo.com",
     )
-    msg.body = (
-        ":Noble Paints Customers:\n"
-        f"Name: {data.get('name')}\n"
-        f"Company Name: {data.get('comp', '')}\n"
-        f"Phone: {data.get('phone')}\n"
-        f"Message: {data.get('message', '')}\n"
-    )
-    try:
-        mail.send(msg)
-    except Exception as exc:
-        app.logger.exception("Failed to send contact form email: %s", exc)
-        return json_error('Unable to send message right now.', status=500)
-
-    return json_success('Message sent successfully.')
+    # Delivery happens in the background (noblepaints.outbox).
+    return json_success('Message received.', status=202)
 
 
 @app.route('/login/', methods=['GET', 'POST'])
@@ -473,14 +701,20 @@ def products_page():
     categories = get_cached_categories()
     return render_template('products.html', categories=categories)
 @app.route('/product/')
+@conditional_view(('products',))
+@cached_page(('products',))
 def product_page():
         id = request.args.get('id')  
         product = db.session.query(Product).filter(Product.id==id).first()
         if not product:
             abort(404)
         # Get similar products in same category, excluding current product
+        if product.category_id is not None:
+            same_category = Product.category_id == product.category_id
+        else:
+            same_category = Product.category == product.category
         similar = db.session.query(Product).filter(
-            Product.category==product.category,
+            same_category,
             Product.id != id
         ).limit(6).all()
         return render_template('product.html', product=product, similar=similar)
@@ -490,129 +724,115 @@ def locations_page():
 @app.route('/colors/')
 def colors_page():  
         return render_template('colors.html')
+@app.route('/api/colors/')
+@conditional_view((), cache_control='public, max-age=300', validator=colors_file.version)
+def api_colors():
+    """Colour families with their swatch counts; the swatches are fetched per family."""
+    return jsonify({'families': color_families(), 'version': colors_file.version()})
+@app.route('/api/colors/<key>/')
+@conditional_view((), cache_control='public, max-age=300', validator=colors_file.version)
+def api_family_colors(key):
+    result = family_colors(
+        key,
+        query=request.args.get('q', '').strip(),
+        page=_parse_page_arg(),
+        per_page=request.args.get('per_page', DEFAULT_PER_PAGE, type=int),
+    )
+    if result is None:
+        return json_error('Unknown colour family', status=404)
+    return jsonify(result)
+@app.route('/api/stores/')
+@conditional_view((), cache_control='public, max-age=300', validator=stores_file.version)
+def api_stores():
+    """Stores matching ``country``/``city``/``type``/``q``, with the filter options."""
+    return jsonify(find_stores(
+        country=request.args.get('country', type=int),
+        city=request.args.get('city', type=int),
+        store_type=request.args.get('type', type=int),
+        query=request.args.get('q', '').strip(),
+        page=_parse_page_arg(),
+        per_page=request.args.get('per_page', DEFAULT_PER_PAGE, type=int),
+    ))
 @app.route('/contact/')
 def contact_page():  
         return render_template('contact.html')
-# Categories cache - simple in-memory cache for categories
-categories_cache = {
-    'data': None,
-    'timestamp': 0,  # Force refresh on next load
-    'ttl': 300  # Cache for 5 minutes
-}
-
-
-def invalidate_categories_cache():
-    """Clear the cached categories so subsequent requests fetch fresh data."""
-    categories_cache['data'] = None
-    categories_cache['timestamp'] = 0
 def get_cached_categories():
-    """Get categories with caching to reduce database load - OPTIMIZED VERSION"""
-    current_time = time.time()
-    # Check if cache is valid
-    if (categories_cache['data'] is not None and 
-        current_time - categories_cache['timestamp'] < categories_cache['ttl']):
-        print(f"Returning cached categories: {len(categories_cache['data'])} items")
-        return categories_cache['data']
+    """Return the public category list from the shared query cache."""
     try:
-        print("Fetching categories from database...")
-        # SUPER OPTIMIZED query: include img field for proper image loading
-        categories = db.session.query(
-            Category.id, 
-            Category.name, 
-            Category.nameArabic, 
-            Category.desc,
-            Category.img
-        ).filter(
-            Category.id != 29
-        ).order_by(Category.id).all()
-        print(f"Database returned {len(categories)} categories")
-        # Convert to lightweight dictionary format
-        categories_list = []
-        for cat in categories:
-            # Use img directly from query result - debug what we're getting
-            img_url = cat.img if cat.img else '/static/images/default.png'
-            print(f"Category {cat.id} ({cat.name}): img = '{cat.img}'")  # Debug line
-            categories_list.append({
-                'id': cat.id,
-                'name': cat.name or 'Untitled',
-                'nameArabic': cat.nameArabic or cat.name or 'غير محدد',
-                'desc': cat.desc or 'No description available.',
-                'img': img_url
-            })
-        # Update cache
-        categories_cache['data'] = categories_list
-        categories_cache['timestamp'] = current_time
-        print(f"Cached {len(categories_list)} categories with optimized data")
-        return categories_list
-    except Exception as e:
-        print(f"Database error in get_cached_categories: {e}")
-        # Return cached data if available, even if stale
-        if categories_cache['data'] is not None:
-            print(f"Returning stale cached data: {len(categories_cache['data'])} items")
-            return categories_cache['data']
+        return query_cache.get_or_set('categories', _load_categories, namespaces=('categories',), ttl=300)
+    except Exception:
         # Last resort: return minimal structure
-        print("No cached data available, returning minimal fallback")
+        log.exception('categories.load_failed', fallback=True)
         return [
             {'id': 0, 'name': 'Loading...', 'nameArabic': 'جاري التحميل...', 'desc': 'Please wait', 'img': '/static/images/loading.gif'}
         ]
+def _load_categories():
+    categories = db.session.query(
+        Category.id,
+        Category.name,
+        Category.nameArabic,
+        Category.desc,
+        Category.img
+    ).filter(
+        Category.id != 29
+    ).order_by(Category.id).all()
+    # Convert to lightweight dictionary format
+    categories_list = []
+    for cat in categories:
+        img_url = cat.img if cat.img else '/static/images/default.png'
+        log.debug('categories.row', id=cat.id, name=cat.name, img=cat.img)
+        categories_list.append({
+            'id': cat.id,
+            'name': cat.name or 'Untitled',
+            'nameArabic': cat.nameArabic or cat.name or 'غير محدد',
+            'desc': cat.desc or 'No description available.',
+            'img': img_url
+        })
+    log.info('categories.loaded', count=len(categories_list))
+    return categories_list
 @app.route('/categories/')
+@conditional_view(('categories',), cache_control='public, max-age=300')
 def categories_page():
     """Categories page - optimized hybrid approach with fallback"""
     try:
         # Get categories with minimal data first for fast page load
         categories = get_cached_categories()
-        print(f"Categories page: got {len(categories)} categories for fallback")
+        log.info('categories.page', count=len(categories), sample=100)
         # Return page immediately with cached data - AJAX will enhance if needed
         response = make_response(render_template('categories.html', categories=categories, template='cats'))
         # Add caching headers for better performance
         response.headers['Cache-Control'] = 'public, max-age=300'  # Cache for 5 minutes
-        response.headers['ETag'] = f'categories-{len(categories)}-{int(categories_cache["timestamp"])}'
         return response
-    except Exception as e:
-        print(f"Error in categories_page: {e}")
+    except Exception:
+        log.exception('categories.page_failed')
         # Return minimal page structure if there's an error
-        response = make_response(render_template('categories.html', categories=[], template='cats'))
-        response.headers['Cache-Control'] = 'public, max-age=60'  # Shorter cache for errors
-        return response
+        return _fallback_page(render_template('categories.html', categories=[], template='cats'))
 @app.route('/api/categories/')
+@conditional_view(('categories',), cache_control='public, max-age=300')
 def api_categories():
     """API endpoint for loading categories asynchronously - OPTIMIZED"""
     try:
-        # Check if client has cached version using ETag
-        if_none_match = request.headers.get('If-None-Match')
-        current_etag = f'api-categories-{int(categories_cache.get("timestamp", 0))}'
-        if if_none_match == current_etag:
-            # Client has current version, return 304 Not Modified
-            return '', 304
+        # Conditional requests are answered by conditional_view; the cached
+        # rows already carry the image URLs, so no per-category query.
         categories = get_cached_categories()
-        # For API, include actual image URLs for better UX
-        enhanced_categories = []
-        for cat in categories:
-            enhanced_cat = cat.copy()
-            # Only load actual images via API to avoid blocking initial page load
-            if cat['id'] != 0:  # Skip loading indicator
-                try:
-                    # Get actual image from database only when requested via API
-                    actual_cat = db.session.query(Category.img).filter(Category.id == cat['id']).first()
-                    enhanced_cat['img'] = actual_cat.img if actual_cat and actual_cat.img else '/static/images/default-category.jpg'
-                except:
-                    enhanced_cat['img'] = '/static/images/default-category.jpg'
-            enhanced_categories.append(enhanced_cat)
+        enhanced_categories = [
+            dict(cat, img=cat['img'] or '/static/images/default.png')
+            for cat in categories
+        ]
         response_data = {
             'categories': enhanced_categories,
             'count': len(enhanced_categories),
-            'cached': categories_cache['timestamp'] > 0,
+            'cached': True,
             'success': True,
-            'timestamp': int(time.time())
+            'timestamp': int(query_cache.versions(('categories',))['categories'][1])
         }
         response = jsonify(response_data)
         # Add caching headers
         response.headers['Cache-Control'] = 'public, max-age=300'
-        response.headers['ETag'] = current_etag
-        print(f"API Categories: Returning {len(enhanced_categories)} categories with images")
+        log.info('categories.api', count=len(enhanced_categories), sample=100)
         return response
-    except Exception as e:
-        print(f"Error in api_categories: {e}")
+    except Exception:
+        log.exception('categories.api_failed')
         return jsonify({
             'categories': [],
             'count': 0,
@@ -622,15 +842,11 @@ def api_categories():
             'timestamp': int(time.time())
         }), 500
 @app.route('/news/')
+@conditional_view(('post',))
 def news_page():
     lang = _normalise_lang(getattr(g, 'current_lang', 'en'))
-    raw_page = request.args.get('page')
     news_type = request.args.get('type')
-
-    try:
-        page = max(int(raw_page), 1)
-    except (TypeError, ValueError):
-        page = 1
+    page = _parse_page_arg()
 
     base_query = db.session.query(Post)
     if news_type not in (None, '', 'undefined'):
@@ -642,21 +858,25 @@ def news_page():
 
     query = base_query.filter(_visible_lang_filter(Post.lang, lang))
     sort_priority = _language_sort_case(Post.lang, lang)
-    items = query.order_by(sort_priority, Post.id.desc()).all()
+    items, pagination = _paginate_query(
+        query.order_by(sort_priority, Post.id.desc()),
+        page,
+        NEWS_PER_PAGE,
+        Post.id,
+    )
 
     return render_template(
         'news.html',
         news=items,
-        page=str(page),
         type=news_type,
+        **pagination,
     )
 @app.route('/certificates/')
+@conditional_view(('certificate',))
+@cached_page(('certificate',))
 def certificates_page():
     lang = _normalise_lang(getattr(g, 'current_lang', 'en'))
-    try:
-        page = max(int(request.args.get('page', 1)), 1)
-    except (TypeError, ValueError):
-        page = 1
+    page = _parse_page_arg()
 
     items_per_page = 12
     base_query = db.session.query(Certificate)
@@ -665,51 +885,19 @@ def certificates_page():
         _language_sort_case(Certificate.lang, lang),
         Certificate.id.desc(),
     )
-
-    total_items = base_query.count()
-    if total_items:
-        total_pages = math.ceil(total_items / items_per_page)
-        if page > total_pages:
-            page = total_pages
-        certificates = (
-            base_query
-            .offset((page - 1) * items_per_page)
-            .limit(items_per_page)
-            .all()
-        )
-        start_index = ((page - 1) * items_per_page) + 1
-        end_index = start_index + len(certificates) - 1
-        page_numbers = list(range(1, total_pages + 1))
-    else:
-        certificates = []
-        total_pages = 1
-        page = 1
-        start_index = 0
-        end_index = 0
-        page_numbers = [1]
+    certificates, pagination = _paginate_query(base_query, page, items_per_page, Certificate.id)
 
     return render_template(
         'certificates.html',
         certificates=certificates,
-        page=page,
-        total_pages=total_pages,
-        page_numbers=page_numbers,
-        total_items=total_items,
-        items_per_page=items_per_page,
-        has_prev=page > 1,
-        has_next=page < total_pages,
-        prev_page=(page - 1) if page > 1 else None,
-        next_page=(page + 1) if page < total_pages else None,
-        start_index=start_index,
-        end_index=end_index,
+        **pagination,
     )
 @app.route('/approvals/')
+@conditional_view(('approval',))
+@cached_page(('approval',))
 def approvals_page():
     lang = _normalise_lang(getattr(g, 'current_lang', 'en'))
-    try:
-        page = max(int(request.args.get('page', 1)), 1)
-    except (TypeError, ValueError):
-        page = 1
+    page = _parse_page_arg()
 
     items_per_page = 12
     base_query = db.session.query(Approval)
@@ -718,43 +906,12 @@ def approvals_page():
         _language_sort_case(Approval.lang, lang),
         Approval.id.desc(),
     )
-
-    total_items = base_query.count()
-    if total_items:
-        total_pages = math.ceil(total_items / items_per_page)
-        if page > total_pages:
-            page = total_pages
-        approvals = (
-            base_query
-            .offset((page - 1) * items_per_page)
-            .limit(items_per_page)
-            .all()
-        )
-        start_index = ((page - 1) * items_per_page) + 1
-        end_index = start_index + len(approvals) - 1
-        page_numbers = list(range(1, total_pages + 1))
-    else:
-        approvals = []
-        total_pages = 1
-        page = 1
-        start_index = 0
-        end_index = 0
-        page_numbers = [1]
+    approvals, pagination = _paginate_query(base_query, page, items_per_page, Approval.id)
 
     return render_template(
         'approvals.html',
         approvals=approvals,
-        page=page,
-        total_pages=total_pages,
-        page_numbers=page_numbers,
-        total_items=total_items,
-        items_per_page=items_per_page,
-        has_prev=page > 1,
-        has_next=page < total_pages,
-        prev_page=(page - 1) if page > 1 else None,
-        next_page=(page + 1) if page < total_pages else None,
-        start_index=start_index,
-        end_index=end_index,
+        **pagination,
     )
 @app.route('/news/<id>/')
 def news_page_details(id):  
@@ -763,44 +920,41 @@ def news_page_details(id):
     post = db.session.query(Post).filter(Post.id==id).first()
     if not post:
         abort(404)
-    # Update views efficiently
-    if post.views:
-        post.views = int(post.views) + 1
-    else:
-        post.views = '1'
-    db.session.commit()
+    record_post_view(post.id)
     # Optimize queries with limits
     latest = db.session.query(Post).filter(Post.lang==lang).limit(5).all()
-    allNews = Post.query.order_by(desc(Post.views)).filter(Post.lang==lang).limit(10).all()
+    allNews = Post.query.filter(Post.lang==lang).order_by(desc(Post.views)).limit(10).all()
     return render_template('news_details.html',
         post=post,
         latest=latest,
         allNews=allNews
     )
 @app.route('/products/<cat>/')
+@conditional_view(('products', 'categories'))
 def products_cat_page(cat):
-        category = db.session.query(Product).filter(Product.category==cat)
-        if category:
-            return render_template('products_cat.html',
-            items=category.all(),
-            title=cat,                   
-            )
-        else:
-            return render_template('products_cat.html',
-            title="kids",                    
-            )
+    page = _parse_page_arg()
+    query = (
+        db.session.query(Product)
+        .options(load_only(Product.id, Product.name, Product.desc))
+        .filter(category_clause(Product, cat))
+        .order_by(Product.id.desc())
+    )
+    items, pagination = _paginate_query(query, page, PRODUCTS_PER_PAGE, Product.id)
+    return render_template(
+        'products_cat.html',
+        items=items,
+        title=cat,
+        cat=cat,
+        **pagination,
+    )
 @app.route('/productsSearch/')
+@conditional_view(('products', 'categories'))
 def productsSearch_page_filter_none():
     lang = _normalise_lang(getattr(g, 'current_lang', 'en'))
     category_filter = (request.args.get('category') or 'All').strip() or 'All'
     search_term = (request.args.get('search') or '').strip()
     country_filter = (request.args.get('country') or 'All').strip() or 'All'
-    page = request.args.get('page', default='1')
-
-    try:
-        page_number = max(int(page), 1)
-    except (TypeError, ValueError):
-        page_number = 1
+    page_number = _parse_page_arg()
 
     query = db.session.query(Product)
 
@@ -809,20 +963,38 @@ def productsSearch_page_filter_none():
     sort_priority = _language_sort_case(Product.lang, lang)
 
     if category_filter not in (None, '', 'All', 'null'):
-        query = query.filter(Product.category == category_filter)
+        query = query.filter(category_clause(Product, category_filter))
 
     if country_filter not in (None, '', 'All', 'null'):
         query = query.filter(Product.country == country_filter)
 
     if search_term:
-        query = query.filter(Product.name.ilike(f'%{search_term}%'))
-
-    items = query.order_by(sort_priority, Product.id.desc()).all()
+        ranked_ids = search_product_ids(
+            query.with_entities(Product.id),
+            search_term,
+            cache_key=(lang, category_filter, country_filter),
+            leading_order=(sort_priority,),
+        )
+        pagination = _page_window(len(ranked_ids), page_number, PRODUCTS_PER_PAGE)
+        offset = (pagination['page'] - 1) * PRODUCTS_PER_PAGE
+        page_ids = ranked_ids[offset:offset + PRODUCTS_PER_PAGE]
+        products_by_id = {
+            product.id: product
+            for product in db.session.query(Product).filter(Product.id.in_(page_ids))
+        } if page_ids else {}
+        items = [products_by_id[pid] for pid in page_ids if pid in products_by_id]
+    else:
+        items, pagination = _paginate_query(
+            query.order_by(sort_priority, Product.id.desc()),
+            page_number,
+            PRODUCTS_PER_PAGE,
+            Product.id,
+        )
 
     return render_template(
         'productsSearch.html',
         items=items,
-        page=str(page_number),
+        **pagination,
         category='All' if category_filter in (None, '', 'All', 'null') else category_filter,
         search=search_term,
         country='All' if country_filter in (None, '', 'All', 'null') else country_filter,
@@ -830,7 +1002,27 @@ def productsSearch_page_filter_none():
         template='products',
         lang=lang,
     )
+def _category_filter_value(cat):
+    """Resolve a requested category (id or name) to its facet value."""
+    if not cat or cat in ('All', 'null'):
+        return 'All'
+    category_by_id, category_by_name = category_lookup()
+    return resolve_category(cat, category_by_id, category_by_name)[0] or 'All'
+def _fallback_page(body):
+    """Serve a degraded page without letting any cache keep it."""
+    response = make_response(body)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+def _attach_category_labels(items):
+    category_by_id, category_by_name = category_lookup()
+    for item in items:
+        raw_category = item.category_id if item.category_id is not None else item.category
+        item.category_value, item.category_label = resolve_category(
+            str(raw_category) if raw_category is not None else None, category_by_id, category_by_name
+        )
 @app.route('/catalogs/')
+@conditional_view(('catalogs', 'categories'))
+@cached_page(('catalogs', 'categories'))
 def catalogs_page_filter_none():
     try:
         cat = (request.args.get('category') or 'All').strip()
@@ -845,116 +1037,21 @@ def catalogs_page_filter_none():
             page = 1
         items_per_page = 12
 
-        categories_data = (
-            db.session.query(Category.id, Category.name, Category.nameArabic)
-            .order_by(Category.name.asc())
-            .all()
-        )
-        category_by_id = {}
-        category_by_name = {}
-        for category_id, category_name, category_name_ar in categories_data:
-            cleaned_name = (category_name or '').strip()
-            cleaned_name_ar = (category_name_ar or '').strip()
-            display_label = cleaned_name or cleaned_name_ar or f"Category {category_id}"
-            key = str(category_id)
-            category_by_id[key] = display_label
-            if cleaned_name:
-                category_by_name[cleaned_name] = key
-                category_by_name.setdefault(cleaned_name.lower(), key)
-            if cleaned_name_ar:
-                category_by_name[cleaned_name_ar] = key
-                category_by_name.setdefault(cleaned_name_ar.lower(), key)
-
-        base_query = db.session.query(Catalog)
-        # Always expose catalogs regardless of how their language code was stored,
-        # then prefer matches for the active locale via the ordering rules below.
-        lang_column = func.lower(func.coalesce(Catalog.lang, ''))
-        query = base_query
-        selected_category = 'All'
-        if cat and cat not in ('All', 'null'):
-            category_filter_values = {cat}
-            if cat in category_by_id:
-                category_filter_values.add(category_by_id[cat])
-                selected_category = cat
-            else:
-                mapped_id = category_by_name.get(cat) or category_by_name.get(cat.lower())
-                if mapped_id:
-                    category_filter_values.add(mapped_id)
-                    selected_category = mapped_id
-                else:
-                    selected_category = cat
-            query = query.filter(Catalog.category.in_(category_filter_values))
-        else:
-            selected_category = 'All'
-        if country and country not in ('All', 'null'):
-            query = query.filter(Catalog.country == country)
-        if search:
-            search_value = f"%{search.lower()}%"
-            query = query.filter(func.lower(Catalog.name).like(search_value))
-        total_items = query.count()
-        ordering_rules = [(lang_column == '', 0), (lang_column == lang, 1)]
-        # Ensure the remaining languages appear afterwards in a stable order.
-        priority = 2
-        for code in AVAILABLE_LANGUAGES.keys():
-            if code == lang:
-                continue
-            ordering_rules.append((lang_column == code, priority))
-            priority += 1
-        sort_priority = case(*ordering_rules, else_=priority)
-        query = query.order_by(sort_priority, desc(Catalog.id))
+        selected_category = _category_filter_value(cat)
+        filters = {'category': selected_category, 'country': country, 'search': search}
+        index = get_facet_index(Catalog.__tablename__)
+        # Catalogs in every language stay listed; the active locale sorts first.
+        matching_ids = index.ordered_ids(lang, **filters)
+        total_items = len(matching_ids)
         total_pages = max(1, math.ceil(total_items / items_per_page)) if total_items else 1
         if page > total_pages:
             page = total_pages
         offset = (page - 1) * items_per_page
-        items = query.offset(offset).limit(items_per_page).all()
-        for item in items:
-            raw_category = (item.category or '').strip()
-            if raw_category in category_by_id:
-                item.category_label = category_by_id[raw_category]
-                item.category_value = raw_category
-            elif raw_category in category_by_name or raw_category.lower() in category_by_name:
-                mapped_id = category_by_name.get(raw_category) or category_by_name.get(raw_category.lower())
-                item.category_label = category_by_id.get(mapped_id, raw_category)
-                item.category_value = mapped_id
-            else:
-                item.category_label = raw_category
-                item.category_value = raw_category
-        categories_query = (
-            base_query.with_entities(Catalog.category)
-            .filter(Catalog.category.isnot(None), Catalog.category != '')
-            .distinct()
-        )
-        category_options = {}
-        for value, label in category_by_id.items():
-            if value and value not in category_options:
-                category_options[value] = label
-        for row in categories_query:
-            raw_value = (row[0] or '').strip()
-            if not raw_value:
-                continue
-            if raw_value in category_by_id:
-                value = raw_value
-                label = category_by_id[raw_value]
-            else:
-                mapped_id = category_by_name.get(raw_value) or category_by_name.get(raw_value.lower())
-                if mapped_id:
-                    value = mapped_id
-                    label = category_by_id.get(mapped_id, raw_value)
-                else:
-                    value = raw_value
-                    label = raw_value
-            if value not in category_options:
-                category_options[value] = label
-        catalog_categories = [
-            {'value': key, 'label': value}
-            for key, value in sorted(category_options.items(), key=lambda item: str(item[1]).lower())
-        ]
-        countries_query = (
-            base_query.with_entities(Catalog.country)
-            .filter(Catalog.country.isnot(None), Catalog.country != '')
-            .distinct()
-        )
-        catalog_countries = sorted([row[0] for row in countries_query if row[0]])
+        items = load_page(Catalog, matching_ids[offset:offset + items_per_page])
+        _attach_category_labels(items)
+        facet_counts = index.counts(**filters)
+        catalog_categories = index.category_options(facet_counts['category'])
+        catalog_countries = index.country_options(facet_counts['country'])
         # Expose the full list of pages so the template can always render
         # visible pagination controls. The dataset is typically small enough
         # that rendering the complete sequence avoids edge cases where
@@ -980,13 +1077,13 @@ def catalogs_page_filter_none():
             prev_page=(page - 1) if page > 1 else None,
             next_page=(page + 1) if page < total_pages else None,
         )
-    except Exception as e:
-        print(f"Error in catalogs route: {e}")
+    except Exception:
+        log.exception('catalogs.page_failed')
         try:
             items = db.session.query(Catalog).filter(Catalog.lang == 'en').order_by(desc(Catalog.id)).limit(12).all()
             for item in items:
                 item.category_label = (item.category or '').strip()
-            return render_template(
+            return _fallback_page(render_template(
                 'catalogs.html',
                 items=items,
                 total_items=len(items),
@@ -1001,11 +1098,13 @@ def catalogs_page_filter_none():
                 catalog_categories=[],
                 catalog_countries=[],
                 lang='en'
-            )
-        except Exception as fallback_error:
-            print(f"Fallback error: {fallback_error}")
+            ))
+        except Exception:
+            log.exception('catalogs.fallback_failed')
             return "Internal server error in catalogs page", 500
 @app.route('/TechnicalDatasheets/')
+@conditional_view(('technicalDatasheets', 'categories'))
+@cached_page(('technicalDatasheets', 'categories'))
 def TechnicalDatasheets_page_filter_none():
     try:
         cat = (request.args.get('category') or 'All').strip()
@@ -1021,94 +1120,24 @@ def TechnicalDatasheets_page_filter_none():
             page = 1
         items_per_page = 12
 
-        categories_data = (
-            db.session.query(Category.id, Category.name, Category.nameArabic)
-            .order_by(Category.name.asc())
-            .all()
-        )
-        category_by_id = {}
-        category_by_name = {}
-        for category_id, category_name, category_name_ar in categories_data:
-            cleaned_name = (category_name or '').strip()
-            cleaned_name_ar = (category_name_ar or '').strip()
-            display_label = cleaned_name or cleaned_name_ar or f"Category {category_id}"
-            key = str(category_id)
-            category_by_id[key] = display_label
-            if cleaned_name:
-                category_by_name[cleaned_name] = key
-                category_by_name.setdefault(cleaned_name.lower(), key)
-            if cleaned_name_ar:
-                category_by_name[cleaned_name_ar] = key
-                category_by_name.setdefault(cleaned_name_ar.lower(), key)
-
-        base_query = db.session.query(TechnicalDatasheet)
-        query = base_query.filter(_visible_lang_filter(TechnicalDatasheet.lang, lang))
-        selected_category = 'All'
-
-        if cat and cat not in ('All', 'null'):
-            category_filter_values = {cat}
-            if cat in category_by_id:
-                category_filter_values.add(cat)
-                selected_category = cat
-            else:
-                mapped_id = category_by_name.get(cat) or category_by_name.get(cat.lower())
-                if mapped_id:
-                    category_filter_values.add(mapped_id)
-                    selected_category = mapped_id
-                else:
-                    selected_category = cat
-            query = query.filter(TechnicalDatasheet.category.in_(category_filter_values))
-
-        if country and country not in ('All', 'null'):
-            query = query.filter(TechnicalDatasheet.country == country)
-
-        if search:
-            search_value = f"%{search.lower()}%"
-            query = query.filter(func.lower(TechnicalDatasheet.name).like(search_value))
-
-        sort_priority = _language_sort_case(TechnicalDatasheet.lang, lang)
-
-        total_items = query.count()
+        selected_category = _category_filter_value(cat)
+        filters = {'category': selected_category, 'country': country, 'search': search, 'visible_only': True}
+        index = get_facet_index(TechnicalDatasheet.__tablename__)
+        matching_ids = index.ordered_ids(lang, **filters)
+        total_items = len(matching_ids)
         total_pages = max(1, math.ceil(total_items / items_per_page)) if total_items else 1
         if page > total_pages:
             page = total_pages
         offset = (page - 1) * items_per_page
-        items = (
-            query.order_by(sort_priority, desc(TechnicalDatasheet.id))
-            .offset(offset)
-            .limit(items_per_page)
-            .all()
-        )
+        items = load_page(TechnicalDatasheet, matching_ids[offset:offset + items_per_page])
+        _attach_category_labels(items)
 
-        for item in items:
-            raw_category = (item.category or '').strip()
-            if raw_category in category_by_id:
-                item.category_label = category_by_id[raw_category]
-                item.category_value = raw_category
-            else:
-                mapped_id = category_by_name.get(raw_category) or category_by_name.get(raw_category.lower())
-                if mapped_id:
-                    item.category_label = category_by_id.get(mapped_id, raw_category)
-                    item.category_value = mapped_id
-                else:
-                    item.category_label = raw_category
-                    item.category_value = raw_category
-
-        countries_query = (
-            base_query.with_entities(TechnicalDatasheet.country)
-            .filter(TechnicalDatasheet.country.isnot(None), TechnicalDatasheet.country != '')
-            .distinct()
-        )
-        datasheet_countries = sorted([row[0] for row in countries_query if row[0]])
+        facet_counts = index.counts(**filters)
+        datasheet_categories = index.category_options(facet_counts['category'])
+        datasheet_countries = index.country_options(facet_counts['country'])
 
         page_numbers = list(range(1, total_pages + 1))
 
-        categories = (
-            db.session.query(Category)
-            .order_by(Category.id.asc())
-            .all()
-        )
-
         return render_template(
             'TechnicalDatasheets.html',
             items=items,
@@ -1117,7 +1146,7 @@ def TechnicalDatasheets_page_filter_none():
             category=selected_category,
             search=search,
             country=country,
-            categories=categories,
+            categories=datasheet_categories,
             items_per_page=items_per_page,
             total_pages=total_pages,
             page_numbers=page_numbers,
@@ -1128,9 +1157,9 @@ def TechnicalDatasheets_page_filter_none():
             prev_page=(page - 1) if page > 1 else None,
             next_page=(page + 1) if page < total_pages else None,
         )
-    except Exception as e:
+    except Exception:
         # Fallback to basic functionality if something goes wrong
-        print(f"Error in TechnicalDatasheets route: {e}")
+        log.exception('datasheets.page_failed')
         try:
             items = (
                 db.session.query(TechnicalDatasheet)
@@ -1141,7 +1170,7 @@ def TechnicalDatasheets_page_filter_none():
             categories = db.session.query(Category).all()
             for item in items:
                 item.category_label = (item.category or '').strip()
-            return render_template(
+            return _fallback_page(render_template(
                 'TechnicalDatasheets.html',
                 items=items,
                 total_items=len(items),
@@ -1159,23 +1188,17 @@ def TechnicalDatasheets_page_filter_none():
                 has_next=False,
                 prev_page=None,
                 next_page=None,
-            )
-        except Exception as fallback_error:
-            print(f"TechnicalDatasheets fallback error: {fallback_error}")
+            ))
+        except Exception:
+            log.exception('datasheets.fallback_failed')
             return "Internal server error in TechnicalDatasheets page", 500
 ################################################
 @app.route('/ControlPanel/socialIcons/')
 @login_required
 def cpanel_socialIcons():
     page, show = _get_admin_pagination()
-    social_icons = (
-        db.session.query(Social)
-        .order_by(Social.id.desc())
-        .all()
-    )
     return render_template(
         'cpanel_socialIcons.html',
-        socialIcons=social_icons,
         page=page,
         show=show,
     )
@@ -1230,16 +1253,8 @@ def socialIcons_del(id):
 def cpanel_news():
     page, show = _get_admin_pagination()
     lang = _get_admin_lang()
-    base_query = db.session.query(Post)
-    news_items = (
-        base_query
-        .filter(_visible_lang_filter(Post.lang, lang))
-        .order_by(_language_sort_case(Post.lang, lang), Post.id.desc())
-        .all()
-    )
     return render_template(
         'cpanel_news.html',
-        news=news_items,
         page=page,
         show=show,
         lang=lang,
@@ -1259,7 +1274,7 @@ def news_add():
 
     post = Post(
         title=title,
-        img=data.get('img'),
+        img=store_image(data.get('img')),
         description=description,
         lang=lang,
         date=data.get('date'),
@@ -1290,7 +1305,7 @@ def news_edit(id):
     if date and date != 'undefined':
         post.date = date
     if img and img != 'undefined':
-        post.img = img
+        post.img = store_image(img)
     if lang and lang != 'undefined':
         post.lang = _normalise_lang(lang)
 
@@ -1312,15 +1327,8 @@ def news_del(id):
 def cpanel_certificates():
     page, show = _get_admin_pagination()
     lang = _get_admin_lang()
-    certificates = (
-        db.session.query(Certificate)
-        .filter(_visible_lang_filter(Certificate.lang, lang))
-        .order_by(_language_sort_case(Certificate.lang, lang), Certificate.id.desc())
-        .all()
-    )
     return render_template(
         'cpanel_certificates.html',
-        certificates=certificates,
         page=page,
         show=show,
         lang=lang,
@@ -1339,7 +1347,7 @@ def certificates_add():
 
     certificate = Certificate(
         title=title,
-        img=data.get('img'),
+        img=store_image(data.get('img')),
         description=description,
         link=data.get('link'),
         lang=_normalise_lang((data.get('lang') or '').strip() or getattr(g, 'current_lang', 'en')),
@@ -1370,7 +1378,7 @@ def certificates_edit(id):
     if link and link != 'undefined':
         certificate.link = link
     if img and img != 'undefined':
-        certificate.img = img
+        certificate.img = store_image(img)
     if lang_value and lang_value != 'undefined':
         certificate.lang = _normalise_lang(lang_value)
 
@@ -1392,15 +1400,8 @@ def certificates_del(id):
 def cpanel_approvals():
     page, show = _get_admin_pagination()
     lang = _get_admin_lang()
-    approvals = (
-        db.session.query(Approval)
-        .filter(_visible_lang_filter(Approval.lang, lang))
-        .order_by(_language_sort_case(Approval.lang, lang), Approval.id.desc())
-        .all()
-    )
     return render_template(
         'cpanel_approvals.html',
-        approvals=approvals,
         page=page,
         show=show,
         lang=lang,
@@ -1419,7 +1420,7 @@ def approvals_add():
 
     approval = Approval(
         title=title,
-        img=data.get('img'),
+        img=store_image(data.get('img')),
         description=description,
         link=data.get('link'),
         lang=_normalise_lang((data.get('lang') or '').strip() or getattr(g, 'current_lang', 'en')),
@@ -1450,7 +1451,7 @@ def approvals_edit(id):
     if link and link != 'undefined':
         approval.link = link
     if img and img != 'undefined':
-        approval.img = img
+        approval.img = store_image(img)
     if lang_value and lang_value != 'undefined':
         approval.lang = _normalise_lang(lang_value)
 
@@ -1472,13 +1473,6 @@ def approvals_del(id):
 def cpanel_products():
     page, show = _get_admin_pagination()
     lang = _get_admin_lang()
-    base_query = db.session.query(Product)
-    products = (
-        base_query
-        .filter(_visible_lang_filter(Product.lang, lang))
-        .order_by(_language_sort_case(Product.lang, lang), Product.id.desc())
-        .all()
-    )
     categories = (
         db.session.query(Category)
         .order_by(Category.id.asc())
@@ -1486,7 +1480,6 @@ def cpanel_products():
     )
     return render_template(
         'cpanel_products.html',
-        products=products,
         page=page,
         show=show,
         categories=categories,
@@ -1507,7 +1500,7 @@ def products_add():
     if not name or not desc:
         return json_error('Name and description are required.')
 
-    img = data.get('img')
+    img = store_image(data.get('img'))
     category = data.get('category')
     country = data.get('country')
     lang = _normalise_lang(data.get('lang'))
@@ -1516,7 +1509,8 @@ def products_add():
     if request.files:
         datasheet = request.files.get('file')
         if datasheet and datasheet.filename:
-            upload = Upload(filename=datasheet.filename, data=datasheet.read())
+            upload = Upload()
+            upload.set_data(datasheet.filename, datasheet.read())
             db.session.add(upload)
             db.session.commit()
             datasheet_id = upload.id
@@ -1525,12 +1519,14 @@ def products_add():
         name=name,
         img=img,
         desc=desc,
-        category=category,
         country=country,
         lang=lang,
         datasheet=datasheet_id,
     )
+    assign_category(product, category)
     db.session.add(product)
+    db.session.flush()
+    index_product(product)
     db.session.commit()
     return json_success('Product created successfully.', status=201, id=product.id)
 @app.route('/ControlPanel/products/edit/<id>/',methods=['POST','GET'])
@@ -1557,29 +1553,28 @@ def products_edit(id):
     if request.files:
         datasheet = request.files.get('file')
         if datasheet and datasheet.filename and datasheet != 'undefined':
-            upload = db.session.query(Upload).filter(Upload.id == product.datasheet).first()
-            if upload:
-                upload.filename = datasheet.filename
-                upload.data = datasheet.read()
-            else:
-                upload = Upload(filename=datasheet.filename, data=datasheet.read())
-                db.session.add(upload)
-                db.session.commit()
-                product.datasheet = upload.id
+            # Store a new row rather than rewriting the old one: downloads
+            # already streaming it read the blob chunk by chunk.
+            upload = Upload()
+            upload.set_data(datasheet.filename, datasheet.read())
+            db.session.add(upload)
+            db.session.flush()
+            product.datasheet = upload.id
 
     if name and name != 'undefined':
         product.name = name.strip()
     if desc and desc != 'undefined':
         product.desc = desc.strip()
     if category and category != 'undefined':
-        product.category = category
+        assign_category(product, category)
     if country and country != 'undefined':
         product.country = country
     if lang and lang != 'undefined':
         product.lang = _normalise_lang(lang)
     if img and img != 'undefined':
-        product.img = img
+        product.img = store_image(img)
 
+    index_product(product)
     db.session.commit()
     return json_success('Product updated successfully.')
 @app.route('/ControlPanel/products/del/<id>/', methods=['DELETE', 'POST', 'GET'])
@@ -1589,6 +1584,7 @@ def products_del(id):
     if not product:
         return json_error('Product not found.', status=404)
 
+    remove_product(product.id)
     db.session.delete(product)
     db.session.commit()
     return json_success('Product deleted successfully.')
@@ -1598,37 +1594,6 @@ def products_del(id):
 def cpanel_catalogs():
     page, show = _get_admin_pagination()
     lang = _get_admin_lang()
-    base_query = db.session.query(Catalog)
-
-    # Always expose catalogs created in any supported language so that
-    # administrators do not need to duplicate entries when switching the
-    # dashboard locale.  Results are ordered so that entries matching the
-    # currently selected language appear first, followed by other supported
-    # translations and language-neutral rows.
-    visible_langs = set(AVAILABLE_LANGUAGES.keys())
-    visible_langs.add(lang)
-    base_query = base_query.filter(
-        or_(
-            Catalog.lang.in_(tuple(visible_langs)),
-            Catalog.lang.is_(None),
-            Catalog.lang == '',
-        )
-    )
-
-    ordering_rules = [
-        (Catalog.lang.is_(None), 0),
-        (Catalog.lang == '', 1),
-        (Catalog.lang == lang, 2),
-    ]
-    priority = 3
-    for code in AVAILABLE_LANGUAGES.keys():
-        if code == lang:
-            continue
-        ordering_rules.append((Catalog.lang == code, priority))
-        priority += 1
-    sort_priority = case(*ordering_rules, else_=priority)
-
-    catalogs = base_query.order_by(sort_priority, Catalog.id.desc()).all()
     categories = (
         db.session.query(Category)
         .order_by(Category.id.asc())
@@ -1636,7 +1601,6 @@ def cpanel_catalogs():
     )
     return render_template(
         'cpanel_catalogs.html',
-        catalogs=catalogs,
         page=page,
         show=show,
         categories=categories,
@@ -1658,7 +1622,7 @@ def catalogs_add():
         return json_error('Invalid catalog data payload.', status=400)
 
     name = (data.get('name') or '').strip()
-    img = data.get('img')
+    img = store_image(data.get('img'))
     category = (data.get('category') or '').strip() or None
     country = (data.get('country') or '').strip() or None
     if not name:
@@ -1670,23 +1634,24 @@ def catalogs_add():
 
     try:
         original_filename = pathlib.Path(file_obj.filename).name
-        upload = Upload(filename=original_filename, data=file_obj.read())
+        upload = Upload()
+        upload.set_data(original_filename, file_obj.read())
         db.session.add(upload)
         db.session.flush()
 
         catalog = Catalog(
             name=name,
-            img=(img.strip() if isinstance(img, str) and img.strip() else None),
+            img=img,
             link=upload.id,
-            category=category,
             country=country,
             lang=None,
         )
+        assign_category(catalog, category)
         db.session.add(catalog)
         db.session.commit()
-    except Exception as exc:
+    except Exception:
         db.session.rollback()
-        app.logger.exception('Failed to create catalog', exc_info=exc)
+        log.exception('catalogs.create_failed')
         return json_error('Failed to create catalog. Please try again later.', status=500)
 
     return json_success('Catalog created successfully.', status=201, id=catalog.id)
@@ -1712,26 +1677,22 @@ def catalogs_edit(id):
     if request.files:
         link = request.files.get('file')
         if link and link.filename and link != 'undefined':
-            upload = db.session.query(Upload).filter(Upload.id == catalog.link).first()
-            new_filename = pathlib.Path(link.filename).name
-            if upload:
-                upload.filename = new_filename
-                upload.data = link.read()
-            else:
-                upload = Upload(filename=new_filename, data=link.read())
-                db.session.add(upload)
-                db.session.commit()
-                catalog.link = upload.id
+            # See products_edit: a replaced file gets a new upload row.
+            upload = Upload()
+            upload.set_data(pathlib.Path(link.filename).name, link.read())
+            db.session.add(upload)
+            db.session.flush()
+            catalog.link = upload.id
 
     if name and name != 'undefined':
         catalog.name = name.strip()
     if category and category != 'undefined':
-        catalog.category = category
+        assign_category(catalog, category)
     if country and country != 'undefined':
         catalog.country = country
     catalog.lang = None
     if img and img != 'undefined':
-        catalog.img = img
+        catalog.img = store_image(img)
 
     db.session.commit()
     return json_success('Catalog updated successfully.')
@@ -1751,13 +1712,6 @@ def catalogs_del(id):
 def cpanel_TechnicalDatasheets():
     page, show = _get_admin_pagination()
     lang = _get_admin_lang()
-    base_query = db.session.query(TechnicalDatasheet)
-    datasheets = (
-        base_query
-        .filter(_visible_lang_filter(TechnicalDatasheet.lang, lang))
-        .order_by(_language_sort_case(TechnicalDatasheet.lang, lang), TechnicalDatasheet.id.desc())
-        .all()
-    )
     categories = (
         db.session.query(Category)
         .order_by(Category.id.asc())
@@ -1765,7 +1719,6 @@ def cpanel_TechnicalDatasheets():
     )
     return render_template(
         'cpanel_TechnicalDatasheets.html',
-        TechnicalDatasheets=datasheets,
         page=page,
         show=show,
         categories=categories,
@@ -1789,10 +1742,10 @@ def TechnicalDatasheets_add():
     datasheet = TechnicalDatasheet(
         name=name,
         link=link,
-        category=category,
         country=country,
         lang=lang,
     )
+    assign_category(datasheet, category)
     db.session.add(datasheet)
     db.session.commit()
     return json_success('Technical datasheet created successfully.', status=201, id=datasheet.id)
@@ -1818,7 +1771,7 @@ def TechnicalDatasheets_edit(id):
     if link and link != 'undefined':
         datasheet.link = link
     if category and category != 'undefined':
-        datasheet.category = category
+        assign_category(datasheet, category)
     if country and country != 'undefined':
         datasheet.country = country
     if lang and lang != 'undefined':
@@ -1842,14 +1795,8 @@ def TechnicalDatasheets_del(id):
 @login_required
 def cpanel_categories():
     page, show = _get_admin_pagination()
-    categories = (
-        db.session.query(Category)
-        .order_by(Category.id.asc())
-        .all()
-    )
     return render_template(
         'cpanel_categories.html',
-        categories=categories,
         page=page,
         show=show,
     )
@@ -1864,28 +1811,24 @@ def categories_add():
     name_arabic = (data.get('namearabic') or '').strip()
     desc = (data.get('desc') or '').strip()
 
-    if not name and name_arabic:
-        translated = _translate_text(name_arabic, target_lang="en")
-        if translated:
-            name = translated
-
-    if not name_arabic and name:
-        translated = _translate_text(name, target_lang="ar")
-        if translated:
-            name_arabic = translated
-
-    if not name or not desc:
+    if not (name or name_arabic) or not desc:
         return json_error('Name and description are required.')
 
+    # Until the missing translation arrives the other name stands in for it.
     category = Category(
-        name=name,
-        img=data.get('img'),
+        name=name or name_arabic,
+        img=store_image(data.get('img')),
         desc=desc,
         nameArabic=name_arabic or None,
     )
     db.session.add(category)
+    if not name:
+        category.name = translate_or_queue(category, 'name', name_arabic, 'ar', 'en') or category.name
+    if not name_arabic:
+        category.nameArabic = translate_or_queue(category, 'nameArabic', name, 'en', 'ar') or category.nameArabic
     db.session.commit()
-    invalidate_categories_cache()
+    # Rows that named this category before it existed can now link to it.
+    backfill_category_ids()
     return json_success('Category created successfully.', status=201, id=category.id)
 @app.route('/ControlPanel/categories/edit/<id>/',methods=['POST','GET'])
 @login_required
@@ -1908,16 +1851,6 @@ def categories_edit(id):
     if name_arabic == '' or name_arabic == 'undefined':
         name_arabic = None
 
-    if not name and name_arabic:
-        translated = _translate_text(name_arabic, target_lang="en")
-        if translated:
-            name = translated
-
-    if not name_arabic and name:
-        translated = _translate_text(name, target_lang="ar")
-        if translated:
-            name_arabic = translated
-
     if name:
         category.name = name.strip()
     if desc and desc != 'undefined':
@@ -1925,10 +1858,15 @@ def categories_edit(id):
     if name_arabic:
         category.nameArabic = name_arabic.strip()
     if img and img != 'undefined':
-        category.img = img
+        category.img = store_image(img)
+
+    if not name and name_arabic:
+        category.name = translate_or_queue(category, 'name', name_arabic, 'ar', 'en') or category.name
+    if not name_arabic and name:
+        category.nameArabic = translate_or_queue(category, 'nameArabic', name, 'en', 'ar') or category.nameArabic
 
     db.session.commit()
-    invalidate_categories_cache()
+    backfill_category_ids()
     return json_success('Category updated successfully.')
 @app.route('/ControlPanel/categories/del/<id>/', methods=['DELETE', 'POST', 'GET'])
 @login_required
@@ -1937,11 +1875,75 @@ def categories_del(id):
     if not category:
         return json_error('Category not found.', status=404)
 
+    # Items keep their category string but lose the link.
+    for model in CATEGORISED_MODELS:
+        db.session.query(model).filter(model.category_id == category.id).update(
+            {'category_id': None}, synchronize_session=False
+        )
     db.session.delete(category)
     db.session.commit()
-    invalidate_categories_cache()
     return json_success('Category deleted successfully.')
+####################################################
+def _listing_or_404(listing):
+    spec = ADMIN_LISTINGS.get(listing)
+    if spec is None:
+        abort(404)
+    return spec
+def _no_store(result):
+    response, status = result
+    response.headers['Cache-Control'] = 'no-store'
+    return response, status
+@app.route('/ControlPanel/api/<listing>/')
+@login_required
+def cpanel_api_list(listing):
+    """One page of a cpanel table (see noblepaints.admin_listing)."""
+    spec = _listing_or_404(listing)
+    page, show = _get_admin_pagination()
+    where, priority = (), ()
+    if spec.has_lang:
+        lang = _get_admin_lang()
+        where = (_visible_lang_filter(spec.model.lang, lang),)
+        priority = (_language_sort_case(spec.model.lang, lang),)
+    result = list_page(
+        spec,
+        page=int(page),
+        per_page=request.args.get('per_page', type=int) or int(show),
+        sort=request.args.get('sort'),
+        order=request.args.get('order'),
+        query=request.args.get('q', ''),
+        filters={name: request.args.get(name, '') for name in spec.filters},
+        where=where,
+        priority=priority,
+    )
+    return _no_store(json_success(None, **result))
+@app.route('/ControlPanel/api/<listing>/<int:item_id>/')
+@login_required
+def cpanel_api_item(listing, item_id):
+    item = item_detail(_listing_or_404(listing), item_id)
+    if item is None:
+        return json_error('Item not found.', status=404)
+    return _no_store(json_success(None, item=item))
+@app.route('/ControlPanel/perf/', methods=['GET', 'POST'])
+@login_required
+def cpanel_perf():
+    # Figures are per worker process (see noblepaints.perf).
+    if request.method == 'POST':
+        perf_stats.reset()
+        return redirect(url_for('cpanel_perf'))
+    limit = request.args.get('limit', default=50, type=int)
+    snapshot = perf_stats.snapshot(limit=max(limit, 1))
+    if request.args.get('format') == 'json':
+        return jsonify(snapshot)
+    return render_template(
+        'cpanel_perf.html',
+        endpoints=snapshot['endpoints'],
+        statements=snapshot['statements'],
+        since=datetime.fromtimestamp(snapshot['since']),
+        pid=os.getpid(),
+        enabled=app.config['PERF_ENABLED'],
+    )
 @app.route('/getProducts/')
+@conditional_view(('products',), cache_control='public, no-cache')
 def get_products():
     lang = request.args.get('lang') or getattr(g, 'current_lang', None)
     lang = _normalise_lang(lang)
@@ -1955,17 +1957,38 @@ def get_products():
     schema = ProductSchema(many=True)
     return jsonify(schema.dump(products))
 @app.route('/getsocialIcons/')
+@conditional_view(('social',), cache_control='public, no-cache')
 def getsocialIcons():
-    y = db.session.query(Social).all()
-    x = SocialSchema(many=True)
-    z = x.dump(y)
+    z = query_cache.get_or_set(
+        'social_icons',
+        lambda: SocialSchema(many=True).dump(db.session.query(Social).all()),
+        namespaces=('social',),
+    )
     return jsonify(z)
+@app.route('/i18n/<lang>/<digest>.json')
+def i18n_bundle(lang, digest):
+    bundle = find_bundle(lang, digest)
+    if bundle is None:
+        abort(404)
+    response = app.response_class(bundle.body, mimetype='application/json')
+    # The digest names the contents, so the URL never serves anything else.
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.set_etag(bundle.digest)
+    return response.make_conditional(request)
+def _register_localized_routes():
+    """Mirror every localized public rule under a ``/<lang>/`` prefix."""
+    converter = 'any({})'.format(', '.join(AVAILABLE_LANGUAGES))
+    for rule in list(app.url_map.iter_rules()):
+        if rule.endpoint not in LOCALIZED_ENDPOINTS or 'lang_code' in rule.arguments:
+            continue
+        app.add_url_rule(
+            f'/<{converter}:lang_code>{rule.rule}',
+            endpoint=rule.endpoint,
+            view_func=app.view_functions[rule.endpoint],
+            methods=rule.methods,
+        )
+_register_localized_routes()
 ################################################################
-# Performance: Pre-warm the categories cache on startup
-try:
-    with app.app_context():
-        print("Pre-warming categories cache...")
-        get_cached_categories()
-        print("Categories cache pre-warmed successfully")
-except Exception as e:
-    print(f"Could not pre-warm categories cache: {e}")
+# Performance: `flask bootstrap` pre-warms the shared categories cache
+cache_warmers.append(get_cached_categories)
+cache_warmers.extend(partial(get_facet_index, name) for name in (Catalog.__tablename__, TechnicalDatasheet.__tablename__))
@@ -0,0 +1,212 @@
+"""Full-text product search backed by an SQLite FTS5 index.
+
+Product names and descriptions are folded before they are indexed and before
+queries are matched: Arabic diacritics and tatweel are dropped, the alef,
+ya, ta-marbuta and hamza-carrier variants are unified and HTML from the rich
+text description is stripped.  Results are ranked with ``bm25`` (name matches
+weigh more than description matches).
+
+The index lives in its own ``products_fts`` virtual table keyed by the
+product id and is kept in sync by the control panel product endpoints.  When
+the SQLite build lacks FTS5 the search falls back to ``LIKE`` filtering over
+the columns folded by the same :func:`normalise_text`, registered on every
+SQLite connection as the ``noble_fold`` SQL function.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Hashable, List, Optional, Sequence
+
+from sqlalchemy import and_, column, event, func, literal_column, or_, table, text
+from sqlalchemy.exc import OperationalError
+
+from noblepaints import app, db, query_cache
+from noblepaints.models import Product
+
+FTS_TABLE = "products_fts"
+FOLD_FUNCTION = "noble_fold"
+# bm25 column weights: (name, description).
+NAME_WEIGHT = 10.0
+DESC_WEIGHT = 1.0
+MAX_RESULTS = 1000
+
+_ARABIC_DIACRITICS = re.compile("[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]")
+_ARABIC_FOLDING = str.maketrans({
+    "آ": "ا",  # alef with madda
+    "أ": "ا",  # alef with hamza above
+    "إ": "ا",  # alef with hamza below
+    "ٱ": "ا",  # alef wasla
+    "ى": "ي",  # alef maksura -> ya
+    "ئ": "ي",  # ya with hamza
+    "ؤ": "و",  # waw with hamza
+    "ة": "ه",  # ta marbuta -> ha
+})
+_HTML_TAG = re.compile(r"<[^>]+>")
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+_fts_table = table(FTS_TABLE, column("rowid"))
+_fts_match_column = literal_column(FTS_TABLE)
+_fts_available: Optional[bool] = None
+
+
+def normalise_text(value: Optional[str]) -> str:
+    """Fold *value* into the form stored in (and matched against) the index."""
+    if not value:
+        return ""
+    value = _HTML_TAG.sub(" ", value)
+    value = unicodedata.normalize("NFKC", value)
+    value = _ARABIC_DIACRITICS.sub("", value)
+    value = value.translate(_ARABIC_FOLDING)
+    return " ".join(value.casefold().split())
+
+
+def install_text_folding(engine) -> None:
+    """Make :func:`normalise_text` callable as ``noble_fold()`` on *engine*."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _register_folding(dbapi_connection, connection_record):
+        dbapi_connection.create_function(FOLD_FUNCTION, 1, normalise_text, deterministic=True)
+
+
+def _folded(value):
+    # Other databases have no noble_fold(); they only get case folding.
+    if db.engine.dialect.name == "sqlite":
+        return getattr(func, FOLD_FUNCTION)(value)
+    return func.lower(value)
+
+
+def build_match_expression(term: str) -> Optional[str]:
+    """Turn free text into an FTS5 query matching every word as a prefix."""
+    tokens = _TOKEN.findall(normalise_text(term))
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def fts_available() -> bool:
+    """Return ``True`` when the ``products_fts`` table can be used."""
+    global _fts_available
+    if _fts_available is None:
+        try:
+            db.session.execute(text(f"SELECT rowid FROM {FTS_TABLE} LIMIT 0"))
+            _fts_available = True
+        except OperationalError:
+            db.session.rollback()
+            _fts_available = False
+    return _fts_available
+
+
+def ensure_search_index() -> bool:
+    """Create the FTS5 table (and fill it) if it does not exist yet."""
+    global _fts_available
+    exists = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    ).first()
+    if exists:
+        _fts_available = True
+        return True
+    try:
+        db.session.execute(text(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            "name, description, tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+        db.session.commit()
+    except OperationalError as exc:
+        db.session.rollback()
+        app.logger.warning("FTS5 is unavailable, product search falls back to LIKE: %s", exc)
+        _fts_available = False
+        return False
+    _fts_available = True
+    rebuild_search_index()
+    return True
+
+
+def index_product(product) -> None:
+    """Insert or refresh *product* in the index within the current transaction."""
+    if not fts_available() or product.id is None:
+        return
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": product.id})
+    db.session.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (:id, :name, :desc)"),
+        {"id": product.id, "name": normalise_text(product.name), "desc": normalise_text(product.desc)},
+    )
+
+
+def remove_product(product_id: int) -> None:
+    if not fts_available():
+        return
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": product_id})
+
+
+def rebuild_search_index(batch_size: int = 500) -> int:
+    """Re-index every product, streaming them in primary-key batches."""
+    if not fts_available():
+        return 0
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    indexed = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.session.query(Product.id, Product.name, Product.desc)
+            .filter(Product.id > last_id)
+            .order_by(Product.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        db.session.execute(
+            text(f"INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (:id, :name, :desc)"),
+            [{"id": row.id, "name": normalise_text(row.name), "desc": normalise_text(row.desc)} for row in rows],
+        )
+        indexed += len(rows)
+        last_id = rows[-1].id
+    db.session.commit()
+    query_cache.bump("products")
+    return indexed
+
+
+def search_product_ids(base_query, term: str, cache_key: Sequence[Hashable] = (), leading_order: Sequence = ()) -> List[int]:
+    """Return product ids matching *term*, best matches first.
+
+    *base_query* must select ``Product.id`` with any non-text filters already
+    applied; *cache_key* identifies those filters (language, category,
+    country) so repeated searches are served from the shared query cache.
+    *leading_order* clauses are applied before the relevance ranking.
+    """
+    return query_cache.get_or_set(
+        ("product_search", normalise_text(term), *cache_key),
+        lambda: _ranked_ids(base_query, term, leading_order),
+        namespaces=("products",),
+    )
+
+
+def _ranked_ids(base_query, term: str, leading_order: Sequence) -> List[int]:
+    expression = build_match_expression(term)
+    if expression is None:
+        return []
+    if fts_available():
+        query = (
+            base_query
+            .join(_fts_table, _fts_table.c.rowid == Product.id)
+            .filter(_fts_match_column.op("MATCH")(expression))
+            .order_by(*leading_order, func.bm25(_fts_match_column, NAME_WEIGHT, DESC_WEIGHT), Product.id.desc())
+        )
+    else:
+        # Like the MATCH expression: every folded word, in the name or the
+        # description.
+        name, description = _folded(Product.name), _folded(Product.desc)
+        query = (
+            base_query
+            .filter(and_(*(
+                or_(name.like(f"%{token}%"), description.like(f"%{token}%"))
+                for token in _TOKEN.findall(normalise_text(term))
+            )))
+            .order_by(*leading_order, Product.id.desc())
+        )
+    return [row[0] for row in query.limit(MAX_RESULTS)]
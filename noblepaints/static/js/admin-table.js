@@ -0,0 +1,344 @@
+/*
+ * Control panel tables rendered from the JSON listings (/ControlPanel/api/<listing>/).
+ *
+ *     <table data-admin-table="/ControlPanel/api/news/" data-page="1" data-per-page="10">
+ *         <thead><tr>
+ *             <th data-type="index">#</th>
+ *             <th data-field="title" data-sort="title">...</th>
+ *             <th data-field="thumb" data-type="thumb">...</th>
+ *         </tr></thead>
+ *         <tbody></tbody>
+ *     </table>
+ *     <ul class="pagination" data-admin-pager></ul>
+ *     <div data-admin-summary></div>
+ *
+ * `data-type` picks how a column renders: text (default), index, thumb,
+ * download (an upload id), link, icon or category.  The search box
+ * (#searchInTable) and the page size menu (#entriesNumber) refine the query,
+ * which is mirrored in the address bar so a reload after saving returns to
+ * the same page.  Each row gets the edit/delete menu; the shared edit modal
+ * (#editProjectForm) receives the row id in its `idNum` attribute and is
+ * filled from /ControlPanel/api/<listing>/<id>/ when it opens.
+ */
+(function (window, document) {
+    'use strict';
+
+    const STRINGS = {
+        previous: 'السابق',
+        next: 'التالي',
+        edit: 'تعديل',
+        remove: 'حذف',
+        link: 'الرابط',
+        none: 'لا يوجد',
+        loading: 'جار التحميل…',
+        empty: 'لا توجد بيانات',
+        error: 'تعذر تحميل البيانات.',
+        summary: 'يتم عرض <b>{from}–{to}</b> من <b>{total}</b>',
+    };
+    const PAGER_WINDOW = 2;
+    const SEARCH_DELAY = 300;
+
+    const text = (value) => document.createTextNode(value == null ? '' : String(value));
+
+    function element(tag, className, children) {
+        const node = document.createElement(tag);
+        if (className) {
+            node.className = className;
+        }
+        (children || []).forEach((child) => node.append(child));
+        return node;
+    }
+
+    function anchor(href, label, blank) {
+        const link = element('a', null, [label]);
+        link.href = href;
+        if (blank) {
+            link.target = '_blank';
+            link.rel = 'noopener';
+        }
+        return link;
+    }
+
+    const RENDERERS = {
+        text: (item, field) => element('span', 'fw-normal', [text(item[field])]),
+        index: (item, field, index) => element('span', 'fw-bold', [text(index)]),
+        category: (item) => element('span', 'fw-normal', [text(item.category_label || item.category)]),
+        thumb: (item, field) => {
+            if (!item[field]) {
+                return element('span', 'text-muted', [text('—')]);
+            }
+            const image = element('img');
+            image.src = item[field];
+            image.width = 80;
+            image.loading = 'lazy';
+            image.alt = '';
+            return image;
+        },
+        download: (item, field, index, header) => {
+            if (!item[field]) {
+                return element('span', 'text-muted', [text(header.dataset.empty || STRINGS.none)]);
+            }
+            return element('span', 'fw-normal', [anchor('/download/' + encodeURIComponent(item[field]), header.dataset.label || STRINGS.link, true)]);
+        },
+        link: (item, field, index, header) => {
+            if (!item[field]) {
+                return element('span', 'text-muted', [text(header.dataset.empty || STRINGS.none)]);
+            }
+            return element('span', 'fw-normal', [anchor(item[field], header.dataset.label || STRINGS.link, true)]);
+        },
+        icon: (item, field) => {
+            const icon = element('i', 'fa fa-' + item[field]);
+            icon.style.fontSize = '20px';
+            return element('span', 'fw-normal', [icon]);
+        },
+    };
+
+    function actionsCell(modalId) {
+        const toggle = element('button', 'btn btn-link text-dark dropdown-toggle dropdown-toggle-split m-0 p-0', [
+            element('span', 'icon icon-sm', [element('span', 'fas fa-ellipsis-h icon-dark')]),
+            element('span', 'visually-hidden', [text('Toggle Dropdown')]),
+        ]);
+        toggle.type = 'button';
+        toggle.setAttribute('data-bs-toggle', 'dropdown');
+        toggle.setAttribute('aria-expanded', 'false');
+
+        const edit = element('button', 'dropdown-item', [element('span', 'fas fa-edit me-2'), text(STRINGS.edit)]);
+        edit.type = 'button';
+        edit.setAttribute('data-bs-toggle', 'modal');
+        edit.setAttribute('data-bs-target', '#' + modalId);
+        const remove = element('a', 'dropdown-item text-danger rounded-bottom delete', [element('span', 'fas fa-trash-alt me-2'), text(STRINGS.remove)]);
+        remove.href = '#';
+
+        return element('td', null, [element('div', 'btn-group', [toggle, element('div', 'dropdown-menu py-0', [edit, remove])])]);
+    }
+
+    function AdminTable(table) {
+        const params = new URLSearchParams(window.location.search);
+        this.table = table;
+        this.endpoint = table.dataset.adminTable;
+        this.modalId = table.dataset.editModal || 'editProjectForm';
+        this.headers = Array.from(table.querySelectorAll('thead th'));
+        this.body = table.tBodies[0] || table.appendChild(document.createElement('tbody'));
+        this.pager = document.querySelector('[data-admin-pager]');
+        this.summary = document.querySelector('[data-admin-summary]');
+        this.search = document.getElementById('searchInTable');
+        this.state = {
+            page: parseInt(params.get('page') || table.dataset.page, 10) || 1,
+            perPage: parseInt(params.get('show') || table.dataset.perPage, 10) || 10,
+            sort: params.get('sort') || '',
+            order: params.get('order') || '',
+            q: params.get('q') || '',
+        };
+        this.request = 0;
+        if (this.search) {
+            this.search.value = this.state.q;
+        }
+        this._bind();
+        this.load();
+    }
+
+    AdminTable.prototype._bind = function () {
+        this.headers.forEach((header) => {
+            if (!header.dataset.sort) {
+                return;
+            }
+            header.style.cursor = 'pointer';
+            header.addEventListener('click', () => {
+                const sort = header.dataset.sort;
+                const ascending = this.state.sort === sort && this.state.order === 'asc';
+                this.state.sort = sort;
+                this.state.order = ascending ? 'desc' : 'asc';
+                this.state.page = 1;
+                this.load();
+            });
+        });
+
+        if (this.search) {
+            this.search.removeAttribute('onkeyup');
+            let timer = null;
+            this.search.addEventListener('input', () => {
+                window.clearTimeout(timer);
+                timer = window.setTimeout(() => {
+                    this.state.q = this.search.value.trim();
+                    this.state.page = 1;
+                    this.load();
+                }, SEARCH_DELAY);
+            });
+        }
+
+        const entries = document.getElementById('entriesNumber');
+        if (entries) {
+            entries.querySelectorAll('a').forEach((link) => {
+                link.addEventListener('click', (event) => {
+                    event.preventDefault();
+                    this.state.perPage = parseInt(link.textContent, 10) || this.state.perPage;
+                    this.state.page = 1;
+                    this.load();
+                });
+            });
+        }
+
+        if (this.pager) {
+            this.pager.addEventListener('click', (event) => {
+                const link = event.target.closest('[data-page]');
+                if (!link) {
+                    return;
+                }
+                event.preventDefault();
+                if (!link.closest('.disabled') && !link.closest('.active')) {
+                    this.state.page = parseInt(link.dataset.page, 10);
+                    this.load();
+                }
+            });
+        }
+
+        const modal = document.getElementById(this.modalId);
+        if (modal) {
+            modal.addEventListener('show.bs.modal', (event) => this._openEditor(modal, event.relatedTarget));
+        }
+    };
+
+    AdminTable.prototype.query = function () {
+        const params = new URLSearchParams({ page: this.state.page, show: this.state.perPage });
+        ['sort', 'order', 'q'].forEach((name) => {
+            if (this.state[name]) {
+                params.set(name, this.state[name]);
+            }
+        });
+        params.set('lang', window.AdminApi.resolveAdminLang());
+        return params;
+    };
+
+    AdminTable.prototype.load = function () {
+        const request = ++this.request;
+        const params = this.query();
+        window.history.replaceState(null, '', window.location.pathname + '?' + params);
+        if (!this.body.rows.length) {
+            this._message(STRINGS.loading);
+        }
+        return window.AdminApi.request(this.endpoint + '?' + params, { showLoader: false })
+            .then((data) => {
+                if (request === this.request) {
+                    this.render(data);
+                }
+            })
+            .catch((error) => {
+                if (request === this.request) {
+                    this._message(STRINGS.error);
+                }
+                console.error(error);
+            });
+    };
+
+    AdminTable.prototype._message = function (message) {
+        const cell = element('td', 'text-center text-muted', [text(message)]);
+        cell.colSpan = this.headers.length + 1;
+        this.body.replaceChildren(element('tr', null, [cell]));
+    };
+
+    AdminTable.prototype.render = function (data) {
+        this.state.page = data.page;
+        this.state.perPage = data.per_page;
+        this.headers.forEach((header) => {
+            const active = header.dataset.sort && header.dataset.sort === data.sort;
+            header.setAttribute('aria-sort', active ? (data.order === 'asc' ? 'ascending' : 'descending') : 'none');
+            header.dataset.sortIndicator = active ? (data.order === 'asc' ? '▲' : '▼') : '';
+        });
+
+        const offset = (data.page - 1) * data.per_page;
+        if (!data.items.length) {
+            this._message(STRINGS.empty);
+        } else {
+            this.body.replaceChildren(...data.items.map((item, position) => {
+                const row = element('tr');
+                row.setAttribute('id-num', item.id);
+                this.headers.forEach((header) => {
+                    const render = RENDERERS[header.dataset.type || 'text'] || RENDERERS.text;
+                    row.appendChild(element('td', null, [render(item, header.dataset.field, offset + position + 1, header)]));
+                });
+                row.appendChild(actionsCell(this.modalId));
+                return row;
+            }));
+        }
+        this._renderPager(data);
+        if (this.summary) {
+            this.summary.innerHTML = STRINGS.summary
+                .replace('{from}', data.total ? offset + 1 : 0)
+                .replace('{to}', offset + data.items.length)
+                .replace('{total}', data.total);
+        }
+    };
+
+    AdminTable.prototype._renderPager = function (data) {
+        if (!this.pager) {
+            return;
+        }
+        const item = (label, page, state) => {
+            const link = element('a', 'page-link', [text(label)]);
+            link.href = '#';
+            link.dataset.page = page;
+            return element('li', 'page-item' + (state ? ' ' + state : ''), [link]);
+        };
+        const items = [item(STRINGS.previous, data.page - 1, data.page <= 1 ? 'disabled' : '')];
+        const first = Math.max(data.page - PAGER_WINDOW, 1);
+        const last = Math.min(data.page + PAGER_WINDOW, data.pages);
+        if (first > 1) {
+            items.push(item('1', 1));
+            if (first > 2) {
+                items.push(item('…', first - 1, 'disabled'));
+            }
+        }
+        for (let page = first; page <= last; page++) {
+            items.push(item(String(page), page, page === data.page ? 'active' : ''));
+        }
+        if (last < data.pages) {
+            if (last < data.pages - 1) {
+                items.push(item('…', last + 1, 'disabled'));
+            }
+            items.push(item(String(data.pages), data.pages));
+        }
+        items.push(item(STRINGS.next, data.page + 1, data.page >= data.pages ? 'disabled' : ''));
+        this.pager.replaceChildren(...items);
+    };
+
+    AdminTable.prototype._openEditor = function (modal, trigger) {
+        const row = trigger && trigger.closest('tr[id-num]');
+        if (!row) {
+            return;
+        }
+        const id = row.getAttribute('id-num');
+        const save = modal.querySelector('.editBtn');
+        modal.setAttribute('idNum', id);
+        modal.querySelectorAll('input, textarea, select').forEach((field) => {
+            field.value = '';
+            field.removeAttribute('image');
+        });
+        if (save) {
+            save.disabled = true;
+        }
+        window.AdminApi.request(this.endpoint + encodeURIComponent(id) + '/', { showLoader: false })
+            .then((data) => {
+                if (modal.getAttribute('idNum') !== id) {
+                    return;
+                }
+                Object.entries(data.item).forEach(([name, value]) => {
+                    const field = modal.querySelector('#edit' + name.toLowerCase());
+                    if (field && field.type !== 'file') {
+                        field.value = value == null ? '' : value;
+                    }
+                });
+                if (save) {
+                    save.disabled = false;
+                }
+            })
+            .catch((error) => window.AdminApi.notifyError(error.message));
+    };
+
+    document.addEventListener('DOMContentLoaded', () => {
+        document.querySelectorAll('table[data-admin-table]').forEach((table) => {
+            table.adminTable = new AdminTable(table);
+        });
+    });
+
+    window.AdminTable = AdminTable;
+})(window, document);
@@ -1,91 +0,0 @@
-let langs = {
-    'en':[
-        'Noble Paints | Colors',
-        'Home',
-        'Colors',
-        'Colors',
-        'Colors',
-        'Paint colours may vary when viewing on your screen from the actual colours',
-        'RED',
-        'GREEN',
-        'ORANGE',
-        'YELLOW',
-        'GREY',
-        'BLUE',
-        `TURQUOISE`,
-        `PINK`,
-        `PURPLE`,
-        'VIOLET',
-        'BROWN',
-        'WHITE',
-        'RED',
-        'GREEN',
-        'ORANGE',
-        'YELLOW',
-        'GREY',
-        'BLUE',
-        `TURQUOISE`,
-        `PINK`,
-        `PURPLE`,
-        'VIOLET',
-        'BROWN',
-        'WHITE',
-        'RED',
-        'GREEN',
-        'ORANGE',
-        'YELLOW',
-        'GREY',
-        'BLUE',
-        `TURQUOISE`,
-        `PINK`,
-        `PURPLE`,
-        'VIOLET',
-        'BROWN',
-        'WHITE',
-    ]
-    ,
-    'ar':[
-        'نوبل بينتس | الألوان',
-        'الرئيسية',
-        'الألوان',
-        'الألوان',
-        'الألوان',
-        'قد تختلف ألوان الطلاء عند المشاهدة على شاشتك عن الألوان الفعلية',
-        'الأحمر',
-        'الأخضر',
-        'البرتقالي',
-        'الأصفر',
-        'الرمادي',
-        'الأزرق',
-        `تركواز`,
-        `قرنفلي`,
-        `أرجواني`,
-        'البنفسجي',
-        `البني`,
-        `الأبيض`,
-        'الأحمر',
-        'الأخضر',
-        'البرتقالي',
-        'الأصفر',
-        'الرمادي',
-        'الأزرق',
-        `تركواز`,
-        `قرنفلي`,
-        `أرجواني`,
-        'البنفسجي',
-        `البني`,
-        `الأبيض`,
-        'الأحمر',
-        'الأخضر',
-        'البرتقالي',
-        'الأصفر',
-        'الرمادي',
-        'الأزرق',
-        `تركواز`,
-        `قرنفلي`,
-        `أرجواني`,
-        'البنفسجي',
-        `البني`,
-        `الأبيض`,
-    ]
-}
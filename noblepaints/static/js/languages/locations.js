@@ -1,51 +0,0 @@
-let langs = {
-    'en':[
-        'Noble Paints | Find A store',
-        'Home',
-        'Find A store',
-        'Find A store',
-        'Find A store',
-        'List',
-        'Map',
-        'Select a country ',
-        'Select a city',
-        'Select type',
-        'Select a country ',
-        'Select a city',
-        'Select type',
-        'Saudi Arabia',
-        'Noble Paints Company Ltd.',
-        'Kingdom of Saudi Arabia Riyadh 14311 - P.O.Box: 8327',
-        'Select a country ',
-        'Select a city',
-        'Select type',
-        'Saudi Arabia',
-        'Kingdom of Saudi Arabia Riyadh 14311 - P.O.Box: 8327',
-        'Map it',
-    ]
-    ,
-    'ar':[
-        'نوبل بينتس | فروعنا',
-        'الرئيسية',
-        'فروعنا',
-        'فروعنا',
-        'فروعنا',
-        'قائمة الفروع',
-        'الخريطة',
-        'اختر دولة',
-        'اختر مدينة',
-        'اختر نوع',
-        'اختر دولة',
-        'اختر مدينة',
-        'اختر نوع',
-        'المملكة العربية السعودية',
-        'شركة نوبل بينتس المحدودة',
-        'المملكة العربية السعودية الرياض 14311 - ص.ب: 8327',
-        'اختر دولة',
-        'اختر مدينة',
-        'اختر نوع',
-        'المملكة العربية السعودية',
-        'المملكة العربية السعودية الرياض 14311 - ص.ب: 8327',
-        'اللوكيشن',
-    ]
-}
@@ -1,5 +1,4 @@
 (() => {
-    const TRANSLATIONS = window.BASE_TRANSLATIONS || {};
     const PAGE_TRANSLATIONS = window.PAGE_TRANSLATIONS || {};
 
     const getStoredLanguage = () => {
@@ -17,22 +16,31 @@
     const STORED_LANG = getStoredLanguage();
     const ACTIVE_LANG = window.APP_LANG || STORED_LANG || "en";
 
-    const mergeTranslations = () => {
-        const merged = {};
-        const langs = new Set([
-            ...Object.keys(TRANSLATIONS),
-            ...Object.keys(PAGE_TRANSLATIONS),
-        ]);
-        langs.forEach((lang) => {
-            merged[lang] = {
-                ...(TRANSLATIONS[lang] || {}),
-                ...(PAGE_TRANSLATIONS[lang] || {}),
+    // Filled from the page's /i18n/<lang>/<digest>.json bundles (see
+    // noblepaints.i18n); window.BASE_TRANSLATIONS is still honoured.
+    const ALL_TRANSLATIONS = {};
+
+    const mergeTranslations = (source) => {
+        Object.keys(source || {}).forEach((lang) => {
+            ALL_TRANSLATIONS[lang] = {
+                ...(ALL_TRANSLATIONS[lang] || {}),
+                ...source[lang],
             };
         });
-        return merged;
     };
 
-    const ALL_TRANSLATIONS = mergeTranslations();
+    const loadTranslations = () => {
+        const bundles = (window.I18N_BUNDLES || []).map((url) =>
+            fetch(url, { credentials: "same-origin" })
+                .then((response) => (response.ok ? response.json() : {}))
+                .catch(() => ({}))
+        );
+        return Promise.all(bundles).then((loaded) => {
+            mergeTranslations(window.BASE_TRANSLATIONS);
+            loaded.forEach(mergeTranslations);
+            mergeTranslations(PAGE_TRANSLATIONS);
+        });
+    };
 
     const replaceTokens = (value) => {
         if (typeof value !== "string") {
@@ -63,6 +71,10 @@
                 }
                 const attr = element.getAttribute("data-i18n-attr");
                 const value = t(key);
+                if (value === key) {
+                    // Not in the loaded bundles: keep the server-rendered text.
+                    return;
+                }
                 if (attr) {
                     element.setAttribute(attr, value);
                 } else {
@@ -73,7 +85,7 @@
         const pageTitle = document.querySelector("[data-i18n-document]");
         if (pageTitle) {
             const key = pageTitle.getAttribute("data-i18n-document");
-            if (key) {
+            if (key && t(key) !== key) {
                 document.title = t(key);
             }
         }
@@ -106,6 +118,11 @@
                 if (!lang || lang === ACTIVE_LANG) {
                     return;
                 }
+                const href = trigger.getAttribute("href");
+                if (href && href !== "#") {
+                    window.location.href = href;
+                    return;
+                }
                 const url = new URL(window.location.href);
                 url.searchParams.set("lang", lang);
                 window.location.href = url.toString();
@@ -223,11 +240,11 @@
 
     document.addEventListener("DOMContentLoaded", () => {
         updateDirection();
-        applyTranslations();
         rememberLanguage();
         setupLanguageSwitchers();
         markActiveNavigation();
         socialIcons();
+        loadTranslations().then(applyTranslations);
     });
 
     window.addEventListener("pageshow", () => {
@@ -1,21 +1,213 @@
+/*
+ * Store locator: the stores and filter options come from /api/stores/.
+ *
+ * The List tab renders the results through VirtualList and loads further
+ * pages as it scrolls; the Map tab shows the selected store.
+ */
+(function () {
+    'use strict';
 
+    const root = document.getElementById('storeLocator');
+    if (!root) {
+        return;
+    }
 
-document.querySelector('.garagenav').querySelectorAll('li').forEach((e,i)=>{
-    e.addEventListener('click',function(){
-        if(e.querySelector('.nav-link').classList.contains('active')){
-            e.querySelector('.nav-link').classList.remove('active')
+    const PAGE_SIZE = 50;
+    const ROW_HEIGHT = 190;
+    const lang = document.documentElement.lang === 'ar' ? 'ar' : 'en';
+    const strings = root.dataset;
+    const form = document.getElementById('storeFilters');
+    const selects = {
+        country: document.getElementById('storeCountry'),
+        city: document.getElementById('storeCity'),
+        type: document.getElementById('storeType'),
+    };
+    const search = document.getElementById('storeSearch');
+    const count = document.getElementById('storeCount');
+    const mapFrame = root.querySelector('.store-map');
+    const panes = { List: document.getElementById('List'), Map: document.getElementById('Map') };
+    const state = { page: 0, pages: 0, loading: false, request: 0, shown: null };
+
+    const label = (value) => (value && (value[lang] || value.en)) || '';
+
+    function fetchJSON(url) {
+        return fetch(url, { headers: { Accept: 'application/json' } }).then((response) => {
+            if (!response.ok) {
+                throw new Error(response.status + ' ' + url);
+            }
+            return response.json();
+        });
+    }
+
+    function place(store) {
+        if (store.lat != null && store.lng != null) {
+            return store.lat + ',' + store.lng;
+        }
+        return [label(store.name), label(store.address)].filter(Boolean).join(', ');
+    }
+
+    function showOnMap(store) {
+        if (!store || state.shown === store.id) {
+            return;
+        }
+        state.shown = store.id;
+        mapFrame.src = store.map_embed
+            || 'https://www.google.com/maps?' + new URLSearchParams({ q: place(store), hl: lang, output: 'embed' });
+    }
+
+    function link(href, text, icon) {
+        const anchor = document.createElement('a');
+        anchor.href = href;
+        if (icon) {
+            const i = document.createElement('i');
+            i.className = 'fa ' + icon;
+            anchor.appendChild(i);
+        }
+        anchor.appendChild(document.createTextNode(text));
+        return anchor;
+    }
+
+    function renderStore(store) {
+        const card = document.createElement('div');
+        card.className = 'results-wrap';
+        const name = document.createElement('h4');
+        name.textContent = label(store.name);
+        card.appendChild(name);
+        if (store.address) {
+            const address = document.createElement('p');
+            address.textContent = label(store.address);
+            card.appendChild(address);
+        }
+        if (store.phone) {
+            const phone = document.createElement('p');
+            const anchor = link('https://wa.me/' + store.phone.replace(/\D/g, ''), store.phone, 'fa-phone-square');
+            anchor.dir = 'ltr';
+            phone.appendChild(anchor);
+            card.appendChild(phone);
         }
-        else{
-            document.querySelector('.garagenav').querySelectorAll('li').forEach(e=>{e.querySelector('.nav-link').classList.remove('active')})
-            e.querySelector('.nav-link').classList.add('active')
+        if (store.email) {
+            const email = document.createElement('p');
+            email.appendChild(link('mailto:' + store.email, store.email, 'fa-envelope'));
+            card.appendChild(email);
         }
-        if(i==0){
-            document.querySelector('.garage-section').classList.remove('hidden')
-            document.querySelector('#prd2').classList.add('hidden')
+        const actions = document.createElement('p');
+        const directions = link(
+            'https://www.google.com/maps/dir/?' + new URLSearchParams({ api: 1, destination: place(store) }),
+            strings.directions
+        );
+        directions.target = '_blank';
+        directions.rel = 'noopener';
+        const onMap = link('#Map', strings.showOnMap);
+        onMap.className = 'store-show-on-map';
+        onMap.addEventListener('click', (event) => {
+            event.preventDefault();
+            showOnMap(store);
+            showTab('Map');
+        });
+        actions.append(directions, ' · ', onMap);
+        card.appendChild(actions);
+        return card;
+    }
+
+    const list = new VirtualList(document.getElementById('storeList'), {
+        rowHeight: ROW_HEIGHT,
+        renderItem: renderStore,
+        onNearEnd: () => load(false),
+    });
+
+    function fillSelect(select, options, value) {
+        const all = new Option(strings.all, '');
+        select.replaceChildren(all, ...options.map((option) => new Option(label(option.name), option.id)));
+        select.value = value == null ? '' : String(value);
+        select.closest('.filed-wrap').hidden = options.length === 0;
+    }
+
+    function query(page) {
+        const params = new URLSearchParams({ page: page, per_page: PAGE_SIZE });
+        Object.entries(selects).forEach(([name, select]) => {
+            if (select.value) {
+                params.set(name, select.value);
+            }
+        });
+        if (search.value.trim()) {
+            params.set('q', search.value.trim());
+        }
+        return params;
+    }
+
+    function load(reset) {
+        if ((state.loading && !reset) || (!reset && state.page >= state.pages)) {
+            return;
         }
-        if(i==1){
-            document.querySelector('.garage-section').classList.add('hidden')
-            document.querySelector('#prd2').classList.remove('hidden')
+        const request = ++state.request;
+        state.loading = true;
+        if (reset) {
+            count.textContent = strings.loading;
         }
-    })
-})
\ No newline at end of file
+        fetchJSON(strings.api + '?' + query(reset ? 1 : state.page + 1))
+            .then((data) => {
+                if (request !== state.request) {
+                    return;
+                }
+                state.page = data.page;
+                state.pages = data.pages;
+                state.loading = false;
+                if (reset) {
+                    fillSelect(selects.country, data.options.countries, data.filters.country);
+                    fillSelect(selects.city, data.options.cities, data.filters.city);
+                    fillSelect(selects.type, data.options.types, data.filters.type);
+                    list.setItems(data.items, data.total);
+                    showOnMap(data.items[0]);
+                } else {
+                    list.appendItems(data.items);
+                }
+                count.textContent = data.total ? strings.count.replace('{count}', data.total) : strings.empty;
+            })
+            .catch((error) => {
+                if (request === state.request) {
+                    state.loading = false;
+                    count.textContent = strings.error;
+                }
+                console.error(error);
+            });
+    }
+
+    function showTab(name) {
+        document.querySelectorAll('.garagenav .nav-link').forEach((tab) => {
+            const active = tab.getAttribute('href') === '#' + name;
+            tab.classList.toggle('active', active);
+            tab.setAttribute('aria-selected', active ? 'true' : 'false');
+        });
+        Object.entries(panes).forEach(([key, pane]) => {
+            pane.hidden = key !== name;
+        });
+        if (name === 'List') {
+            list.refresh(true);
+        }
+    }
+
+    document.querySelectorAll('.garagenav .nav-link').forEach((tab) => {
+        tab.addEventListener('click', (event) => {
+            event.preventDefault();
+            showTab(tab.getAttribute('href').slice(1));
+        });
+    });
+
+    selects.country.addEventListener('change', () => {
+        selects.city.value = '';
+        load(true);
+    });
+    selects.city.addEventListener('change', () => load(true));
+    selects.type.addEventListener('change', () => load(true));
+    let searchTimer = null;
+    search.addEventListener('input', () => {
+        window.clearTimeout(searchTimer);
+        searchTimer = window.setTimeout(() => load(true), 250);
+    });
+    form.addEventListener('submit', (event) => {
+        event.preventDefault();
+        load(true);
+    });
+
+    load(true);
+})();
@@ -0,0 +1,121 @@
+/*
+ * Windowed rendering for long lists and grids.
+ *
+ * Only the rows around the viewport exist in the DOM; a spacer keeps the
+ * scroll height of the full list.  The list scrolls with the page, so the
+ * visible range is worked out from the container's position in the window.
+ *
+ *     const list = new VirtualList(container, {
+ *         columns: 3,
+ *         rowHeight: (container) => container.clientWidth / 3,
+ *         renderItem: (item) => element,
+ *         onNearEnd: () => loadNextPage(),
+ *     });
+ *     list.setItems(firstPage, total);
+ *     list.appendItems(nextPage);
+ */
+(function (window, document) {
+    'use strict';
+
+    function VirtualList(container, options) {
+        this.container = container;
+        this.columns = options.columns || 1;
+        this.rowHeight = options.rowHeight;
+        this.renderItem = options.renderItem;
+        this.onNearEnd = options.onNearEnd || null;
+        this.overscan = options.overscan || 3;
+        this.items = [];
+        this.total = 0;
+        this._range = '';
+        this._frame = null;
+
+        this.spacer = document.createElement('div');
+        this.spacer.className = 'virtual-list';
+        this.spacer.style.position = 'relative';
+        this.viewport = document.createElement('div');
+        this.viewport.className = 'virtual-list__rows';
+        this.viewport.style.position = 'absolute';
+        this.viewport.style.top = '0';
+        this.viewport.style.left = '0';
+        this.viewport.style.right = '0';
+        this.viewport.style.display = 'flex';
+        this.viewport.style.flexWrap = 'wrap';
+        this.spacer.appendChild(this.viewport);
+        container.replaceChildren(this.spacer);
+
+        this._schedule = this._schedule.bind(this);
+        window.addEventListener('scroll', this._schedule, { passive: true });
+        window.addEventListener('resize', this._schedule);
+    }
+
+    VirtualList.prototype.setItems = function (items, total) {
+        this.items = items.slice();
+        this.total = typeof total === 'number' ? total : items.length;
+        this.refresh(true);
+    };
+
+    VirtualList.prototype.appendItems = function (items) {
+        this.items = this.items.concat(items);
+        this.refresh(true);
+    };
+
+    VirtualList.prototype._height = function () {
+        const height = typeof this.rowHeight === 'function' ? this.rowHeight(this.container) : this.rowHeight;
+        return Math.max(height || 0, 1);
+    };
+
+    VirtualList.prototype._schedule = function () {
+        if (this._frame === null) {
+            this._frame = window.requestAnimationFrame(() => {
+                this._frame = null;
+                this.refresh(false);
+            });
+        }
+    };
+
+    VirtualList.prototype.refresh = function (force) {
+        const rowHeight = this._height();
+        const rows = Math.ceil(this.items.length / this.columns);
+        this.spacer.style.height = rows * rowHeight + 'px';
+        if (!this.container.offsetParent) {
+            // Hidden (display: none): nothing to measure until it is shown.
+            this._range = '';
+            return;
+        }
+
+        const top = this.container.getBoundingClientRect().top;
+        const first = Math.max(Math.floor(-top / rowHeight) - this.overscan, 0);
+        const last = Math.max(Math.min(Math.ceil((window.innerHeight - top) / rowHeight) + this.overscan, rows), first);
+        const range = first + ':' + last + ':' + rowHeight;
+        if (force || range !== this._range) {
+            this._range = range;
+            const fragment = document.createDocumentFragment();
+            const end = Math.min(last * this.columns, this.items.length);
+            for (let index = first * this.columns; index < end; index++) {
+                const cell = document.createElement('div');
+                cell.className = 'virtual-list__cell';
+                cell.style.width = 100 / this.columns + '%';
+                cell.style.height = rowHeight + 'px';
+                cell.appendChild(this.renderItem(this.items[index], index));
+                fragment.appendChild(cell);
+            }
+            this.viewport.style.transform = 'translateY(' + first * rowHeight + 'px)';
+            this.viewport.replaceChildren(fragment);
+        }
+
+        if (this.onNearEnd && this.items.length < this.total && last >= rows - this.overscan) {
+            this.onNearEnd();
+        }
+    };
+
+    VirtualList.prototype.destroy = function () {
+        window.removeEventListener('scroll', this._schedule);
+        window.removeEventListener('resize', this._schedule);
+        if (this._frame !== null) {
+            window.cancelAnimationFrame(this._frame);
+        }
+        this.container.replaceChildren();
+    };
+
+    window.VirtualList = VirtualList;
+})(window, document);
@@ -0,0 +1,409 @@
+"""Conditional, range-aware streaming of large binary payloads.
+
+Catalog PDFs live in the ``upload`` table and promotional videos on disk.  Both
+used to be read completely into memory before being sent and neither honoured
+``Range`` requests, so browsers could not resume downloads or seek through a
+video without starting over.  The helpers below build responses from a
+seekable file-like object without ever materialising the whole payload:
+
+* ``If-None-Match``/``If-Modified-Since`` are answered with ``304``;
+* single ``Range`` requests produce a ``206`` with ``Content-Range``;
+* multiple ranges produce a ``multipart/byteranges`` body;
+* full responses go through ``wsgi.file_wrapper`` so servers that support it
+  can hand real files to ``sendfile``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import mimetypes
+import os
+import secrets
+import sqlite3
+from datetime import datetime, timezone
+from typing import Callable, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from flask import Response, current_app, request, send_file
+from sqlalchemy import text
+from werkzeug.http import http_date, is_resource_modified, parse_date, unquote_etag
+from werkzeug.wsgi import wrap_file
+
+from noblepaints import db
+
+CHUNK_SIZE = 256 * 1024
+# Clients asking for more ranges than this get the whole payload instead; the
+# limit keeps pathological ``Range`` headers from fanning out into thousands
+# of tiny seeks.
+MAX_RANGES = 16
+
+ByteRange = Tuple[int, int]
+
+
+def parse_byte_ranges(header: Optional[str], size: int) -> Optional[List[ByteRange]]:
+    """Resolve a ``Range`` header into inclusive ``(start, end)`` pairs.
+
+    Returns ``None`` when the header is absent, malformed or should be
+    ignored (in which case the full payload is sent) and an empty list when
+    it is well formed but none of the ranges can be satisfied.
+    """
+    if not header:
+        return None
+    units, _, spec = header.partition("=")
+    if units.strip().lower() != "bytes" or not spec.strip():
+        return None
+
+    ranges: List[ByteRange] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part or "-" not in part:
+            return None
+        first, _, last = part.partition("-")
+        first, last = first.strip(), last.strip()
+        try:
+            if not first:
+                suffix = int(last)
+                if suffix < 0:
+                    return None
+                if suffix == 0 or size == 0:
+                    continue
+                ranges.append((max(size - suffix, 0), size - 1))
+                continue
+            start = int(first)
+            end = int(last) if last else size - 1
+        except ValueError:
+            return None
+        if start < 0 or (last and end < start):
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+    return _coalesce(ranges)
+
+
+def _coalesce(ranges: List[ByteRange]) -> List[ByteRange]:
+    merged: List[ByteRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _if_range_matches(etag: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """Return ``True`` when a ``Range`` request may be honoured."""
+    value = request.headers.get("If-Range")
+    if not value:
+        return True
+    value = value.strip()
+    if value.startswith(("\"", "W/")):
+        candidate, weak = unquote_etag(value)
+        # RFC 9110 requires a strong comparison for If-Range.
+        return bool(etag) and not weak and candidate == etag
+    since = parse_date(value)
+    if since is None or last_modified is None:
+        return False
+    # Database timestamps are naive UTC; file times are timezone-aware.
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def _iter_range(stream, start: int, length: int, chunk_size: int) -> Iterator[bytes]:
+    stream.seek(start)
+    remaining = length
+    while remaining > 0:
+        chunk = stream.read(min(chunk_size, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+
+
+def _multipart_parts(ranges: List[ByteRange], size: int, mimetype: str, boundary: str) -> List[Tuple[bytes, ByteRange]]:
+    parts = []
+    for start, end in ranges:
+        header = (
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {mimetype}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode("latin-1")
+        parts.append((header, (start, end)))
+    return parts
+
+
+def ranged_response(
+    open_stream: Callable[[], object],
+    size: int,
+    mimetype: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None,
+    download_name: Optional[str] = None,
+    as_attachment: bool = False,
+    cache_control: str = "public, no-cache",
+    chunk_size: int = CHUNK_SIZE,
+) -> Response:
+    """Build a conditional and range-aware response for a seekable payload.
+
+    *open_stream* is only called when a body actually has to be sent, so a
+    ``304`` never touches the underlying blob or file.  The returned stream
+    must support ``read``, ``seek`` and ``close``.
+    """
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": cache_control}
+    if etag:
+        headers["ETag"] = f'"{etag}"'
+    if last_modified:
+        headers["Last-Modified"] = http_date(last_modified)
+    if download_name:
+        disposition = "attachment" if as_attachment else "inline"
+        try:
+            download_name.encode("ascii")
+            headers["Content-Disposition"] = f'{disposition}; filename="{download_name}"'
+        except UnicodeEncodeError:
+            headers["Content-Disposition"] = f"{disposition}; filename*=UTF-8''{quote(download_name)}"
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return Response(status=304, headers=headers)
+
+    ranges = None
+    if request.method in ("GET", "HEAD") and _if_range_matches(etag, last_modified):
+        ranges = parse_byte_ranges(request.headers.get("Range"), size)
+
+    if ranges == []:
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status=416, headers=headers)
+
+    if request.method == "HEAD":
+        headers["Content-Length"] = str(size)
+        return Response(status=200, headers=headers, mimetype=mimetype)
+
+    if not ranges:
+        stream = open_stream()
+        response = Response(
+            wrap_file(request.environ, stream, chunk_size),
+            status=200,
+            headers=headers,
+            mimetype=mimetype,
+            direct_passthrough=True,
+        )
+        response.content_length = size
+        return response
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        length = end - start + 1
+        stream = open_stream()
+
+        def generate_single():
+            try:
+                yield from _iter_range(stream, start, length, chunk_size)
+            finally:
+                stream.close()
+
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response = Response(generate_single(), status=206, headers=headers, mimetype=mimetype, direct_passthrough=True)
+        response.content_length = length
+        return response
+
+    boundary = secrets.token_hex(16)
+    parts = _multipart_parts(ranges, size, mimetype, boundary)
+    closing = f"\r\n--{boundary}--\r\n".encode("latin-1")
+    content_length = sum(len(header) + end - start + 1 for header, (start, end) in parts) + len(closing)
+    stream = open_stream()
+
+    def generate_multipart():
+        try:
+            for header, (start, end) in parts:
+                yield header
+                yield from _iter_range(stream, start, end - start + 1, chunk_size)
+            yield closing
+        finally:
+            stream.close()
+
+    response = Response(generate_multipart(), status=206, headers=headers, direct_passthrough=True)
+    response.content_type = f"multipart/byteranges; boundary={boundary}"
+    response.content_length = content_length
+    return response
+
+
+def file_response(path: str, mimetype: Optional[str] = None, cache_control: str = "public, max-age=86400") -> Response:
+    """Serve a file from disk with the same conditional/range semantics.
+
+    With ``USE_X_SENDFILE`` enabled the front server (Apache/Passenger with
+    ``mod_xsendfile``) streams the file itself, ranges included.  Otherwise
+    full responses are handed to ``wsgi.file_wrapper`` so servers that support
+    it can use ``sendfile``; partial responses read only the requested bytes.
+    """
+    stat = os.stat(path)
+    mimetype = mimetype or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    etag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+    last_modified = datetime.fromtimestamp(int(stat.st_mtime), timezone.utc)
+    if current_app.config.get("USE_X_SENDFILE"):
+        response = send_file(path, mimetype=mimetype, conditional=True, etag=etag, last_modified=last_modified)
+        response.headers["Cache-Control"] = cache_control
+        return response
+    return ranged_response(
+        lambda: open(path, "rb"),
+        size=stat.st_size,
+        mimetype=mimetype,
+        etag=etag,
+        last_modified=last_modified,
+        cache_control=cache_control,
+    )
+
+
+class BlobReader(io.RawIOBase):
+    """Read-only, seekable view over a ``LargeBinary`` column.
+
+    Every read checks a connection out of the pool for that chunk only, so a
+    slow client never holds a pooled connection, or under WAL a read snapshot
+    that stalls checkpoints, for the length of its download.  Uploads are
+    never rewritten in place, so the chunks of one download come from the
+    same payload.  The engine is captured when the reader is created, since
+    the response body is read after the request's app context has ended.
+
+    On SQLite the incremental blob API (``sqlite3.Connection.blobopen``) is
+    used so only the requested pages are read.  Other databases fall back to
+    fetching ``substr()`` slices of the column, which keeps memory bounded at
+    one chunk per read.
+    """
+
+    def __init__(self, table: str, column: str, row_id: int, size: int):
+        super().__init__()
+        self._table = table
+        self._column = column
+        self._row_id = row_id
+        self._size = size
+        self._position = 0
+        self._engine = db.engine
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self._size
+        self._position = min(max(offset, 0), self._size)
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._size - self._position
+        size = min(size, self._size - self._position)
+        if size <= 0:
+            return b""
+        connection = self._engine.raw_connection()
+        try:
+            data = self._read_chunk(connection, self._position, size)
+        finally:
+            connection.close()
+        self._position += len(data)
+        return data
+
+    def _read_chunk(self, connection, offset: int, size: int) -> bytes:
+        driver = getattr(connection, "driver_connection", None)
+        if hasattr(driver, "blobopen"):
+            try:
+                with driver.blobopen(self._table, self._column, self._row_id, readonly=True) as blob:
+                    blob.seek(offset)
+                    return blob.read(size)
+            except Exception:
+                pass
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                f'SELECT substr("{self._column}", ?, ?) FROM "{self._table}" WHERE id = ?',
+                (offset + 1, size, self._row_id),
+            )
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        return bytes(row[0]) if row and row[0] is not None else b""
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def blob_digest(table: str, column: str, row_id: int, size: int) -> str:
+    """Hash a stored blob chunk by chunk without loading it into memory."""
+    digest = hashlib.sha256()
+    reader = BlobReader(table, column, row_id, size)
+    try:
+        while True:
+            chunk = reader.read(1024 * 1024)
+            if not chunk:
+                break
+            digest.update(chunk)
+    finally:
+        reader.close()
+    return digest.hexdigest()
+
+
+def blob_length(table: str, column: str, row_id: int) -> int:
+    """Return the byte length of a stored blob (``length()`` skips the payload)."""
+    value = db.session.execute(
+        text(f'SELECT length("{column}") FROM "{table}" WHERE id = :row_id'),
+        {"row_id": row_id},
+    ).scalar()
+    return int(value or 0)
+
+
+def max_blob_size() -> Optional[int]:
+    """Largest value the session's database accepts in one column, if known.
+
+    SQLite rejects anything above ``SQLITE_MAX_LENGTH`` (about 1 GB by
+    default) with "string or blob too big"; other databases report no limit.
+    """
+    driver = getattr(db.session.connection().connection, "driver_connection", None)
+    if not hasattr(driver, "getlimit"):
+        return None
+    return driver.getlimit(sqlite3.SQLITE_LIMIT_LENGTH)
+
+
+def write_blob(table: str, column: str, row_id: int, source, size: int) -> None:
+    """Fill a ``LargeBinary`` column from the file-like *source* chunk by chunk.
+
+    Runs on the session's connection, so the write belongs to the current
+    transaction.  On SQLite the column is sized with ``zeroblob()`` and
+    written through the incremental blob API; other databases get the
+    payload in a single parameter.
+    """
+    connection = db.session.connection()
+    driver = getattr(connection.connection, "driver_connection", None)
+    if not hasattr(driver, "blobopen"):
+        connection.execute(
+            text(f'UPDATE "{table}" SET "{column}" = :data WHERE id = :row_id'),
+            {"data": source.read(), "row_id": row_id},
+        )
+        return
+    connection.execute(
+        text(f'UPDATE "{table}" SET "{column}" = zeroblob(:size) WHERE id = :row_id'),
+        {"size": size, "row_id": row_id},
+    )
+    if not size:
+        return
+    with driver.blobopen(table, column, row_id) as blob:
+        written = 0
+        while written < size:
+            chunk = source.read(min(CHUNK_SIZE * 4, size - written))
+            if not chunk:
+                raise ValueError(f"Source ended after {written} of {size} bytes.")
+            blob.write(chunk)
+            written += len(chunk)
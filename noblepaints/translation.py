@@ -0,0 +1,244 @@
+"""Translation memory and asynchronous auto-translation for cpanel writes.
+
+When an admin fills in only the English or only the Arabic name of a
+category, the other one is produced automatically.  This used to be a
+blocking call to Google Translate inside the admin request, repeated on every
+edit for the same strings.
+
+:func:`translate_or_queue` first consults the ``translation_memory`` table.
+On a miss it queues a :class:`~noblepaints.models.TranslationJob` and returns
+``None``.  Once the request commits, :data:`translation_worker` translates the
+queued texts in batches and stores them in the memory.  It then writes each
+result into its row, but only if the field still holds the value it had when
+the job was queued, so manual edits made in the meantime always win.
+
+Backends are pluggable: ``TRANSLATION_BACKEND`` selects one of
+:data:`BACKENDS` (``google`` uses deep-translator, ``fake`` is an offline
+stand-in for tests) and :func:`set_backend` installs any object with a
+``translate_batch(texts, source, target)`` method.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from noblepaints import app, db
+from noblepaints.models import TranslationJob, TranslationMemory
+from noblepaints.workers import BackgroundWorker, claim_due, retry_delay
+
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+class TranslationError(RuntimeError):
+    """Raised by backends that cannot translate right now."""
+
+
+class GoogleBackend:
+    """Google Translate through the optional ``deep-translator`` package."""
+
+    def translate_batch(self, texts: Sequence[str], source: str, target: str) -> List[Optional[str]]:
+        try:
+            from deep_translator import GoogleTranslator
+        except ImportError as exc:
+            raise TranslationError("deep-translator is not installed") from exc
+        return list(GoogleTranslator(source=source, target=target).translate_batch(list(texts)))
+
+
+class FakeBackend:
+    """Offline backend for tests: ``mapping`` or ``"[<target>] <text>"``."""
+
+    def __init__(self, mapping: Optional[Dict[tuple, str]] = None):
+        self.mapping = mapping or {}
+        self.calls: List[tuple] = []
+
+    def translate_batch(self, texts: Sequence[str], source: str, target: str) -> List[Optional[str]]:
+        self.calls.append((tuple(texts), source, target))
+        return [self.mapping.get((text, target), f"[{target}] {text}") for text in texts]
+
+
+BACKENDS: Dict[str, Callable[[], object]] = {
+    "google": GoogleBackend,
+    "fake": FakeBackend,
+}
+_backend = None
+_backend_name: Optional[str] = None
+
+
+def get_backend():
+    """Return the configured backend, or ``None`` when translation is disabled."""
+    global _backend, _backend_name
+    name = (app.config.get("TRANSLATION_BACKEND") or "none").lower()
+    if name == "none":
+        return None
+    if _backend is None or _backend_name != name:
+        if name not in BACKENDS:
+            app.logger.error("Unknown TRANSLATION_BACKEND %r; automatic translation is disabled.", name)
+            return None
+        _backend, _backend_name = BACKENDS[name](), name
+    return _backend
+
+
+def set_backend(backend, name: str = "custom") -> None:
+    """Install *backend* (e.g. a :class:`FakeBackend`) for this process."""
+    global _backend, _backend_name
+    _backend, _backend_name = backend, name
+    app.config["TRANSLATION_BACKEND"] = name
+    BACKENDS.setdefault(name, lambda: backend)
+
+
+def source_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def lookup(text: str, source: str, target: str) -> Optional[str]:
+    """Return a remembered translation of *text*, if any."""
+    row = (
+        db.session.query(TranslationMemory.translated_text)
+        .filter(
+            TranslationMemory.source_hash == source_hash(text),
+            TranslationMemory.source_lang == source,
+            TranslationMemory.target_lang == target,
+        )
+        .first()
+    )
+    return row.translated_text if row else None
+
+
+def remember(text: str, source: str, target: str, translated: str) -> None:
+    """Store a translation; a concurrent insert of the same key is ignored."""
+    try:
+        with db.session.begin_nested():
+            db.session.add(TranslationMemory(
+                source_hash=source_hash(text),
+                source_lang=source,
+                target_lang=target,
+                source_text=text,
+                translated_text=translated,
+            ))
+    except IntegrityError:
+        pass
+
+
+def translate_or_queue(instance, field: str, text: str, source: str, target: str) -> Optional[str]:
+    """Translate *text* for ``instance.<field>`` from memory or queue a job.
+
+    Returns the remembered translation or ``None`` when a job was queued (or
+    translation is disabled).  *instance* must already be added to the
+    session; the job is committed together with it.
+    """
+    text = (text or "").strip()
+    if not text:
+        return None
+    remembered = lookup(text, source, target)
+    if remembered is not None:
+        return remembered
+    if get_backend() is None:
+        return None
+    db.session.flush()
+    db.session.add(TranslationJob(
+        table_name=instance.__table__.name,
+        row_id=instance.id,
+        field=field,
+        source_text=text,
+        source_lang=source,
+        target_lang=target,
+        placeholder=getattr(instance, field),
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+    ))
+    db.session.info["translation_jobs_queued"] = True
+    return None
+
+
+@event.listens_for(db.session, "after_commit")
+def _wake_after_commit(session):
+    if session.info.pop("translation_jobs_queued", False):
+        translation_worker.wake()
+
+
+@event.listens_for(db.session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop("translation_jobs_queued", None)
+
+
+def _model_for_table(table_name: str):
+    for mapper in db.Model.registry.mappers:
+        if mapper.local_table.name == table_name:
+            return mapper.class_
+    return None
+
+
+def _mark_failed(job: TranslationJob, error) -> None:
+    job.attempts = (job.attempts or 0) + 1
+    job.last_error = str(error)[:1000]
+    job.claimed_at = None
+    if job.attempts >= app.config["TRANSLATION_MAX_ATTEMPTS"]:
+        job.status = "failed"
+    else:
+        job.status = "pending"
+        job.next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_delay(job.attempts))
+    app.logger.warning("Translation job %s failed (attempt %s): %s", job.id, job.attempts, error)
+
+
+def _apply(job: TranslationJob, translated: str) -> None:
+    model = _model_for_table(job.table_name)
+    row = db.session.get(model, job.row_id) if model is not None else None
+    if row is not None and getattr(row, job.field) == job.placeholder:
+        setattr(row, job.field, translated)
+    job.status = "done"
+    job.claimed_at = None
+
+
+def process_translation_jobs(batch_size: Optional[int] = None) -> int:
+    """Translate one batch of queued jobs and return how many were claimed."""
+    backend = get_backend()
+    if backend is None:
+        return 0
+    batch_size = batch_size or app.config["TRANSLATION_BATCH_SIZE"]
+    claimed = claim_due(TranslationJob, batch_size, CLAIM_TIMEOUT)
+    if not claimed:
+        return 0
+    jobs = db.session.query(TranslationJob).filter(TranslationJob.id.in_(claimed)).order_by(TranslationJob.id).all()
+
+    groups: Dict[tuple, List[TranslationJob]] = {}
+    for job in jobs:
+        groups.setdefault((job.source_lang, job.target_lang), []).append(job)
+
+    for (source, target), group in groups.items():
+        results: Dict[str, Optional[str]] = {}
+        for job in group:
+            if job.source_text not in results:
+                results[job.source_text] = lookup(job.source_text, source, target)
+        missing = [text for text, translated in results.items() if translated is None]
+        if missing:
+            try:
+                translated_texts = backend.translate_batch(missing, source, target)
+            except Exception as exc:  # network/quota failures
+                for job in group:
+                    if results.get(job.source_text) is None:
+                        _mark_failed(job, exc)
+                translated_texts = []
+            for text, translated in zip(missing, translated_texts):
+                translated = (translated or "").strip()
+                if translated:
+                    results[text] = translated
+                    remember(text, source, target, translated)
+        for job in group:
+            if job.status != "sending":
+                continue
+            translated = results.get(job.source_text)
+            if translated:
+                _apply(job, translated)
+            else:
+                _mark_failed(job, "empty translation")
+    db.session.commit()
+    return len(claimed)
+
+
+translation_worker = BackgroundWorker("translation-worker", process_translation_jobs, interval=60.0)
@@ -0,0 +1,124 @@
+"""In-process background workers.
+
+Passenger runs the application in a handful of long-lived processes, and
+there is no separate job runner.  :class:`BackgroundWorker` keeps one daemon
+thread per process for jobs that must not run inside a request, such as
+sending mail.  The job is woken explicitly after new work is queued and also
+polls periodically, so rows queued by other processes (or left over after a
+restart) are picked up as well.
+
+The work itself lives in database tables and every worker claims rows
+atomically, so several processes can run the same worker safely.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy import and_, or_
+
+from noblepaints import app, db
+
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+
+def retry_delay(attempts: int, base: float = RETRY_BASE_SECONDS, cap: float = RETRY_MAX_SECONDS) -> float:
+    """Seconds to wait before the next attempt (exponential, with jitter)."""
+    delay = min(base * 2 ** max(attempts - 1, 0), cap)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_due(model, limit: int, claim_timeout: timedelta) -> List[int]:
+    """Atomically mark up to *limit* due rows of a queue *model* as claimed.
+
+    Queue models have ``status``, ``next_attempt_at`` and ``claimed_at``
+    columns.  Rows are due when ``pending`` and scheduled in the past, or when
+    a claim is older than *claim_timeout* (its worker died).  Each row is
+    claimed with a conditional ``UPDATE`` so concurrent workers never get
+    the same row.
+    """
+    now = datetime.utcnow()
+    due = or_(
+        and_(model.status == "pending", model.next_attempt_at <= now),
+        and_(model.status == "sending", model.claimed_at < now - claim_timeout),
+    )
+    candidates = [
+        row.id
+        for row in db.session.query(model.id).filter(due).order_by(model.next_attempt_at, model.id).limit(limit)
+    ]
+    claimed = []
+    for row_id in candidates:
+        updated = (
+            db.session.query(model)
+            .filter(model.id == row_id, due)
+            .update({"status": "sending", "claimed_at": now}, synchronize_session=False)
+        )
+        if updated:
+            claimed.append(row_id)
+    db.session.commit()
+    return claimed
+
+
+class BackgroundWorker:
+    """Run *task* in a daemon thread whenever woken or every *interval* seconds.
+
+    *task* runs inside an application context and returns a truthy value
+    when more work is immediately available, in which case it runs again
+    without waiting.
+    """
+
+    def __init__(self, name: str, task: Callable[[], object], interval: float = 30.0):
+        self.name = name
+        self.task = task
+        self.interval = interval
+        self._event = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def is_alive(self) -> bool:
+        # Threads do not survive a fork, so a worker inherited from the
+        # Passenger preloader must be started again in the child.
+        return self._thread is not None and self._thread.is_alive() and self._pid == os.getpid()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.is_alive():
+                return
+            self._stopping.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def wake(self) -> None:
+        """Start the worker if needed and make it run as soon as possible."""
+        self.start()
+        self._event.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        self._event.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def run_once(self) -> object:
+        with app.app_context():
+            return self.task()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                more = self.run_once()
+            except Exception:
+                app.logger.exception("Background worker %s failed", self.name)
+                more = False
+            if more:
+                continue
+            self._event.wait(self.interval)
+            self._event.clear()
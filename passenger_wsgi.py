@@ -1,9 +1,9 @@
-import imp
 import os
 import sys
 
 
 sys.path.insert(0, os.path.dirname(__file__))
 
-wsgi = imp.load_source('wsgi', 'run.py')
-application = wsgi.app
+from noblepaints import create_app
+
+application = create_app()
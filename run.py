@@ -1,3 +1,6 @@
-from noblepaints import app
+from noblepaints import create_app
+
+app = create_app()
+
 if __name__ == '__main__':
     app.run(debug=False)
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""Run the app against a scratch database and media directory."""
+
+import os
+import tempfile
+
+_SCRATCH = tempfile.mkdtemp(prefix="noblepaints-tests-")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(_SCRATCH, "noblepaints.db"))
+os.environ.setdefault("MEDIA_ROOT", os.path.join(_SCRATCH, "media"))
+os.environ.setdefault("CACHE_SQLITE_PATH", os.path.join(_SCRATCH, "cache.sqlite3"))
+os.environ.setdefault("CACHE_DIR", os.path.join(_SCRATCH, "cache"))
+os.environ.setdefault("OUTBOX_SENDER", "cron")
+os.environ.setdefault("TRANSLATION_BACKEND", "none")
+os.environ.setdefault("AUTO_MIGRATE", "0")
+
+import pytest  # noqa: E402
+
+from noblepaints import app, db  # noqa: E402
+from noblepaints.bootstrap import ensure_admin_user, migrate_database  # noqa: E402
+from noblepaints.models import User  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def database():
+    with app.app_context():
+        migrate_database()
+        ensure_admin_user()
+    return app
+
+
+@pytest.fixture
+def app_context(database):
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def admin_client(database):
+    client = app.test_client()
+    with app.app_context():
+        user = db.session.query(User).first()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user.id)
+        session["_fresh"] = True
+    return client
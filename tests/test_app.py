@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from noblepaints import app, create_app
+from noblepaints.commands import BOOT_PROBE
+
+# Seconds a fresh interpreter may take to import the app (a cold worker).
+BOOT_TIME_LIMIT = float(os.environ.get("BOOT_TIME_LIMIT", 2.0))
+
+
+def test_create_app_applies_runtime_settings():
+    previous = app.config["OUTBOX_MAX_ATTEMPTS"]
+    try:
+        assert create_app({"OUTBOX_MAX_ATTEMPTS": previous + 1}) is app
+        assert app.config["OUTBOX_MAX_ATTEMPTS"] == previous + 1
+    finally:
+        app.config["OUTBOX_MAX_ATTEMPTS"] = previous
+
+
+def test_create_app_rejects_settings_fixed_at_import():
+    uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    # Repeating the value in effect is harmless.
+    create_app({"SQLALCHEMY_DATABASE_URI": uri})
+    with pytest.raises(ValueError, match="CACHE_BACKEND, SQLALCHEMY_DATABASE_URI"):
+        create_app({"SQLALCHEMY_DATABASE_URI": "sqlite:///other.db", "CACHE_BACKEND": "none"})
+    assert app.config["SQLALCHEMY_DATABASE_URI"] == uri
+
+
+def test_cold_start_stays_within_budget():
+    timings = []
+    for _ in range(3):
+        result = subprocess.run(
+            [sys.executable, "-c", BOOT_PROBE],
+            cwd=os.path.dirname(app.root_path),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    assert min(timings) < BOOT_TIME_LIMIT
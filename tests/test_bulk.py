@@ -0,0 +1,67 @@
+import json
+
+from sqlalchemy.exc import OperationalError
+
+from noblepaints import bulk, db
+from noblepaints.bulk import import_content
+from noblepaints.models import Product, Upload
+
+
+def _write_jsonl(path, *rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+    return str(path)
+
+
+def test_failed_row_leaves_existing_product_untouched(app_context, tmp_path):
+    product = Product(name="Primer", lang="en", desc="Original", country="Egypt")
+    db.session.add(product)
+    db.session.commit()
+    product_id = product.id
+
+    attachments = tmp_path / "attachments"
+    attachments.mkdir()
+    source = _write_jsonl(
+        tmp_path / "products.jsonl",
+        {"name": "Primer", "lang": "en", "desc": "HIJACKED", "datasheet": "missing.pdf"},
+    )
+
+    stats = import_content("products", source, attachments=str(attachments))
+
+    assert stats["failed"] == 1
+    assert stats["updated"] == 0
+    db.session.expire_all()
+    assert db.session.get(Product, product_id).desc == "Original"
+
+
+def test_database_errors_fail_only_their_row(app_context, tmp_path, monkeypatch):
+    attachments = tmp_path / "attachments"
+    attachments.mkdir()
+    (attachments / "huge.pdf").write_bytes(b"x" * 64)
+    (attachments / "broken.pdf").write_bytes(b"broken")
+    (attachments / "small.pdf").write_bytes(b"ok")
+    source = _write_jsonl(
+        tmp_path / "products.jsonl",
+        {"name": "Huge", "lang": "en", "desc": "Too big", "datasheet": "huge.pdf"},
+        {"name": "Broken", "lang": "en", "desc": "Rejected", "datasheet": "broken.pdf"},
+        {"name": "Small", "lang": "en", "desc": "Fits", "datasheet": "small.pdf"},
+    )
+
+    def write_blob(table, column, row_id, handle, size):
+        if size == len(b"broken"):
+            raise OperationalError("UPDATE upload", {}, Exception("string or blob too big"))
+        real_write_blob(table, column, row_id, handle, size)
+
+    real_write_blob = bulk.write_blob
+    monkeypatch.setattr(bulk, "max_blob_size", lambda: 32)
+    monkeypatch.setattr(bulk, "write_blob", write_blob)
+    stats = import_content("products", source, attachments=str(attachments))
+
+    assert stats["failed"] == 2
+    assert stats["inserted"] == 1
+    assert [line for line, _ in stats["errors"]] == [1, 2]
+    assert "at most 32" in stats["errors"][0][1]
+    names = {name for (name,) in db.session.query(Product.name).filter(Product.name.in_(["Huge", "Broken", "Small"]))}
+    assert names == {"Small"}
+    assert db.session.query(Upload).filter(Upload.filename == "broken.pdf").count() == 0
+    upload_id = int(db.session.query(Product.datasheet).filter(Product.name == "Small").scalar())
+    assert db.session.get(Upload, upload_id).data == b"ok"
@@ -0,0 +1,45 @@
+import threading
+import time
+
+from noblepaints import db, query_cache
+from noblepaints.cache import QueryCache
+from noblepaints.models import Product
+
+
+def test_concurrent_misses_compute_once_and_release_their_lock():
+    cache = QueryCache()
+    calls = []
+
+    def producer():
+        calls.append(1)
+        time.sleep(0.05)
+        return 42
+
+    threads = [threading.Thread(target=cache.get_or_set, args=("key", producer)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for number in range(100):
+        cache.get_or_set(("search", number), lambda: number)
+
+    assert len(calls) == 1
+    assert cache.get_or_set("key", producer) == 42
+    assert cache._flights == {}
+
+
+def test_commit_invalidates_cached_queries(app_context):
+    def count_products():
+        return db.session.query(Product).count()
+
+    before = query_cache.get_or_set(("tests", "product_count"), count_products, namespaces=("products",))
+    version = query_cache.versions(["products"])["products"][0]
+    db.session.add(Product(name="Varnish", desc="Clear", lang="en"))
+    db.session.flush()
+    db.session.rollback()
+    assert query_cache.versions(["products"])["products"][0] == version
+
+    db.session.add(Product(name="Varnish", desc="Clear", lang="en"))
+    db.session.commit()
+    assert query_cache.versions(["products"])["products"][0] > version
+    assert query_cache.get_or_set(("tests", "product_count"), count_products, namespaces=("products",)) == before + 1
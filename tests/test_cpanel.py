@@ -0,0 +1,27 @@
+from noblepaints import app, db
+from noblepaints.models import Product
+
+
+def test_listing_pages_in_sql(admin_client):
+    with app.app_context():
+        db.session.add_all(
+            Product(name=f"Listing primer {number}", desc="<p>" + "Long description " * 50 + "</p>", lang="en")
+            for number in range(5)
+        )
+        db.session.commit()
+
+    response = admin_client.get("/ControlPanel/api/products/?q=Listing+primer&per_page=2&page=2&sort=name&order=asc")
+    body = response.get_json()
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-store"
+    assert (body["total"], body["pages"], body["page"], body["per_page"]) == (5, 3, 2, 2)
+    assert [item["name"] for item in body["items"]] == ["Listing primer 2", "Listing primer 3"]
+    assert len(body["items"][0]["desc"]) <= 140
+
+    last = admin_client.get("/ControlPanel/api/products/?q=Listing+primer&per_page=2&page=99").get_json()
+    assert (last["page"], len(last["items"])) == (3, 1)
+
+
+def test_listing_requires_login(database):
+    response = app.test_client().get("/ControlPanel/api/products/")
+    assert response.status_code in (302, 401)
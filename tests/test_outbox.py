@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from noblepaints import db, outbox
+from noblepaints.models import OutboxMessage
+
+
+class FakeConnection:
+    def __init__(self, fail_for=()):
+        self.sent = []
+        self.fail_for = set(fail_for)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def send(self, message):
+        if message.subject in self.fail_for:
+            raise OSError("mailbox unavailable")
+        self.sent.append(message)
+
+
+def test_pending_mail_is_delivered_once(app_context, monkeypatch):
+    connection = FakeConnection()
+    monkeypatch.setattr(outbox.mail, "connect", lambda: connection)
+    message = outbox.enqueue_mail("Contact: Ahmed", ["info@example.com"], "Hello", "web@example.com")
+
+    assert outbox.deliver_pending() >= 1
+    assert outbox.deliver_pending() == 0
+
+    db.session.expire_all()
+    delivered = db.session.get(OutboxMessage, message.id)
+    assert delivered.status == "sent"
+    assert delivered.sent_at is not None
+    assert [sent.subject for sent in connection.sent] == ["Contact: Ahmed"]
+    assert connection.sent[0].recipients == ["info@example.com"]
+
+
+def test_failed_mail_is_rescheduled(app_context, monkeypatch):
+    monkeypatch.setattr(outbox.mail, "connect", lambda: FakeConnection(fail_for={"Contact: retry"}))
+    message = outbox.enqueue_mail("Contact: retry", ["info@example.com"], "Hello", "web@example.com")
+
+    outbox.deliver_pending()
+
+    db.session.expire_all()
+    pending = db.session.get(OutboxMessage, message.id)
+    assert pending.status == "pending"
+    assert pending.attempts == 1
+    assert pending.last_error == "mailbox unavailable"
+    assert pending.next_attempt_at > datetime.utcnow()
@@ -0,0 +1,44 @@
+from noblepaints import routes
+from noblepaints.models import Category
+
+
+def test_degraded_catalogs_page_is_never_cached(database, monkeypatch):
+    def broken_index(table):
+        raise RuntimeError("facet index unavailable")
+
+    monkeypatch.setattr(routes, "get_facet_index", broken_index)
+    client = routes.app.test_client(use_cookies=False)
+    first = client.get("/catalogs/?search=degraded")
+    second = client.get("/catalogs/?search=degraded")
+
+    for response in (first, second):
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"] == "no-store"
+        assert response.headers["X-Cache"] == "MISS"
+        assert "ETag" not in response.headers
+
+    monkeypatch.undo()
+    recovered = client.get("/catalogs/?search=degraded")
+    assert recovered.status_code == 200
+    assert "no-store" not in recovered.headers.get("Cache-Control", "")
+    assert "ETag" in recovered.headers
+
+
+def test_conditional_get_revalidates_until_the_data_changes(database):
+    client = routes.app.test_client(use_cookies=False)
+    first = client.get("/api/categories/")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+
+    unchanged = client.get("/api/categories/", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.data == b""
+    assert unchanged.headers["ETag"] == etag
+
+    with routes.app.app_context():
+        routes.db.session.add(Category(name="Waterproofing", nameArabic="عزل مائي", desc="Membranes"))
+        routes.db.session.commit()
+    changed = client.get("/api/categories/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert "Waterproofing" in changed.get_data(as_text=True)
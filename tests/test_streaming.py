@@ -0,0 +1,52 @@
+import io
+import json
+import os
+
+from noblepaints import app, db
+from noblepaints.models import Product, Upload
+
+
+def test_download_streams_without_an_app_context(database):
+    payload = os.urandom(3 * 256 * 1024 + 17)
+    with app.app_context():
+        upload = Upload()
+        upload.set_data("catalog.pdf", payload)
+        db.session.add(upload)
+        db.session.commit()
+        upload_id = upload.id
+
+    # The body is read after the view returns, as a WSGI server does, when
+    # the request's app context is already gone.
+    client = app.test_client(use_cookies=False)
+    full = client.get(f"/download/{upload_id}")
+    partial = client.get(f"/download/{upload_id}", headers={"Range": "bytes=300000-600000"})
+
+    assert full.status_code == 200
+    assert full.data == payload
+    assert partial.status_code == 206
+    assert partial.data == payload[300000:600001]
+
+
+def test_replacing_a_datasheet_keeps_the_old_upload(database, admin_client):
+    with app.app_context():
+        upload = Upload()
+        upload.set_data("old.pdf", b"old datasheet")
+        product = Product(name="Primer", desc="Primer", lang="en")
+        db.session.add(upload)
+        db.session.flush()
+        product.datasheet = upload.id
+        db.session.add(product)
+        db.session.commit()
+        old_id, product_id = upload.id, product.id
+
+    response = admin_client.post(
+        f"/ControlPanel/products/edit/{product_id}/",
+        data={"data": json.dumps({}), "file": (io.BytesIO(b"new datasheet"), "new.pdf")},
+    )
+    assert response.status_code == 200
+
+    with app.app_context():
+        new_id = int(db.session.get(Product, product_id).datasheet)
+        assert new_id != old_id
+        assert db.session.get(Upload, old_id).data == b"old datasheet"
+        assert db.session.get(Upload, new_id).data == b"new datasheet"
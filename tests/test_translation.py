@@ -0,0 +1,60 @@
+import pytest
+
+from noblepaints import app, db, translation
+from noblepaints.models import Category, TranslationJob
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    """Install a FakeBackend; set_backend's changes are undone afterwards."""
+    backend = translation.FakeBackend({("Primers", "ar"): "برايمر"})
+    monkeypatch.setattr(translation, "_backend", None)
+    monkeypatch.setattr(translation, "_backend_name", None)
+    monkeypatch.setitem(app.config, "TRANSLATION_BACKEND", "none")
+    monkeypatch.setitem(translation.BACKENDS, "tests", lambda: backend)
+    translation.set_backend(backend, "tests")
+    return backend
+
+
+@pytest.fixture
+def wakes(monkeypatch):
+    """Record worker wake-ups instead of starting the background thread."""
+    calls = []
+    monkeypatch.setattr(translation.translation_worker, "wake", lambda: calls.append(True))
+    return calls
+
+
+def test_missing_name_is_queued_then_translated(app_context, fake_backend, wakes):
+    category = Category(name="Primers", desc="Base coats", nameArabic="Primers")
+    db.session.add(category)
+    assert translation.translate_or_queue(category, "nameArabic", "Primers", "en", "ar") is None
+    assert fake_backend.calls == [] and wakes == []
+    db.session.commit()
+    assert wakes == [True]
+
+    job = db.session.query(TranslationJob).filter(TranslationJob.row_id == category.id).one()
+    assert (job.status, job.placeholder) == ("pending", "Primers")
+
+    assert translation.process_translation_jobs() >= 1
+    db.session.expire_all()
+    assert db.session.get(Category, category.id).nameArabic == "برايمر"
+    assert db.session.get(TranslationJob, job.id).status == "done"
+
+    # The translation memory answers the next request without a job.
+    again = Category(name="Primers", desc="Again")
+    db.session.add(again)
+    assert translation.translate_or_queue(again, "nameArabic", "Primers", "en", "ar") == "برايمر"
+    assert len(fake_backend.calls) == 1
+
+
+def test_manual_edit_wins_over_a_late_translation(app_context, fake_backend, wakes):
+    category = Category(name="Sealers", desc="Sealers", nameArabic="Sealers")
+    db.session.add(category)
+    translation.translate_or_queue(category, "nameArabic", "Sealers", "en", "ar")
+    db.session.commit()
+    category.nameArabic = "مانع تسرب"
+    db.session.commit()
+
+    translation.process_translation_jobs()
+    db.session.expire_all()
+    assert db.session.get(Category, category.id).nameArabic == "مانع تسرب"